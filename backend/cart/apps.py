@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class CartConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cart'
-    verbose_name = 'Cart' 
\ No newline at end of file
+    verbose_name = 'Cart'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import cart.signals
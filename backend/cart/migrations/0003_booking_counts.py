@@ -0,0 +1,82 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:55
+
+import uuid
+
+from django.db import migrations, models
+
+COUNT_FIELDS = ['schedule_id', 'adult_count', 'child_count', 'infant_count']
+
+
+def parse_booking_counts(booking_data):
+    """Frozen copy of the booking_data parsing at the time of this migration."""
+    booking_data = booking_data if isinstance(booking_data, dict) else {}
+
+    try:
+        schedule_id = uuid.UUID(str(booking_data.get('schedule_id')))
+    except (TypeError, ValueError, AttributeError):
+        schedule_id = None
+
+    participants = booking_data.get('participants') or {}
+    if not isinstance(participants, dict):
+        participants = {}
+
+    counts = []
+    for age_group in ('adult', 'child', 'infant'):
+        try:
+            counts.append(max(0, int(participants.get(age_group) or 0)))
+        except (TypeError, ValueError):
+            counts.append(0)
+
+    return (schedule_id, *counts)
+
+
+def populate_booking_counts(apps, schema_editor, batch_size=1000):
+    Item = apps.get_model('cart', 'CartItem')
+    batch = []
+    for item in Item.objects.only('id', 'booking_data', *COUNT_FIELDS).iterator(chunk_size=batch_size):
+        values = parse_booking_counts(item.booking_data)
+        if values == tuple(getattr(item, field) for field in COUNT_FIELDS):
+            continue
+        for field, value in zip(COUNT_FIELDS, values):
+            setattr(item, field, value)
+        batch.append(item)
+        if len(batch) >= batch_size:
+            Item.objects.bulk_update(batch, COUNT_FIELDS)
+            batch = []
+    if batch:
+        Item.objects.bulk_update(batch, COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartitem',
+            name='adult_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Adult count'),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='child_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Child count'),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='infant_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Infant count'),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='schedule_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True, verbose_name='Schedule ID'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['product_id', 'booking_date'], name='cart_cartit_product_ea5346_idx'),
+        ),
+        migrations.RunPython(populate_booking_counts, migrations.RunPython.noop),
+    ]
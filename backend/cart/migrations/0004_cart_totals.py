@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-17 01:11
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    carts = Cart.objects.annotate(
+        counted_items=Count('items'),
+        counted_quantity=Sum('items__quantity'),
+        counted_subtotal=Sum('items__total_price'),
+    ).filter(counted_items__gt=0)
+    for cart in carts.iterator():
+        cart.item_count = cart.counted_items
+        cart.total_quantity = cart.counted_quantity or 0
+        cart.subtotal = cart.counted_subtotal or 0
+        cart.save(update_fields=['item_count', 'total_quantity', 'subtotal'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_booking_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Item count'),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Subtotal'),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total quantity'),
+        ),
+        migrations.RunPython(populate_cart_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-17 01:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0004_cart_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['is_active', 'expires_at'], name='cart_cart_is_acti_1c244a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['is_reserved', 'reservation_expires_at'], name='cart_cartit_is_rese_4a78ce_idx'),
+        ),
+    ]
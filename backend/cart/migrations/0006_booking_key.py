@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-17 01:19
+
+import uuid
+
+from django.db import migrations, models
+
+KEY_FIELDS = ['product_type', 'product_id', 'variant_id', 'schedule_id', 'booking_date']
+
+
+def _normalize_id(value):
+    """UUIDs in canonical form, anything else as a string ('' for None)."""
+    if value is None:
+        return ''
+    try:
+        return str(uuid.UUID(str(value)))
+    except (TypeError, ValueError, AttributeError):
+        return str(value)
+
+
+def make_booking_key(product_type, product_id, variant_id, schedule_id=None, booking_date=None):
+    """Frozen copy of the booking key format at the time of this migration."""
+    if product_type == 'tour':
+        slot = _normalize_id(schedule_id) if schedule_id else ''
+    else:
+        slot = booking_date.isoformat() if hasattr(booking_date, 'isoformat') else str(booking_date or '')
+    return ':'.join([
+        product_type or '', _normalize_id(product_id), _normalize_id(variant_id), slot
+    ])
+
+
+def populate_booking_keys(apps, schema_editor, batch_size=1000):
+    Item = apps.get_model('cart', 'CartItem')
+    batch = []
+    for item in Item.objects.only('id', 'booking_key', *KEY_FIELDS).iterator(chunk_size=batch_size):
+        booking_key = make_booking_key(*(getattr(item, field) for field in KEY_FIELDS))
+        if booking_key == item.booking_key:
+            continue
+        item.booking_key = booking_key
+        batch.append(item)
+        if len(batch) >= batch_size:
+            Item.objects.bulk_update(batch, ['booking_key'])
+            batch = []
+    if batch:
+        Item.objects.bulk_update(batch, ['booking_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0005_cleanup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartitem',
+            name='booking_key',
+            field=models.CharField(blank=True, db_index=True, max_length=200, verbose_name='Booking key'),
+        ),
+        migrations.RunPython(populate_booking_keys, migrations.RunPython.noop),
+    ]
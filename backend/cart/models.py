@@ -2,13 +2,18 @@
 Cart models for Peykan Tourism Platform.
 """
 
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.core.cache import cache
-from core.models import BaseModel
+from core.models import BaseModel, BaseBookingCountsModel
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 class Cart(BaseModel):
     """
@@ -37,14 +42,29 @@ class Cart(BaseModel):
         verbose_name=_('Currency')
     )
     
+    # Totals, maintained with every item write (see cart.signals)
+    item_count = models.PositiveIntegerField(default=0, verbose_name=_('Item count'))
+    total_quantity = models.PositiveIntegerField(default=0, verbose_name=_('Total quantity'))
+    subtotal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Subtotal')
+    )
+    
     # Status
     is_active = models.BooleanField(default=True, verbose_name=_('Is active'))
     expires_at = models.DateTimeField(verbose_name=_('Expires at'))
     
+    TOTAL_FIELDS = ['item_count', 'total_quantity', 'subtotal', 'currency']
+    
     class Meta:
         verbose_name = _('Cart')
         verbose_name_plural = _('Carts')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'expires_at']),
+        ]
     
     def __str__(self):
         return f"Cart {self.session_id}"
@@ -52,12 +72,44 @@ class Cart(BaseModel):
     @property
     def total_items(self):
         """Get total number of items in cart."""
-        return self.items.count()
+        return self.item_count
     
-    @property
-    def subtotal(self):
-        """Calculate cart subtotal."""
-        return sum(item.total_price for item in self.items.all())
+    @staticmethod
+    def adjust_totals(cart_id, items=0, quantity=0, amount=Decimal('0.00'), currency=None):
+        """
+        Atomically add deltas to a cart's stored totals.
+        currency is applied when the cart had no items before the change.
+        """
+        from django.db.models import Case, F, Value, When
+        
+        updates = {
+            'item_count': F('item_count') + items,
+            'total_quantity': F('total_quantity') + quantity,
+            'subtotal': F('subtotal') + amount,
+        }
+        if currency:
+            updates['currency'] = Case(
+                When(item_count=0, then=Value(currency)), default=F('currency')
+            )
+        Cart.objects.filter(pk=cart_id).update(**updates)
+        CartService.invalidate_item_count(cart_id)
+    
+    def refresh_totals(self, save=True):
+        """Recalculate the stored totals from the cart items."""
+        from django.db.models import Count, Sum
+        
+        totals = self.items.aggregate(
+            item_count=Count('id'), total_quantity=Sum('quantity'), subtotal=Sum('total_price')
+        )
+        self.item_count = totals['item_count']
+        self.total_quantity = totals['total_quantity'] or 0
+        self.subtotal = totals['subtotal'] or Decimal('0.00')
+        first_currency = self.items.order_by('created_at').values_list('currency', flat=True).first()
+        if first_currency:
+            self.currency = first_currency
+        if save:
+            self.save(update_fields=self.TOTAL_FIELDS + ['updated_at'])
+            CartService.invalidate_item_count(self.pk)
     
     @property
     def total(self):
@@ -79,7 +131,7 @@ class Cart(BaseModel):
                 item.delete()
 
 
-class CartItem(BaseModel):
+class CartItem(BaseBookingCountsModel):
     """
     Individual items in the shopping cart.
     """
@@ -242,217 +294,54 @@ class CartItem(BaseModel):
         verbose_name = _('Cart Item')
         verbose_name_plural = _('Cart Items')
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['product_id', 'booking_date']),
+            models.Index(fields=['is_reserved', 'reservation_expires_at']),
+        ]
     
     def __str__(self):
         return f"{self.cart} - {self.product_type} - {self.quantity}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_priced()
+        instance._saved_totals = instance.totals_state()
+        return instance
+    
+    def totals_state(self):
+        """(cart_id, quantity, total_price) as counted in the cart totals."""
+        return (self.cart_id, self.quantity, self.total_price)
+    
+    def _price_state(self):
+        from copy import deepcopy
+        from .pricing import PRICE_FIELDS
+        return tuple(deepcopy(self.__dict__.get(field)) for field in PRICE_FIELDS)
+    
+    def mark_priced(self):
+        """Remember the price-relevant field values the current price is based on."""
+        self._priced_state = self._price_state()
+    
+    def needs_pricing(self):
+        """True for new items and items whose price-relevant fields changed."""
+        return (
+            self._state.adding
+            or getattr(self, '_priced_state', None) != self._price_state()
+        )
+    
     def save(self, *args, **kwargs):
         # Check if total_price should be manually overridden (for tours with complex pricing)
         skip_price_calculation = kwargs.pop('skip_price_calculation', False)
 
-        # Always recalculate options_total from selected_options
-        from decimal import Decimal
-        options_total = Decimal('0.00')
-        if self.selected_options:
-            for option in self.selected_options:
-                # Handle both string (option ID) and dict (option data) formats
-                if isinstance(option, str):
-                    # If option is just an ID string, skip price calculation
-                    # The price should be calculated elsewhere
-                    continue
-                elif isinstance(option, dict):
-                    # Use final_price if available (for car rentals), otherwise use price
-                    option_price_raw = option.get('final_price') or option.get('price')
-                    if option_price_raw is None or option_price_raw == '':
-                        option_price = Decimal('0.00')
-                    else:
-                        try:
-                            option_price = Decimal(str(option_price_raw))
-                        except (ValueError, TypeError):
-                            option_price = Decimal('0.00')
-                    option_quantity = int(option.get('quantity', 1))
-                    options_total += option_price * option_quantity
-        self.options_total = options_total
-
-        # Only recalculate total_price when not explicitly skipping
-        if not skip_price_calculation:
-            # Base calculation
-            unit_price_decimal = Decimal(str(self.unit_price))
-            quantity_decimal = Decimal(str(self.quantity))
-            self.total_price = (unit_price_decimal * quantity_decimal) + options_total
-
-            # For tours, calculate price based on participants if available
-            if self.product_type == 'tour' and self.booking_data.get('participants'):
-                try:
-                    from tours.models import Tour, TourVariant, TourPricing
-                    tour = Tour.objects.get(id=self.product_id)
-                    variant = TourVariant.objects.get(id=self.variant_id, tour=tour)
-                    participants = self.booking_data.get('participants', {})
-                    tour_total = Decimal('0.00')
-                    total_participants = 0
-                    for age_group, count in participants.items():
-                        if count > 0:
-                            total_participants += count
-                            try:
-                                pricing = TourPricing.objects.get(
-                                    tour=tour,
-                                    variant=variant,
-                                    age_group=age_group
-                                )
-                                # Use pricing.final_price (respects is_free flag)
-                                if pricing.is_free:
-                                    subtotal = Decimal('0.00')
-                                else:
-                                    subtotal = Decimal(str(pricing.final_price)) * count
-                                tour_total += subtotal
-                            except TourPricing.DoesNotExist:
-                                # Fallback to variant base_price for missing age groups
-                                # Infants are free by default in fallback
-                                if age_group == 'infant':
-                                    subtotal = Decimal('0.00')
-                                else:
-                                    subtotal = Decimal(str(variant.base_price)) * count
-                                tour_total += subtotal
-                    # Update quantity to match total participants
-                    self.quantity = total_participants
-                    self.unit_price = variant.base_price
-                    self.total_price = tour_total + options_total
-
-                except (Tour.DoesNotExist, TourVariant.DoesNotExist):
-                    # Fallback to simple calculation
-                    unit_price_decimal = Decimal(str(self.unit_price))
-                    quantity_decimal = Decimal(str(self.quantity))
-                    self.total_price = (unit_price_decimal * quantity_decimal) + options_total
-
-            # For transfers, calculate price based on passenger count and store detailed booking info
-            elif self.product_type == 'transfer' and self.booking_data:
-                try:
-                    from transfers.models import TransferRoutePricing, TransferOption
-                    pricing = TransferRoutePricing.objects.get(
-                        route_id=self.product_id,
-                        vehicle_type=self.variant_id  # vehicle_type is stored in variant_id
-                    )
-
-                    # Get passenger count from booking_data
-                    passenger_count = int(self.booking_data.get('passenger_count', 1))
-                    luggage_count = int(self.booking_data.get('luggage_count', 0))
-
-                    # Calculate options total for transfers
-                    transfer_options_total = Decimal('0.00')
-                    if self.selected_options:
-                        for option in self.selected_options:
-                            if isinstance(option, dict) and 'id' in option:
-                                try:
-                                    transfer_option = TransferOption.objects.get(id=option['id'])
-                                    quantity = int(option.get('quantity', 1))
-                                    transfer_options_total += transfer_option.price * quantity
-                                except TransferOption.DoesNotExist:
-                                    continue
-                    
-                    # Transfer price is per vehicle, not per passenger
-                    transfer_total = Decimal(str(pricing.base_price))
-
-                    # Update quantity to 1 (per vehicle)
-                    self.quantity = 1
-                    self.unit_price = pricing.base_price
-                    self.total_price = transfer_total + transfer_options_total
-                    self.options_total = transfer_options_total
-
-                    # Store comprehensive transfer booking information in booking_data
-                    detailed_booking_data = self.booking_data.copy()
-
-                    # Basic vehicle and capacity info
-                    detailed_booking_data.update({
-                        'vehicle_type': self.variant_id,
-                        'vehicle_name': pricing.vehicle_name,
-                        'max_passengers': pricing.max_passengers,
-                        'max_luggage': pricing.max_luggage or 0,
-                        'luggage_count': luggage_count,
-                        'base_price': str(pricing.base_price),
-                        'currency': pricing.currency,
-                        'estimated_duration': pricing.route.estimated_duration_minutes if hasattr(pricing, 'route') else 45,
-                        'route_origin': pricing.route.origin if hasattr(pricing, 'route') else '',
-                        'route_destination': pricing.route.destination if hasattr(pricing, 'route') else '',
-                        # Store pricing metadata for detailed breakdown
-                        'pricing_metadata': pricing.pricing_metadata or {},
-                        'calculated_total': str(transfer_total + transfer_options_total),
-                        'options_total': str(transfer_options_total),
-                        'selected_options': self.selected_options
-                    })
-
-                    # Add route information
-                    if hasattr(pricing, 'route'):
-                        detailed_booking_data.update({
-                            'route_name': pricing.route.name or '',
-                            'peak_hour_surcharge': str(pricing.route.peak_hour_surcharge) if hasattr(pricing.route, 'peak_hour_surcharge') else '0.00',
-                            'midnight_surcharge': str(pricing.route.midnight_surcharge) if hasattr(pricing.route, 'midnight_surcharge') else '0.00',
-                            'round_trip_discount_percentage': str(pricing.route.round_trip_discount_percentage) if hasattr(pricing.route, 'round_trip_discount_percentage') else '0.00',
-                        })
-
-                    # Add trip details from booking_data
-                    trip_details = {
-                        'trip_type': self.booking_data.get('trip_type', 'one_way'),
-                        'outbound_date': self.booking_data.get('outbound_date', ''),
-                        'outbound_time': self.booking_data.get('outbound_time', ''),
-                        'return_date': self.booking_data.get('return_date', ''),
-                        'return_time': self.booking_data.get('return_time', ''),
-                        'pickup_address': self.booking_data.get('pickup_address', ''),
-                        'dropoff_address': self.booking_data.get('dropoff_address', ''),
-                        'pickup_instructions': self.booking_data.get('pickup_instructions', ''),
-                        'dropoff_instructions': self.booking_data.get('dropoff_instructions', ''),
-                        'contact_name': self.booking_data.get('contact_name', ''),
-                        'contact_phone': self.booking_data.get('contact_phone', ''),
-                        'special_requirements': self.booking_data.get('special_requirements', ''),
-                    }
-
-                    # Add pricing breakdown information
-                    pricing_breakdown = {
-                        'outbound_price': self.booking_data.get('outbound_price', str(transfer_total)),
-                        'return_price': self.booking_data.get('return_price', '0.00'),
-                        'round_trip_discount': self.booking_data.get('round_trip_discount', '0.00'),
-                        'options_total': str(transfer_options_total),
-                        'final_price': str(transfer_total + transfer_options_total),
-                        'surcharges': self.booking_data.get('surcharges', {}),
-                        'discounts': self.booking_data.get('discounts', {}),
-                    }
-
-                    detailed_booking_data.update(trip_details)
-                    detailed_booking_data.update(pricing_breakdown)
-
-                    # Update booking_data with comprehensive information
-                    self.booking_data = detailed_booking_data
-
-                except TransferRoutePricing.DoesNotExist:
-                    # Fallback to unit_price * quantity
-                    unit_price_decimal = Decimal(str(self.unit_price))
-                    quantity_decimal = Decimal(str(self.quantity))
-                    self.total_price = (unit_price_decimal * quantity_decimal) + options_total
-            
-            # For car rentals, include insurance in total price calculation
-            elif self.product_type == 'car_rental' and self.booking_data:
-                try:
-                    # Get insurance total from booking_data
-                    insurance_total = Decimal(str(self.booking_data.get('insurance_total', '0.00')))
-                    unit_price_decimal = Decimal(str(self.unit_price))
-                    quantity_decimal = Decimal(str(self.quantity))
-
-                    # Calculate the correct total including insurance
-                    calculated_total = (unit_price_decimal * quantity_decimal) + options_total + insurance_total
-
-                    # For car rentals, always ensure total_price includes insurance
-                    # Override the stored value if it's different from the calculated value
-                    if self.total_price != calculated_total:
-                        self.total_price = calculated_total
-                except (ValueError, TypeError):
-                    # Fallback to basic calculation if insurance_total is invalid
-                    unit_price_decimal = Decimal(str(self.unit_price))
-                    quantity_decimal = Decimal(str(self.quantity))
-                    calculated_total = (unit_price_decimal * quantity_decimal) + options_total
-
-                    # Only update total_price if it's different from calculated value
-                    if self.total_price != calculated_total:
-                        self.total_price = calculated_total
-        super().save(*args, **kwargs)
+        # Reservation flips, cart moves etc. keep the current price
+        if self.needs_pricing():
+            from .pricing import CartPricingEngine
+            CartPricingEngine.price_item(self, skip_price_calculation=skip_price_calculation)
+        
+        # The item and the cart totals (cart.signals) are written together
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self.mark_priced()
     
     @property
     def grand_total(self):
@@ -497,7 +386,7 @@ class CartItem(BaseModel):
         
         self.is_reserved = True
         self.reservation_expires_at = timezone.now() + timedelta(minutes=duration_minutes)
-        self.save()
+        self.save(update_fields=['is_reserved', 'reservation_expires_at', 'updated_at'])
         
         # Update product availability
         self._update_product_availability(reserve=True)
@@ -507,7 +396,7 @@ class CartItem(BaseModel):
         if self.is_reserved:
             self.is_reserved = False
             self.reservation_expires_at = None
-            self.save()
+            self.save(update_fields=['is_reserved', 'reservation_expires_at', 'updated_at'])
             
             # Update product availability
             self._update_product_availability(reserve=False)
@@ -518,6 +407,10 @@ class CartItem(BaseModel):
         pass
 
 
+# Carts whose item deletes skip the per-item totals update (see CartService.defer_totals)
+_deferred_totals = ContextVar('cart_deferred_totals', default=frozenset())
+
+
 class CartService:
     """
     Service class for cart operations.
@@ -611,6 +504,104 @@ class CartService:
             
             return cart
     
+    # Seconds the navbar badge lookups stay cached
+    BADGE_TIMEOUT = 60
+    
+    @staticmethod
+    def _owner_cache_key(session_id=None, user=None):
+        if user is not None and user.is_authenticated:
+            return f"cart_owner:user:{user.pk}"
+        return f"cart_owner:session:{session_id}"
+    
+    @staticmethod
+    def _item_count_cache_key(cart_id):
+        return f"cart_item_count:{cart_id}"
+    
+    @staticmethod
+    def find_cart_id(session_id=None, user=None):
+        """
+        Return the id of the active cart of a user or guest session, or None.
+        Never creates a cart; the result (including "no cart") is cached.
+        """
+        cache_key = CartService._owner_cache_key(session_id, user)
+        cart_id = cache.get(cache_key)
+        if cart_id is None:
+            if user is not None and user.is_authenticated:
+                carts = Cart.objects.filter(user=user, is_active=True)
+            else:
+                carts = Cart.objects.filter(session_id=session_id, user__isnull=True, is_active=True)
+            cart_id = carts.values_list('id', flat=True).first() or ''
+            cache.set(cache_key, cart_id, CartService.BADGE_TIMEOUT)
+        return cart_id or None
+    
+    @staticmethod
+    def find_request_cart_id(request):
+        """
+        find_cart_id for the request's user or guest session.
+        Unlike get_session_id, never creates a session.
+        """
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return CartService.find_cart_id(user=user)
+        
+        session = getattr(request, 'session', None)
+        session_id = session.session_key if session is not None else None
+        if not session_id:
+            return None
+        return CartService.find_cart_id(session_id=session_id)
+    
+    @staticmethod
+    def get_item_count(request):
+        """
+        Number of lines in the request's cart for the navbar badge, 0 when there
+        is no cart. Read-only: never creates a session or a cart.
+        """
+        cart_id = CartService.find_request_cart_id(request)
+        if cart_id is None:
+            return 0
+        
+        cache_key = CartService._item_count_cache_key(cart_id)
+        count = cache.get(cache_key)
+        if count is None:
+            count = Cart.objects.filter(pk=cart_id, is_active=True).values_list(
+                'item_count', flat=True
+            ).first() or 0
+            cache.set(cache_key, count, CartService.BADGE_TIMEOUT)
+        return count
+    
+    @staticmethod
+    @contextmanager
+    def defer_totals(cart_ids):
+        """
+        Skip the per-item totals updates of deleted items of these carts in the
+        current thread. The caller resets their totals afterwards.
+        """
+        token = _deferred_totals.set(_deferred_totals.get() | frozenset(cart_ids))
+        try:
+            yield
+        finally:
+            _deferred_totals.reset(token)
+    
+    @staticmethod
+    def totals_deferred(cart_id):
+        return cart_id in _deferred_totals.get()
+    
+    @staticmethod
+    def invalidate_item_count(cart_id):
+        """Drop the cached badge count of a cart, now and again after commit."""
+        cache_key = CartService._item_count_cache_key(cart_id)
+        cache.delete(cache_key)
+        transaction.on_commit(lambda: cache.delete(cache_key))
+    
+    @staticmethod
+    def invalidate_owner(cart):
+        """Drop the cached cart lookups of a cart's user and session."""
+        cache_keys = [CartService._owner_cache_key(session_id=cart.session_id)]
+        if cart.user_id:
+            cache_keys.append(f"cart_owner:user:{cart.user_id}")
+        cache.delete_many(cache_keys)
+        transaction.on_commit(lambda: cache.delete_many(cache_keys))
+    
     @staticmethod
     def migrate_session_cart_to_user(session_id, user):
         """Migrate session cart to user cart."""
@@ -619,22 +610,26 @@ class CartService:
             user_cart = Cart.objects.filter(user=user, is_active=True).first()
             
             if user_cart:
-                # Merge session cart items into user cart
-                for item in session_cart.items.all():
-                    existing_item = user_cart.items.filter(
-                        product_type=item.product_type,
-                        product_id=item.product_id,
-                        variant_id=item.variant_id
-                    ).first()
-                    
-                    if existing_item:
-                        # Update quantity
-                        existing_item.quantity += item.quantity
-                        existing_item.save()
-                    else:
-                        # Move item to user cart
-                        item.cart = user_cart
-                        item.save()
+                from .pricing import CartPricingEngine
+
+                # Merge session cart items into user cart, sharing one pricing catalog
+                session_items = list(session_cart.items.all())
+                with CartPricingEngine.batch(session_items):
+                    for item in session_items:
+                        existing_item = user_cart.items.filter(
+                            product_type=item.product_type,
+                            product_id=item.product_id,
+                            variant_id=item.variant_id
+                        ).first()
+                        
+                        if existing_item:
+                            # Update quantity
+                            existing_item.quantity += item.quantity
+                            existing_item.save()
+                        else:
+                            # Move item to user cart
+                            item.cart = user_cart
+                            item.save()
                 
                 # Delete session cart
                 session_cart.delete()
@@ -818,20 +813,134 @@ class CartService:
             'currency': cart.currency,
         }
     
+    # Rows per UPDATE in the set-based cleanup
+    CLEANUP_CHUNK_SIZE = 1000
+    CLEANUP_STATS_CACHE_KEY = 'cart_cleanup:last_run'
+    
     @staticmethod
-    def cleanup_expired_carts():
-        """Clean up expired carts and reservations."""
+    def _update_in_chunks(queryset, chunk_size, on_chunk=None, **values):
+        """
+        Apply an UPDATE to the rows of queryset, chunk_size rows per transaction.
+        Rows locked by other transactions are skipped (SKIP LOCKED) and left for
+        the next run. The update must take rows out of queryset. on_chunk is
+        called with the ids of each updated chunk.
+        Returns the number of rows updated.
+        """
+        updated = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    queryset.select_for_update(skip_locked=True)
+                    .order_by().values_list('pk', flat=True)[:chunk_size]
+                )
+                if not ids:
+                    return updated
+                updated += queryset.model.objects.filter(pk__in=ids).update(**values)
+                if on_chunk:
+                    on_chunk(ids)
+    
+    @staticmethod
+    def release_expired_reservations(now=None, chunk_size=CLEANUP_CHUNK_SIZE):
+        """Release every expired cart item reservation. Returns the number released."""
+        from django.utils import timezone
+        now = now or timezone.now()
+        
+        return CartService._update_in_chunks(
+            CartItem.objects.filter(is_reserved=True, reservation_expires_at__lt=now),
+            chunk_size,
+            is_reserved=False,
+            reservation_expires_at=None,
+            updated_at=now
+        )
+    
+    @staticmethod
+    def delete_expired_items(now=None, chunk_size=CLEANUP_CHUNK_SIZE):
+        """
+        Delete the items of expired carts; items expire with their cart.
+        Each transaction locks up to chunk_size carts (SKIP LOCKED), deletes
+        all their items in one DELETE and zeroes their stored totals, instead
+        of a totals update per item. Returns the number deleted.
+        """
+        from django.db.models import Exists, OuterRef
+        from django.utils import timezone
+        now = now or timezone.now()
+        
+        carts = Cart.objects.filter(expires_at__lt=now).filter(
+            Exists(CartItem.objects.filter(cart=OuterRef('pk')))
+        )
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                cart_ids = list(
+                    carts.select_for_update(skip_locked=True)
+                    .order_by().values_list('pk', flat=True)[:chunk_size]
+                )
+                if not cart_ids:
+                    return deleted
+                # Totals are reset below instead of one UPDATE per deleted item
+                with CartService.defer_totals(cart_ids):
+                    _, per_model = CartItem.objects.filter(cart_id__in=cart_ids).delete()
+                deleted += per_model.get(CartItem._meta.label, 0)
+                Cart.objects.filter(pk__in=cart_ids).update(
+                    item_count=0, total_quantity=0, subtotal=Decimal('0.00'), updated_at=now
+                )
+                for cart_id in cart_ids:
+                    CartService.invalidate_item_count(cart_id)
+    
+    @staticmethod
+    def deactivate_expired_carts(now=None, chunk_size=CLEANUP_CHUNK_SIZE):
+        """Mark expired active carts inactive. Returns the number deactivated."""
+        from django.utils import timezone
+        now = now or timezone.now()
+        
+        return CartService._update_in_chunks(
+            Cart.objects.filter(is_active=True, expires_at__lt=now),
+            chunk_size,
+            # The UPDATE skips the Cart post_save that drops the badge lookups
+            on_chunk=CartService.invalidate_owners,
+            is_active=False,
+            updated_at=now
+        )
+    
+    @staticmethod
+    def invalidate_owners(cart_ids):
+        """invalidate_owner for many carts, with one query."""
+        cache_keys = []
+        for session_id, user_id in Cart.objects.filter(pk__in=cart_ids).values_list('session_id', 'user_id'):
+            cache_keys.append(CartService._owner_cache_key(session_id=session_id))
+            if user_id:
+                cache_keys.append(f"cart_owner:user:{user_id}")
+        cache.delete_many(cache_keys)
+        transaction.on_commit(lambda: cache.delete_many(cache_keys))
+    
+    @staticmethod
+    def cleanup_expired_carts(chunk_size=CLEANUP_CHUNK_SIZE):
+        """
+        Release expired reservations, delete the items of expired carts and
+        deactivate expired carts with chunked bulk UPDATEs and DELETEs.
+        Returns run stats, which are also logged and cached under
+        CLEANUP_STATS_CACHE_KEY for monitoring.
+        """
+        import time
         from django.utils import timezone
         
-        # Clear expired carts
-        expired_carts = Cart.objects.filter(expires_at__lt=timezone.now())
-        for cart in expired_carts:
-            cart.clear_expired_items()
+        started = time.monotonic()
+        now = timezone.now()
+        items_released = CartService.release_expired_reservations(now, chunk_size)
+        items_deleted = CartService.delete_expired_items(now, chunk_size)
+        carts_deactivated = CartService.deactivate_expired_carts(now, chunk_size)
         
-        # Clear expired reservations
-        expired_items = CartItem.objects.filter(
-            is_reserved=True,
-            reservation_expires_at__lt=timezone.now()
+        stats = {
+            'carts_deactivated': carts_deactivated,
+            'items_released': items_released,
+            'items_deleted': items_deleted,
+            'duration_ms': int((time.monotonic() - started) * 1000),
+            'finished_at': timezone.now().isoformat(),
+        }
+        logger.info(
+            "Cart cleanup: carts_deactivated=%(carts_deactivated)d "
+            "items_released=%(items_released)d items_deleted=%(items_deleted)d "
+            "duration_ms=%(duration_ms)d", stats
         )
-        for item in expired_items:
-            item.release_reservation() 
\ No newline at end of file
+        cache.set(CartService.CLEANUP_STATS_CACHE_KEY, stats, None)
+        return stats
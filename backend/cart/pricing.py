@@ -0,0 +1,321 @@
+"""
+Cart pricing engine for Peykan Tourism Platform.
+Cart items are priced from a PricingCatalog that loads the tour, transfer and
+option pricing of a whole batch of items in a few queries, instead of querying
+per item, age group and option. CartItem.save() only reprices when a
+price-relevant field changed since the item was loaded.
+"""
+
+import threading
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+# Fields whose values determine the price of a cart item
+PRICE_FIELDS = (
+    'product_type', 'product_id', 'variant_id', 'quantity', 'unit_price',
+    'total_price', 'selected_options', 'booking_data',
+)
+
+# Fields written by the pricing engine
+PRICED_FIELDS = ('quantity', 'unit_price', 'total_price', 'options_total', 'booking_data')
+
+
+def _to_uuid(value):
+    """Return value as a UUID, or None when it is not one."""
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _option_price(option):
+    """Price of a selected option dict (final_price for car rentals, else price)."""
+    option_price_raw = option.get('final_price') or option.get('price')
+    if option_price_raw is None or option_price_raw == '':
+        return Decimal('0.00')
+    try:
+        return Decimal(str(option_price_raw))
+    except (ValueError, TypeError, ArithmeticError):
+        return Decimal('0.00')
+
+
+class PricingCatalog:
+    """
+    Pricing rows for a batch of cart items, keyed for in-memory lookups.
+    A catalog can be extended with more items; only missing keys are loaded.
+    """
+
+    def __init__(self):
+        # (tour_id, variant_id) -> variant base price
+        self.tour_variants = {}
+        # (tour_id, variant_id, age_group) -> final price
+        self.tour_pricing = {}
+        # (route_id, vehicle_type) -> TransferRoutePricing (with route)
+        self.transfer_pricing = {}
+        # option_id -> price
+        self.transfer_options = {}
+        self._loaded_variants = set()
+        self._loaded_routes = set()
+        self._loaded_options = set()
+
+    @classmethod
+    def load(cls, items):
+        catalog = cls()
+        catalog.extend(items)
+        return catalog
+
+    def extend(self, items):
+        """Load the pricing needed by items that is not in the catalog yet."""
+        variant_ids = set()
+        route_keys = set()
+        option_ids = set()
+
+        for item in items:
+            if item.product_type == 'tour' and item.booking_data.get('participants'):
+                variant_id = _to_uuid(item.variant_id)
+                if variant_id and variant_id not in self._loaded_variants:
+                    variant_ids.add(variant_id)
+            elif item.product_type == 'transfer' and item.booking_data:
+                route_key = (_to_uuid(item.product_id), item.variant_id)
+                if route_key[0] and route_key not in self._loaded_routes:
+                    route_keys.add(route_key)
+                for option in item.selected_options or []:
+                    if isinstance(option, dict) and 'id' in option:
+                        option_id = _to_uuid(option['id'])
+                        if option_id and option_id not in self._loaded_options:
+                            option_ids.add(option_id)
+
+        if variant_ids:
+            self._load_tours(variant_ids)
+        if route_keys:
+            self._load_routes(route_keys)
+        if option_ids:
+            self._load_options(option_ids)
+
+    def _load_tours(self, variant_ids):
+        from tours.models import TourVariant, TourPricing
+
+        for variant_id, tour_id, base_price in TourVariant.objects.filter(
+            id__in=variant_ids
+        ).values_list('id', 'tour_id', 'base_price'):
+            self.tour_variants[(tour_id, variant_id)] = base_price
+
+        for pricing in TourPricing.objects.filter(
+            variant_id__in=variant_ids
+        ).select_related('variant'):
+            self.tour_pricing[(pricing.tour_id, pricing.variant_id, pricing.age_group)] = (
+                pricing.final_price
+            )
+        self._loaded_variants |= variant_ids
+
+    def _load_routes(self, route_keys):
+        from transfers.models import TransferRoutePricing
+
+        for pricing in TransferRoutePricing.objects.filter(
+            route_id__in={route_id for route_id, _ in route_keys},
+            vehicle_type__in={vehicle_type for _, vehicle_type in route_keys}
+        ).select_related('route').prefetch_related('route__translations'):
+            self.transfer_pricing[(pricing.route_id, pricing.vehicle_type)] = pricing
+        self._loaded_routes |= route_keys
+
+    def _load_options(self, option_ids):
+        from transfers.models import TransferOption
+
+        self.transfer_options.update(
+            TransferOption.objects.filter(id__in=option_ids).values_list('id', 'price')
+        )
+        self._loaded_options |= option_ids
+
+
+_active = threading.local()
+
+
+class CartPricingEngine:
+    """
+    Service class for pricing cart items.
+    """
+
+    @staticmethod
+    @contextmanager
+    def batch(items=()):
+        """
+        Share one catalog between every item priced in the block, preloaded
+        for items. Use around loops that save several cart items.
+        """
+        previous = getattr(_active, 'catalog', None)
+        _active.catalog = previous or PricingCatalog()
+        _active.catalog.extend(items)
+        try:
+            yield _active.catalog
+        finally:
+            _active.catalog = previous
+
+    @staticmethod
+    def get_catalog(items):
+        """Return the active batch catalog extended with items, or a new one."""
+        catalog = getattr(_active, 'catalog', None)
+        if catalog is None:
+            return PricingCatalog.load(items)
+        catalog.extend(items)
+        return catalog
+
+    @staticmethod
+    def price_item(item, catalog=None, skip_price_calculation=False):
+        """
+        Recalculate options_total and, unless skip_price_calculation is set,
+        quantity, unit_price and total_price of a cart item in place.
+        """
+        options_total = Decimal('0.00')
+        for option in item.selected_options or []:
+            # Option ID strings are priced elsewhere
+            if isinstance(option, dict):
+                options_total += _option_price(option) * int(option.get('quantity', 1))
+        item.options_total = options_total
+
+        if skip_price_calculation:
+            return
+
+        # Base calculation, also the fallback when pricing rows are missing
+        item.total_price = (
+            Decimal(str(item.unit_price)) * Decimal(str(item.quantity))
+        ) + options_total
+
+        if item.product_type == 'tour' and item.booking_data.get('participants'):
+            catalog = catalog or CartPricingEngine.get_catalog([item])
+            CartPricingEngine._price_tour(item, catalog, options_total)
+        elif item.product_type == 'transfer' and item.booking_data:
+            catalog = catalog or CartPricingEngine.get_catalog([item])
+            CartPricingEngine._price_transfer(item, catalog)
+        elif item.product_type == 'car_rental' and item.booking_data:
+            try:
+                # Car rental totals always include insurance
+                item.total_price += Decimal(str(item.booking_data.get('insurance_total', '0.00')))
+            except (ValueError, TypeError, ArithmeticError):
+                pass
+
+    @staticmethod
+    def price_items(items, skip_price_calculation=False):
+        """Price a batch of cart items from one catalog."""
+        items = list(items)
+        catalog = CartPricingEngine.get_catalog(items)
+        for item in items:
+            CartPricingEngine.price_item(item, catalog, skip_price_calculation)
+        return items
+
+    @staticmethod
+    def reprice_cart(cart):
+        """
+        Price every item of a cart in one pass and write the results in a
+        single bulk update. Returns the repriced items.
+        """
+        from .models import CartItem
+
+        items = CartPricingEngine.price_items(cart.items.all())
+        for item in items:
+            item.sync_booking_counts()
+            item.mark_priced()
+            item._saved_totals = item.totals_state()
+        CartItem.objects.bulk_update(
+            items, list(PRICED_FIELDS) + list(CartItem.BOOKING_COUNT_FIELDS)
+        )
+        # bulk_update skips the signals that maintain the cart totals
+        cart.refresh_totals()
+        return items
+
+    @staticmethod
+    def _price_tour(item, catalog, options_total):
+        key = (_to_uuid(item.product_id), _to_uuid(item.variant_id))
+        base_price = catalog.tour_variants.get(key)
+        if base_price is None:
+            return
+
+        tour_total = Decimal('0.00')
+        total_participants = 0
+        for age_group, count in item.booking_data.get('participants', {}).items():
+            if count > 0:
+                total_participants += count
+                final_price = catalog.tour_pricing.get(key + (age_group,))
+                if final_price is not None:
+                    tour_total += Decimal(str(final_price)) * count
+                elif age_group != 'infant':
+                    # Fallback to variant base_price; infants are free by default
+                    tour_total += Decimal(str(base_price)) * count
+
+        # Quantity follows the participants
+        item.quantity = total_participants
+        item.unit_price = base_price
+        item.total_price = tour_total + options_total
+
+    @staticmethod
+    def _price_transfer(item, catalog):
+        pricing = catalog.transfer_pricing.get((_to_uuid(item.product_id), item.variant_id))
+        if pricing is None:
+            return
+
+        luggage_count = int(item.booking_data.get('luggage_count', 0))
+
+        transfer_options_total = Decimal('0.00')
+        for option in item.selected_options or []:
+            if isinstance(option, dict) and 'id' in option:
+                option_price = catalog.transfer_options.get(_to_uuid(option['id']))
+                if option_price is not None:
+                    transfer_options_total += option_price * int(option.get('quantity', 1))
+
+        # Transfer price is per vehicle, not per passenger
+        transfer_total = Decimal(str(pricing.base_price))
+        route = pricing.route
+
+        item.quantity = 1
+        item.unit_price = pricing.base_price
+        item.total_price = transfer_total + transfer_options_total
+        item.options_total = transfer_options_total
+
+        # Store comprehensive transfer booking information in booking_data
+        booking_data = item.booking_data
+        detailed_booking_data = booking_data.copy()
+        detailed_booking_data.update({
+            'vehicle_type': item.variant_id,
+            'vehicle_name': pricing.vehicle_name,
+            'max_passengers': pricing.max_passengers,
+            'max_luggage': pricing.max_luggage or 0,
+            'luggage_count': luggage_count,
+            'base_price': str(pricing.base_price),
+            'currency': pricing.currency,
+            'estimated_duration': route.estimated_duration_minutes,
+            'route_origin': route.origin,
+            'route_destination': route.destination,
+            # Pricing metadata for the detailed breakdown
+            'pricing_metadata': pricing.pricing_metadata or {},
+            'calculated_total': str(transfer_total + transfer_options_total),
+            'options_total': str(transfer_options_total),
+            'selected_options': item.selected_options,
+            # Route information
+            'route_name': route.name or '',
+            'peak_hour_surcharge': str(route.peak_hour_surcharge),
+            'midnight_surcharge': str(route.midnight_surcharge),
+            'round_trip_discount_percentage': str(route.round_trip_discount_percentage),
+            # Trip details
+            'trip_type': booking_data.get('trip_type', 'one_way'),
+            'outbound_date': booking_data.get('outbound_date', ''),
+            'outbound_time': booking_data.get('outbound_time', ''),
+            'return_date': booking_data.get('return_date', ''),
+            'return_time': booking_data.get('return_time', ''),
+            'pickup_address': booking_data.get('pickup_address', ''),
+            'dropoff_address': booking_data.get('dropoff_address', ''),
+            'pickup_instructions': booking_data.get('pickup_instructions', ''),
+            'dropoff_instructions': booking_data.get('dropoff_instructions', ''),
+            'contact_name': booking_data.get('contact_name', ''),
+            'contact_phone': booking_data.get('contact_phone', ''),
+            'special_requirements': booking_data.get('special_requirements', ''),
+            # Pricing breakdown
+            'outbound_price': booking_data.get('outbound_price', str(transfer_total)),
+            'return_price': booking_data.get('return_price', '0.00'),
+            'round_trip_discount': booking_data.get('round_trip_discount', '0.00'),
+            'final_price': str(transfer_total + transfer_options_total),
+            'surcharges': booking_data.get('surcharges', {}),
+            'discounts': booking_data.get('discounts', {}),
+        })
+        item.booking_data = detailed_booking_data
@@ -0,0 +1,257 @@
+"""
+Multi-item price quotes for the cart.
+A quote prices a list of items of any product type in one batched pass and
+adds the cart-level fees and taxes of CartService.calculate_totals. Nothing is
+written: no cart, cart item or session is created.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+from .models import Cart, CartItem, CartService
+from .pricing import CartPricingEngine, _to_uuid
+
+logger = logging.getLogger(__name__)
+
+
+class CartQuoteService:
+    """
+    Service class for pricing cart scenarios without writes.
+    """
+
+    @staticmethod
+    def build_item(data):
+        """Return an unsaved CartItem for one validated quote item."""
+        booking_data = dict(data.get('booking_data') or {})
+        for field in ('pickup_date', 'dropoff_date', 'pickup_time', 'dropoff_time'):
+            if data.get(field) and not booking_data.get(field):
+                booking_data[field] = str(data[field])
+
+        return CartItem(
+            product_type=data['product_type'],
+            product_id=data['product_id'],
+            variant_id=data.get('variant_id') or None,
+            quantity=data.get('quantity', 1),
+            unit_price=Decimal('0.00'),
+            selected_options=[dict(option) for option in data.get('selected_options') or []],
+            booking_data=booking_data,
+        )
+
+    @staticmethod
+    def quote(items_data, apply_fees=True, apply_taxes=True):
+        """
+        Price items_data (validated quote items) and return per-item prices
+        and cart totals. Items that cannot be priced carry an error and are
+        left out of the totals.
+        """
+        items = [CartQuoteService.build_item(data) for data in items_data]
+        errors = {}
+
+        by_type = {}
+        for index, item in enumerate(items):
+            by_type.setdefault(item.product_type, []).append((index, item))
+        if 'car_rental' in by_type:
+            CartQuoteService._prepare_car_rentals(by_type['car_rental'], errors)
+        if 'event' in by_type:
+            CartQuoteService._prepare_events(by_type['event'], errors)
+
+        # Tours and transfers are priced from one shared catalog, as in the cart
+        catalog = CartPricingEngine.get_catalog(
+            [item for index, item in enumerate(items) if index not in errors]
+        )
+        CartQuoteService._check_catalog(by_type.get('tour', []), by_type.get('transfer', []), catalog, errors)
+        priceable = [item for index, item in enumerate(items) if index not in errors]
+        for item in priceable:
+            CartPricingEngine.price_item(item, catalog)
+
+        results = []
+        subtotal = Decimal('0.00')
+        for index, item in enumerate(items):
+            result = {
+                'product_type': item.product_type,
+                'product_id': str(item.product_id),
+                'variant_id': item.variant_id,
+            }
+            if index in errors:
+                result['error'] = errors[index]
+            else:
+                subtotal += item.total_price
+                result.update({
+                    'quantity': item.quantity,
+                    'unit_price': float(item.unit_price),
+                    'options_total': float(item.options_total),
+                    'total_price': float(item.total_price),
+                    'currency': item.currency,
+                })
+            results.append(result)
+
+        currency = next((item.currency for item in priceable), 'USD')
+        totals = CartService.calculate_totals(
+            Cart(subtotal=subtotal, currency=currency), apply_fees, apply_taxes
+        )
+        return {
+            'items': results,
+            'totals': totals,
+        }
+
+    @staticmethod
+    def _check_catalog(tour_items, transfer_items, catalog, errors):
+        """Record an error for tour and transfer items the catalog cannot price."""
+        for index, item in tour_items:
+            participants = item.booking_data.get('participants') or {}
+            if not any(count > 0 for count in participants.values()):
+                errors[index] = 'Participants are required.'
+            elif (_to_uuid(item.product_id), _to_uuid(item.variant_id)) not in catalog.tour_variants:
+                errors[index] = 'Tour variant not found.'
+
+        for index, item in transfer_items:
+            if not item.booking_data:
+                errors[index] = 'Transfer trip details are required.'
+            elif (_to_uuid(item.product_id), item.variant_id) not in catalog.transfer_pricing:
+                errors[index] = 'Transfer pricing not found.'
+
+    @staticmethod
+    def _prepare_car_rentals(indexed_items, errors):
+        """Set the rental price, option prices and insurance of car rental items."""
+        from car_rentals.models import CarRental, CarRentalOption
+
+        rentals = CarRental.objects.in_bulk(
+            {_to_uuid(item.product_id) for _, item in indexed_items} - {None}
+        )
+        options = CarRentalOption.objects.prefetch_related('translations').in_bulk({
+            _to_uuid(option.get('id') or option.get('option_id'))
+            for _, item in indexed_items for option in item.selected_options
+        } - {None})
+
+        for index, item in indexed_items:
+            car_rental = rentals.get(_to_uuid(item.product_id))
+            booking_data = item.booking_data
+            if car_rental is None:
+                errors[index] = 'Car rental not found.'
+                continue
+            if not booking_data.get('pickup_date') or not booking_data.get('dropoff_date'):
+                errors[index] = 'Pickup and dropoff dates are required.'
+                continue
+
+            try:
+                days, hours, total_hours = car_rental.calculate_rental_duration(
+                    booking_data['pickup_date'], booking_data['dropoff_date'],
+                    booking_data.get('pickup_time') or '10:00',
+                    booking_data.get('dropoff_time') or '10:00'
+                )
+                base_price = car_rental.calculate_total_price(days, hours, include_insurance=False)
+            except (ValidationError, ValueError) as e:
+                errors[index] = str(e)
+                continue
+
+            # Same rules as CarRentalCartService: hourly rentals count as one day
+            billed_days = days if days > 0 else 1
+            selected_options = []
+            for option in item.selected_options:
+                option_obj = options.get(_to_uuid(option.get('id') or option.get('option_id')))
+                if option_obj is None:
+                    continue
+                option_price = option_obj.calculate_price(
+                    base_price, billed_days, option.get('quantity', 1)
+                )
+                selected_options.append({
+                    **option,
+                    'name': option.get('name') or option_obj.name,
+                    'final_price': float(option_price),
+                    'original_price': option.get('price', 0),
+                })
+
+            comprehensive_insurance = booking_data.get('comprehensive_insurance') or any(
+                'comprehensive' in (option.get('name') or '').lower() for option in selected_options
+            )
+            insurance_total = Decimal('0.00')
+            if comprehensive_insurance and car_rental.comprehensive_insurance_price:
+                insurance_total = Decimal(str(car_rental.comprehensive_insurance_price)) * billed_days
+
+            item.quantity = 1
+            item.unit_price = base_price
+            item.currency = car_rental.currency
+            item.selected_options = selected_options
+            booking_data.update({
+                'rental_days': days,
+                'rental_hours': hours,
+                'total_hours': total_hours,
+                'rental_type': 'hourly' if days == 0 else 'daily',
+                'comprehensive_insurance': bool(comprehensive_insurance),
+                'insurance_total': float(insurance_total),
+            })
+
+    @staticmethod
+    def _prepare_events(indexed_items, errors):
+        """
+        Set the ticket price of event items: the seat prices for seat
+        selections, else the section and ticket type price from the
+        performance pricing plan, else the event price per ticket.
+        """
+        from events.models import Event, EventOption, EventPerformance, Seat
+        from events.pricing_service import EventPriceCalculator
+
+        events = Event.objects.in_bulk(
+            {_to_uuid(item.product_id) for _, item in indexed_items} - {None}
+        )
+        performances = EventPerformance.objects.in_bulk({
+            _to_uuid(item.booking_data.get('performance_id')) for _, item in indexed_items
+        } - {None})
+        seat_prices = dict(Seat.objects.filter(id__in={
+            _to_uuid(seat.get('seat_id'))
+            for _, item in indexed_items for seat in item.booking_data.get('seats') or []
+        } - {None}).values_list('id', 'price'))
+        event_options = {
+            option.id: option for option in EventOption.objects.filter(
+                event_id__in=events.keys(), is_active=True
+            )
+        }
+        calculators = {}
+
+        for index, item in indexed_items:
+            event = events.get(_to_uuid(item.product_id))
+            if event is None:
+                errors[index] = 'Event not found.'
+                continue
+            booking_data = item.booking_data
+            performance = performances.get(_to_uuid(booking_data.get('performance_id')))
+
+            plan = None
+            if performance is not None and performance.event_id == event.id:
+                if performance.id not in calculators:
+                    calculators[performance.id] = EventPriceCalculator(event, performance)
+                plan = calculators[performance.id].get_plan()
+
+            seats = booking_data.get('seats')
+            ticket_type_id = booking_data.get('ticket_type_id') or item.variant_id
+            section_name = booking_data.get('section_name') or booking_data.get('section')
+            try:
+                if seats:
+                    item.quantity = 1
+                    item.unit_price = sum(
+                        (seat_prices.get(_to_uuid(seat.get('seat_id')), Decimal('0.00')) for seat in seats),
+                        Decimal('0.00')
+                    )
+                elif plan is not None and section_name and ticket_type_id:
+                    ticket = plan.get_ticket(section_name, ticket_type_id)
+                    item.unit_price = ticket.base_price * ticket.price_modifier
+                else:
+                    item.unit_price = event.price
+            except ValidationError as e:
+                errors[index] = ' '.join(e.messages)
+                continue
+
+            # Options are priced from the event, not from the request
+            selected_options = []
+            for option in item.selected_options:
+                event_option = event_options.get(_to_uuid(option.get('option_id')))
+                if event_option is not None and event_option.event_id == event.id:
+                    selected_options.append({
+                        **option,
+                        'name': event_option.name,
+                        'price': float(event_option.price),
+                    })
+            item.selected_options = selected_options
+            item.currency = getattr(event, 'currency', 'USD') or 'USD'
@@ -298,27 +298,19 @@ class CartSerializer(serializers.ModelSerializer):
     
     def get_total_items(self, obj):
         """Get total number of items in cart."""
-        return sum(item.quantity for item in obj.items.all())
+        return obj.total_quantity
     
     def get_distinct_items(self, obj):
         """Get number of distinct cart items (each product added counts as 1)."""
-        return obj.items.count()
+        return obj.item_count
     
     def get_subtotal(self, obj):
-        """Calculate subtotal using stored total_price for each item (handles tour complex pricing)."""
-        total = 0
-        for item in obj.items.all():
-            # Use the stored total_price from database which handles all pricing correctly
-            total += item.total_price
-        return total
+        """Cart subtotal, the sum of the stored item total_price values."""
+        return obj.subtotal
     
     def get_total_price(self, obj):
-        """Calculate total price using stored total_price for each item (handles tour complex pricing)."""
-        total = 0
-        for item in obj.items.all():
-            # Use the stored total_price from database which handles tour age-group pricing correctly
-            total += item.total_price
-        return total
+        """Cart total price, the sum of the stored item total_price values."""
+        return obj.subtotal
 
     def _calculate_cart_totals(self, obj):
         from .models import CartService
@@ -566,6 +558,34 @@ class UpdateCartItemSerializer(serializers.Serializer):
         return value
 
 
+class QuoteItemSerializer(UpdateCartItemSerializer):
+    """Serializer for one item of a cart quote."""
+    
+    product_type = serializers.ChoiceField(choices=[
+        ('tour', _('Tour')),
+        ('event', _('Event')),
+        ('transfer', _('Transfer')),
+        ('car_rental', _('Car Rental')),
+    ])
+    product_id = serializers.UUIDField()
+    variant_id = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    quantity = serializers.IntegerField(min_value=1, max_value=50, default=1)
+    
+    # Car rental specific fields, also accepted inside booking_data
+    pickup_date = serializers.DateField(required=False, allow_null=True)
+    dropoff_date = serializers.DateField(required=False, allow_null=True)
+    pickup_time = serializers.TimeField(required=False, allow_null=True)
+    dropoff_time = serializers.TimeField(required=False, allow_null=True)
+
+
+class CartQuoteSerializer(serializers.Serializer):
+    """Serializer for pricing several cart items in one call."""
+    
+    items = QuoteItemSerializer(many=True, allow_empty=False, max_length=50)
+    apply_fees = serializers.BooleanField(default=True)
+    apply_taxes = serializers.BooleanField(default=True)
+
+
 class CartItemCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating cart items."""
     
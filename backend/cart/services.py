@@ -6,7 +6,9 @@ from typing import List, Dict, Any, Optional
 from decimal import Decimal
 from django.db import transaction
 from .models import Cart, CartItem
+from events.exceptions import SeatNotAvailableError
 from events.models import Event, EventPerformance, TicketType
+from events.seat_holds import SeatHoldService
 from events.logging_config import get_cart_logger
 
 logger = get_cart_logger()
@@ -23,13 +25,19 @@ class EventCartService:
         ticket_type_id: str,
         seats: List[Dict[str, Any]],
         selected_options: Optional[List[Dict[str, Any]]] = None,
-        special_requests: str = ""
+        special_requests: str = "",
+        reservation_id: Optional[str] = None
     ) -> tuple[CartItem, bool]:
         """
         Add event seats to cart with proper merging logic.
+        The seats are held in the seat hold engine, under reservation_id when
+        the client already holds them; seats held by others are rejected.
         
         Returns:
             tuple: (cart_item, is_new_item)
+        
+        Raises:
+            SeatNotAvailableError: if a seat is sold or held by someone else
         """
         logger.info(f"Adding {len(seats)} seats to cart for event {event_id}, performance {performance_id}")
         
@@ -43,6 +51,17 @@ class EventCartService:
             booking_data__performance_id=performance_id,
             booking_data__ticket_type_id=ticket_type_id
         ).first()
+
+        # Seats already in the item are held already
+        existing_seat_ids = {
+            seat.get('seat_id') for seat in (existing_item.booking_data or {}).get('seats', [])
+        } if existing_item else set()
+        unavailable = SeatHoldService.hold_selected_seats(
+            performance_id, [seat for seat in seats if seat.get('seat_id') not in existing_seat_ids],
+            reservation_id
+        )
+        if unavailable:
+            raise SeatNotAvailableError(f"Seats {unavailable} are not available")
         
         # If existing item found, merge seats
         if existing_item:
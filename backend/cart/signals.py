@@ -0,0 +1,86 @@
+"""
+Django signals for Cart.
+Keep the stored cart totals in step with every cart item write, inside the
+same transaction as the write, and drop cached cart lookups when carts change.
+"""
+
+from decimal import Decimal
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Cart, CartItem, CartService
+
+# CartItem fields counted in the cart totals, as in CartItem.totals_state()
+TOTALS_FIELDS = (('cart', 'cart_id'), ('quantity',), ('total_price',))
+
+# Cart fields that decide which user or session a cart is found for
+OWNER_FIELDS = {'session_id', 'user', 'user_id', 'is_active'}
+
+
+def _apply_delta(item, cart_id, items, quantity, amount):
+    """Apply a totals delta in the database and to the item's loaded cart, if any."""
+    amount = Decimal(str(amount or 0))
+    currency = item.currency if items > 0 else None
+    Cart.adjust_totals(cart_id, items, quantity, amount, currency)
+
+    cart = item._state.fields_cache.get('cart')
+    if cart is not None and cart.pk == cart_id:
+        if currency and not cart.item_count:
+            cart.currency = currency
+        cart.item_count += items
+        cart.total_quantity += quantity
+        cart.subtotal += amount
+
+
+@receiver(post_save, sender=Cart)
+def invalidate_cart_owner_on_save(sender, instance, update_fields=None, **kwargs):
+    """Carts created, deactivated or handed to a user change the cached lookups."""
+    if update_fields is None or OWNER_FIELDS & set(update_fields):
+        CartService.invalidate_owner(instance)
+
+
+@receiver(post_delete, sender=Cart)
+def invalidate_cart_owner_on_delete(sender, instance, **kwargs):
+    """Deleted carts are no longer found for their user or session."""
+    CartService.invalidate_owner(instance)
+    CartService.invalidate_item_count(instance.pk)
+
+
+@receiver(post_save, sender=CartItem)
+def update_cart_totals_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Add new items to the cart totals and apply changes of saved ones."""
+    old = None if created else getattr(instance, '_saved_totals', None)
+    new = instance.totals_state()
+
+    if old is None and not created:
+        # Previous values unknown: recount the cart
+        instance.cart.refresh_totals()
+    elif created:
+        _apply_delta(instance, new[0], 1, new[1], new[2])
+    else:
+        if update_fields is not None:
+            # Fields left out of update_fields keep their stored values
+            new = tuple(
+                value if any(name in update_fields for name in names) else old_value
+                for names, value, old_value in zip(TOTALS_FIELDS, new, old)
+            )
+        if new[0] != old[0]:
+            _apply_delta(instance, old[0], -1, -old[1], -Decimal(str(old[2] or 0)))
+            _apply_delta(instance, new[0], 1, new[1], new[2])
+        elif new != old:
+            _apply_delta(
+                instance, new[0], 0, new[1] - old[1],
+                Decimal(str(new[2] or 0)) - Decimal(str(old[2] or 0))
+            )
+
+    instance._saved_totals = new
+
+
+@receiver(post_delete, sender=CartItem)
+def update_cart_totals_on_delete(sender, instance, **kwargs):
+    """Remove deleted items from the cart totals."""
+    cart_id, quantity, total_price = getattr(instance, '_saved_totals', None) or instance.totals_state()
+    if CartService.totals_deferred(cart_id):
+        return
+    _apply_delta(instance, cart_id, -1, -quantity, -Decimal(str(total_price or 0)))
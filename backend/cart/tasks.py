@@ -5,11 +5,9 @@ Celery tasks for Cart app.
 import logging
 from celery import shared_task
 from django.utils import timezone
-from django.db import transaction
 from django.core.cache import cache
 
-from .models import Cart, CartItem
-from .services import CartService
+from .models import Cart, CartItem, CartService
 
 logger = logging.getLogger(__name__)
 
@@ -23,72 +21,21 @@ def cleanup_expired_carts(self):
     try:
         logger.info("Starting cleanup of expired carts...")
         
-        now = timezone.now()
-        
-        # Find expired carts
-        expired_carts = Cart.objects.filter(
-            expires_at__lt=now,
-            is_active=True
-        )
-        
-        if not expired_carts.exists():
-            logger.info("No expired carts found")
-            return {
-                'status': 'success',
-                'message': 'No expired carts found',
-                'carts_cleaned': 0,
-                'items_released': 0
-            }
-        
-        logger.info(f"Found {expired_carts.count()} expired carts")
-        
-        total_carts_cleaned = 0
-        total_items_released = 0
-        
-        # Process each expired cart
-        for cart in expired_carts:
-            try:
-                with transaction.atomic():
-                    # Get expired items in this cart
-                    expired_items = cart.items.filter(
-                        is_reserved=True,
-                        reservation_expires_at__lt=now
-                    )
-                    
-                    items_released = 0
-                    for item in expired_items:
-                        try:
-                            # Release reservation
-                            item.release_reservation()
-                            items_released += 1
-                            
-                        except Exception as e:
-                            logger.error(f"Error releasing reservation for item {item.id}: {str(e)}")
-                            continue
-                    
-                    # Mark cart as inactive
-                    cart.is_active = False
-                    cart.save()
-                    
-                    total_carts_cleaned += 1
-                    total_items_released += items_released
-                    
-                    logger.info(f"Cleaned cart {cart.id}: {items_released} items released")
-                    
-            except Exception as e:
-                logger.error(f"Error cleaning cart {cart.id}: {str(e)}")
-                continue
+        stats = CartService.cleanup_expired_carts()
         
         # Clear cart cache
         cache.delete('cart_summary')
         
-        logger.info(f"Successfully cleaned {total_carts_cleaned} expired carts, released {total_items_released} items")
-        
         return {
             'status': 'success',
-            'message': f'Cleaned {total_carts_cleaned} expired carts, released {total_items_released} items',
-            'carts_cleaned': total_carts_cleaned,
-            'items_released': total_items_released
+            'message': (
+                f"Cleaned {stats['carts_deactivated']} expired carts, released {stats['items_released']} items, "
+                f"deleted {stats['items_deleted']} items"
+            ),
+            'carts_cleaned': stats['carts_deactivated'],
+            'items_released': stats['items_released'],
+            'items_deleted': stats['items_deleted'],
+            'duration_ms': stats['duration_ms']
         }
         
     except Exception as e:
@@ -97,7 +44,8 @@ def cleanup_expired_carts(self):
             'status': 'error',
             'message': f'Error: {str(e)}',
             'carts_cleaned': 0,
-            'items_released': 0
+            'items_released': 0,
+            'items_deleted': 0
         }
 
 
@@ -110,39 +58,7 @@ def cleanup_expired_reservations(self):
     try:
         logger.info("Starting cleanup of expired cart reservations...")
         
-        now = timezone.now()
-        
-        # Find expired reserved cart items
-        expired_items = CartItem.objects.filter(
-            is_reserved=True,
-            reservation_expires_at__lt=now
-        ).select_related('cart')
-        
-        if not expired_items.exists():
-            logger.info("No expired cart reservations found")
-            return {
-                'status': 'success',
-                'message': 'No expired cart reservations found',
-                'items_released': 0
-            }
-        
-        logger.info(f"Found {expired_items.count()} expired cart reservations")
-        
-        total_released = 0
-        
-        # Process each expired item
-        for item in expired_items:
-            try:
-                with transaction.atomic():
-                    # Release reservation
-                    item.release_reservation()
-                    total_released += 1
-                    
-                    logger.info(f"Released reservation for cart item {item.id}")
-                    
-            except Exception as e:
-                logger.error(f"Error releasing reservation for item {item.id}: {str(e)}")
-                continue
+        total_released = CartService.release_expired_reservations()
         
         # Clear cart cache
         cache.delete('cart_summary')
@@ -0,0 +1,335 @@
+import uuid
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tours.models import Tour, TourCategory, TourPricing, TourVariant
+from .models import Cart, CartItem, CartService
+from .pricing import CartPricingEngine
+from .tasks import cleanup_expired_carts
+from .views import AddToCartView
+
+
+class CartCleanupTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.expired_cart = Cart.objects.create(session_id='expired', expires_at=now - timedelta(hours=1))
+        self.live_cart = Cart.objects.create(session_id='live', expires_at=now + timedelta(hours=1))
+        self.expired_item = self._add_item(self.expired_cart, now - timedelta(minutes=5))
+        self.held_item = self._add_item(self.live_cart, now + timedelta(minutes=5))
+
+    def _add_item(self, cart, reservation_expires_at):
+        return CartItem.objects.create(
+            cart=cart, product_type='event', product_id=cart.id,
+            booking_date=timezone.now().date(), booking_time=time(20),
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00'),
+            is_reserved=True, reservation_expires_at=reservation_expires_at
+        )
+
+    def test_cleanup_uses_bulk_updates(self):
+        self._add_item(self.expired_cart, None)
+        with CaptureQueriesContext(connection) as queries:
+            stats = CartService.cleanup_expired_carts(chunk_size=1)
+        # Released items, emptied carts and deactivated carts, no per-row saves
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual((statements.count('UPDATE'), statements.count('DELETE')), (3, 1))
+        self.assertEqual((stats['carts_deactivated'], stats['items_released'], stats['items_deleted']), (1, 1, 2))
+        self.assertEqual(cache.get(CartService.CLEANUP_STATS_CACHE_KEY)['items_released'], 1)
+
+        self.held_item.refresh_from_db()
+        self.expired_cart.refresh_from_db()
+        self.assertFalse(self.expired_cart.items.exists())
+        self.assertEqual((self.expired_cart.item_count, self.expired_cart.subtotal), (0, Decimal('0.00')))
+        self.assertTrue(self.held_item.is_reserved)
+        self.assertFalse(self.expired_cart.is_active)
+        self.assertTrue(Cart.objects.get(pk=self.live_cart.pk).is_active)
+
+    def test_nothing_references_cart_items(self):
+        # delete_expired_items deletes cart items in bulk and resets the cart totals;
+        # a relation to CartItem needs its own handling there (e.g. PROTECT would fail the cleanup)
+        self.assertEqual([rel.related_model for rel in CartItem._meta.related_objects], [])
+
+    def test_deactivated_carts_drop_cached_lookups(self):
+        self.assertEqual(CartService.find_cart_id(session_id='expired'), self.expired_cart.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            CartService.deactivate_expired_carts()
+        self.assertIsNone(CartService.find_cart_id(session_id='expired'))
+
+    def test_task_reports_counts(self):
+        result = cleanup_expired_carts.apply().get()
+        self.assertEqual(
+            (result['carts_cleaned'], result['items_released'], result['items_deleted']), (1, 1, 1)
+        )
+
+
+class CartBadgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_count_does_not_create_carts(self):
+        response = self.client.get(reverse('cart:cart_count'))
+        self.assertEqual(response.json(), {'count': 0})
+        self.assertFalse(Cart.objects.exists())
+
+        response = self.client.get(reverse('cart:cart_summary'))
+        self.assertEqual(response.json()['total_items'], 0)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_count_follows_cart_and_supports_etag(self):
+        session = self.client.session
+        session.save()
+        self.client.get(reverse('cart:cart_count'))
+
+        cart = Cart.objects.create(
+            session_id=session.session_key, expires_at=timezone.now() + timedelta(hours=1)
+        )
+        CartItem.objects.create(
+            cart=cart, product_type='event', product_id=cart.id,
+            booking_date=timezone.now().date(), booking_time=time(20),
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+        )
+
+        response = self.client.get(reverse('cart:cart_count'))
+        self.assertEqual(response.json(), {'count': 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('cart:cart_count'), HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+        # Served from cache (session handling aside)
+        self.assertFalse([query for query in queries.captured_queries if 'cart_' in query['sql']])
+
+
+class OverbookingCheckTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='booker', password='x')
+        self.cart = Cart.objects.create(
+            session_id='booking', user=self.user, expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.product_id = uuid.uuid4()
+        self.item = CartItem.objects.create(
+            cart=self.cart, product_type='event', product_id=self.product_id,
+            booking_date=timezone.now().date(), booking_time=time(20),
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+        )
+
+    def _check(self, booking_date):
+        request = RequestFactory().post('/')
+        request.session = SessionStore()
+        return AddToCartView().check_overbooking_limits(request, self.user, {
+            'product_type': 'event',
+            'product_id': str(self.product_id),
+            'booking_date': booking_date,
+        }, self.cart)
+
+    def test_duplicate_found_with_one_query(self):
+        self.assertTrue(self.item.booking_key.endswith(self.item.booking_date.isoformat()))
+
+        with self.assertNumQueries(1):
+            blocked, message = self._check(self.item.booking_date.isoformat())
+        self.assertTrue(blocked)
+
+        blocked, message = self._check((self.item.booking_date + timedelta(days=1)).isoformat())
+        self.assertEqual((blocked, message), (False, None))
+
+
+class CartQuoteTests(TestCase):
+    def setUp(self):
+        from tours.models import Tour, TourCategory, TourPricing, TourVariant
+
+        category = TourCategory.objects.create(slug='quote')
+        self.tour = Tour.objects.create(
+            slug='quote-tour', title='Quote Tour', description='d', short_description='s',
+            category=category, price=Decimal('80.00'), city='Tehran', country='Iran',
+            duration_hours=4, pickup_time=time(8), start_time=time(9), end_time=time(13),
+            max_participants=20
+        )
+        self.variant = TourVariant.objects.create(
+            tour=self.tour, name='Normal', base_price=Decimal('50.00'), capacity=10
+        )
+        TourPricing.objects.create(
+            tour=self.tour, variant=self.variant, age_group='child', factor=Decimal('0.5')
+        )
+
+    def test_quote_prices_items_without_writes(self):
+        response = self.client.post(reverse('cart:cart_quote'), {
+            'items': [
+                {
+                    'product_type': 'tour', 'product_id': str(self.tour.id),
+                    'variant_id': str(self.variant.id),
+                    'booking_data': {'participants': {'adult': 2, 'child': '2'}},
+                },
+                {
+                    'product_type': 'car_rental', 'product_id': str(uuid.uuid4()),
+                    'pickup_date': '2030-01-01', 'dropoff_date': '2030-01-03',
+                },
+            ],
+            'apply_taxes': False,
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        tour_quote, rental_quote = response.json()['items']
+        self.assertEqual((tour_quote['quantity'], tour_quote['total_price']), (4, 150.0))
+        self.assertEqual(rental_quote['error'], 'Car rental not found.')
+        self.assertEqual(response.json()['totals']['subtotal'], 150.0)
+        self.assertEqual(response.json()['totals']['fees_total'], 4.5)
+        self.assertFalse(Cart.objects.exists())
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_unknown_tours_and_transfers_are_errors(self):
+        response = self.client.post(reverse('cart:cart_quote'), {
+            'items': [
+                {
+                    'product_type': 'tour', 'product_id': str(uuid.uuid4()),
+                    'variant_id': str(uuid.uuid4()), 'booking_data': {'participants': {'adult': 1}},
+                },
+                {
+                    'product_type': 'tour', 'product_id': str(self.tour.id),
+                    'variant_id': str(self.variant.id), 'booking_data': {},
+                },
+                {
+                    'product_type': 'transfer', 'product_id': str(uuid.uuid4()),
+                    'variant_id': 'sedan', 'booking_data': {'trip_type': 'one_way'},
+                },
+            ],
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['error'] for item in response.json()['items']],
+            ['Tour variant not found.', 'Participants are required.', 'Transfer pricing not found.']
+        )
+        self.assertEqual(response.json()['totals']['subtotal'], 0.0)
+
+
+class CartPricingTests(TestCase):
+    def setUp(self):
+        category = TourCategory.objects.create(slug='nature')
+        self.tour = Tour.objects.create(
+            slug='lake-tour', title='Lake Tour', description='d', short_description='s',
+            category=category, price=Decimal('80.00'), city='Tehran', country='Iran',
+            duration_hours=4, pickup_time=time(8), start_time=time(9), end_time=time(13),
+            max_participants=20
+        )
+        self.variant = TourVariant.objects.create(
+            tour=self.tour, name='Normal', base_price=Decimal('50.00'), capacity=10
+        )
+        TourPricing.objects.create(
+            tour=self.tour, variant=self.variant, age_group='child', factor=Decimal('0.5')
+        )
+        self.cart = Cart.objects.create(
+            session_id='pricing', expires_at=timezone.now() + timedelta(days=1)
+        )
+
+    def _add_item(self, participants):
+        return CartItem.objects.create(
+            cart=self.cart, product_type='tour', product_id=self.tour.id,
+            booking_date=timezone.now().date() + timedelta(days=3), booking_time=time(9),
+            variant_id=str(self.variant.id), unit_price=Decimal('0.00'), total_price=Decimal('0.00'),
+            booking_data={'participants': participants}
+        )
+
+    def test_tour_item_priced_from_catalog(self):
+        item = self._add_item({'adult': 2, 'child': 2, 'infant': 1})
+        # Adults fall back to the variant base price, infants are free
+        self.assertEqual((item.quantity, item.total_price), (5, Decimal('150.00')))
+
+    def test_reprices_only_on_price_changes(self):
+        item = CartItem.objects.get(pk=self._add_item({'adult': 1}).pk)
+
+        with self.assertNumQueries(1):
+            item.create_reservation()
+
+        item.booking_data = {'participants': {'adult': 1, 'child': 2}}
+        item.save()
+        self.assertEqual(item.total_price, Decimal('100.00'))
+
+    def test_cart_priced_in_one_pass(self):
+        for participants in ({'adult': 1}, {'child': 1}, {'adult': 3}):
+            self._add_item(participants)
+        TourPricing.objects.filter(age_group='child').update(factor=Decimal('1.0'))
+
+        # Items, variants, age-group pricing, one bulk update and the totals recount
+        with self.assertNumQueries(7):
+            items = CartPricingEngine.reprice_cart(self.cart)
+        self.assertEqual(sum(item.total_price for item in items), Decimal('250.00'))
+        self.assertEqual(self.cart.subtotal, Decimal('250.00'))
+
+    def test_cart_totals_follow_item_writes(self):
+        first = self._add_item({'adult': 2})
+        second = self._add_item({'child': 1})
+        self.assertEqual((self.cart.item_count, self.cart.total_quantity, self.cart.subtotal),
+                         (2, 3, Decimal('125.00')))
+
+        second = CartItem.objects.get(pk=second.pk)
+        second.booking_data = {'participants': {'child': 2}}
+        second.save()
+        first.delete()
+
+        other = Cart.objects.create(session_id='other', expires_at=self.cart.expires_at)
+        second.cart = other
+        second.save()
+
+        self.cart.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (0, Decimal('0.00')))
+        self.assertEqual((other.item_count, other.total_quantity, other.subtotal),
+                         (1, 2, Decimal('50.00')))
+
+class MergeCartTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='merger', password='x')
+        expires_at = timezone.now() + timedelta(hours=1)
+        self.user_cart = Cart.objects.create(session_id='user-cart', user=self.user, expires_at=expires_at)
+        self.guest_cart = Cart.objects.create(session_id='guest-cart', expires_at=expires_at)
+        self.user_item = self._add_item(self.user_cart)
+
+    def _add_item(self, cart, product_id=None, booking_date=None):
+        return CartItem.objects.create(
+            cart=cart, product_type='event', product_id=product_id or uuid.uuid4(),
+            booking_date=booking_date or timezone.now().date(), booking_time=time(20),
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+        )
+
+    def test_all_new_guest_items_are_moved(self):
+        guest_items = [self._add_item(self.guest_cart) for _ in range(3)]
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('cart:merge_cart'), {'session_key': 'guest-cart'}, content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['debug_info']['merged_items_count'], 3)
+        moved = set(self.user_cart.items.values_list('pk', flat=True))
+        self.assertEqual(len(moved), 4)
+        self.assertTrue({item.pk for item in guest_items} <= moved)
+        self.assertFalse(Cart.objects.filter(pk=self.guest_cart.pk).exists())
+
+    def test_items_merged_into_existing_lines_are_counted(self):
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        self._add_item(self.guest_cart, product_id=self.user_item.product_id, booking_date=tomorrow)
+        self._add_item(self.guest_cart)
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('cart:merge_cart'), {'session_key': 'guest-cart'}, content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['debug_info']['merged_items_count'], 2)
+        self.assertEqual(self.user_cart.items.count(), 2)
+        self.user_item.refresh_from_db()
+        self.assertEqual(self.user_item.quantity, 2)
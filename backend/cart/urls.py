@@ -13,6 +13,7 @@ urlpatterns = [
     path('summary/', views.CartSummaryView.as_view(), name='cart_summary'),
     path('count/', views.cart_count_view, name='cart_count'),
     path('check-capacity/', views.CheckCapacityView.as_view(), name='check_capacity'),
+    path('quote/', views.CartQuoteView.as_view(), name='cart_quote'),
     
     # Cart items
     path('add/', views.AddToCartView.as_view(), name='add_to_cart'),
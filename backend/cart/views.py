@@ -18,10 +18,14 @@ from django.db.models import Sum
 
 logger = logging.getLogger(__name__)
 
+from core.models import make_booking_key, parse_booking_counts
+from core.rate_limit import RateLimiter
+from events.exceptions import SeatNotAvailableError
 from .models import Cart, CartItem, CartService
+from .pricing import CartPricingEngine
 from .serializers import (
     CartSerializer, CartItemSerializer, AddToCartSerializer,
-    UpdateCartItemSerializer, CartItemCreateSerializer
+    UpdateCartItemSerializer, CartItemCreateSerializer, CartQuoteSerializer
 )
 from orders.models import Order, OrderItem
 
@@ -59,124 +63,67 @@ class AddToCartView(APIView):
         """
         Comprehensive overbooking validation for both guest and authenticated users.
         Prevents duplicate bookings for same product/date/variant across cart and orders.
+        All sources are checked in one query on the indexed booking_key.
         """
         try:
-            from core.models import SystemSettings
-            from orders.models import Order
+            from django.db.models import Q, Value
             
-            settings = SystemSettings.get_settings()
             product_type = product_data.get('product_type')
-            product_id = product_data.get('product_id')
-            variant_id = product_data.get('variant_id')
             
-            # For tours, use schedule_id for precise matching
+            # For tours, use schedule_id for precise matching; other products use booking_date
             if product_type == 'tour':
-                schedule_id = product_data.get('booking_data', {}).get('schedule_id')
+                schedule_id = parse_booking_counts(product_data.get('booking_data'))[0]
                 if not schedule_id:
                     return False, "Tour schedule information missing"
-                
-                # Check current cart for same tour/schedule/variant
-                if cart:
-                    existing_cart_items = cart.items.filter(
-                        product_type='tour',
-                        product_id=product_id,
-                        variant_id=variant_id,
-                        booking_data__schedule_id=schedule_id
-                    )
-                    
-                    if existing_cart_items.exists():
-                        return True, "این تور در سبد خرید شما موجود است. ابتدا سفارش قبلی را تکمیل کنید."
-                
-                # For authenticated users, check pending orders
-                if user and user.is_authenticated:
-                    existing_pending_orders = Order.objects.filter(
-                        user=user,
-                        items__product_type='tour',
-                        items__product_id=product_id,
-                        items__variant_id=variant_id,
-                        items__booking_data__schedule_id=schedule_id,
-                        status='pending'
-                    ).exists()
-                    
-                    if existing_pending_orders:
-                        return True, "شما قبلاً این تور را رزرو کرده‌اید. ابتدا سفارش قبلی را تکمیل کنید."
-                
-                # For guest users, check session-based cart items
-                if not user or not user.is_authenticated:
-                    session_key = request.session.session_key
-                    if session_key:
-                        from cart.models import Cart
-                        guest_carts = Cart.objects.filter(
-                            session_id__startswith=session_key,
-                            user__isnull=True,
-                            is_active=True
-                        )
-                        
-                        for guest_cart in guest_carts:
-                            existing_items = guest_cart.items.filter(
-                                product_type='tour',
-                                product_id=product_id,
-                                variant_id=variant_id,
-                                booking_data__schedule_id=schedule_id
-                            )
-                            
-                            if existing_items.exists():
-                                return True, "این تور در سبد خرید شما موجود است. ابتدا سفارش قبلی را تکمیل کنید."
-            
-            # For events and other products, use booking_date
+                booking_date = None
+                product_label = 'این تور'
             else:
+                schedule_id = None
                 booking_date = product_data.get('booking_date')
                 if not booking_date:
                     return False, "Booking date information missing"
-                
-                # Check current cart for same product/date/variant
-                if cart:
-                    existing_cart_items = cart.items.filter(
-                        product_type=product_type,
-                        product_id=product_id,
-                        variant_id=variant_id,
-                        booking_date=booking_date
+                product_label = 'این محصول'
+            
+            booking_key = make_booking_key(
+                product_type, product_data.get('product_id'), product_data.get('variant_id'),
+                schedule_id, booking_date
+            )
+            
+            # Current cart, plus the guest's other session carts
+            cart_owner = Q(cart=cart) if cart else None
+            if not user or not user.is_authenticated:
+                session_key = request.session.session_key
+                if session_key:
+                    guest_carts = Q(
+                        cart__session_id__startswith=session_key,
+                        cart__user__isnull=True,
+                        cart__is_active=True
                     )
-                    
-                    if existing_cart_items.exists():
-                        return True, "این محصول در سبد خرید شما موجود است. ابتدا سفارش قبلی را تکمیل کنید."
-                
-                # For authenticated users, check pending orders
-                if user and user.is_authenticated:
-                    existing_pending_orders = Order.objects.filter(
-                        user=user,
-                        items__product_type=product_type,
-                        items__product_id=product_id,
-                        items__variant_id=variant_id,
-                        items__booking_date=booking_date,
-                        status='pending'
-                    ).exists()
-                    
-                    if existing_pending_orders:
-                        return True, "شما قبلاً این محصول را رزرو کرده‌اید. ابتدا سفارش قبلی را تکمیل کنید."
-                
-                # For guest users, check session-based cart items
-                if not user or not user.is_authenticated:
-                    session_key = request.session.session_key
-                    if session_key:
-                        from cart.models import Cart
-                        guest_carts = Cart.objects.filter(
-                            session_id__startswith=session_key,
-                            user__isnull=True,
-                            is_active=True
-                        )
-                        
-                        for guest_cart in guest_carts:
-                            existing_items = guest_cart.items.filter(
-                                product_type=product_type,
-                                product_id=product_id,
-                                variant_id=variant_id,
-                                booking_date=booking_date
-                            )
-                            
-                            if existing_items.exists():
-                                return True, "این محصول در سبد خرید شما موجود است. ابتدا سفارش قبلی را تکمیل کنید."
+                    cart_owner = guest_carts if cart_owner is None else cart_owner | guest_carts
+            
+            sources = []
+            if cart_owner is not None:
+                sources.append(
+                    CartItem.objects.filter(cart_owner, booking_key=booking_key)
+                    .order_by().annotate(source=Value('cart')).values_list('source')
+                )
+            # For authenticated users, pending orders
+            if user and user.is_authenticated:
+                sources.append(
+                    OrderItem.objects.filter(
+                        booking_key=booking_key, order__user=user, order__status='pending'
+                    ).order_by().annotate(source=Value('order')).values_list('source')
+                )
+            if not sources:
+                return False, None
+            
+            query = sources[0].union(*sources[1:]) if len(sources) > 1 else sources[0].distinct()
+            found = {source for (source,) in query}
             
+            if 'cart' in found:
+                return True, f"{product_label} در سبد خرید شما موجود است. ابتدا سفارش قبلی را تکمیل کنید."
+            if 'order' in found:
+                return True, f"شما قبلاً {product_label} را رزرو کرده‌اید. ابتدا سفارش قبلی را تکمیل کنید."
             return False, None
             
         except Exception as e:
@@ -195,28 +142,8 @@ class AddToCartView(APIView):
         if query_params.get('dry_run') == '1':
             return True
         
-        # Get system settings
-        from core.models import SystemSettings
-        settings = SystemSettings.get_settings()
-        
-        # Get client identifier
-        if request.user.is_authenticated:
-            client_id = f"user_{request.user.id}"
-            rate_limit = settings.cart_rate_limit_user
-        else:
-            client_id = f"ip_{request.META.get('REMOTE_ADDR', 'unknown')}"
-            rate_limit = settings.cart_rate_limit_guest
-        
-        # Rate limit based on settings
-        cache_key = f"cart_rate_limit_{client_id}"
-        current_requests = cache.get(cache_key, 0)
-        
-        if current_requests >= rate_limit:
-            return False
-        
-        # Increment counter
-        cache.set(cache_key, current_requests + 1, 60)  # 60 seconds
-        return True
+        # Per-user / per-IP limits come from SystemSettings (see core.rate_limit)
+        return RateLimiter.check_request(request, 'cart').allowed
     
     def check_capacity_availability(self, product_data):
         """Check if capacity is available for the requested booking."""
@@ -269,6 +196,28 @@ class AddToCartView(APIView):
 
                 return is_available, error_message
 
+            elif product_type == 'event':
+                from events.seat_holds import SeatHoldService
+
+                booking_data = product_data.get('booking_data', {}) or {}
+                performance_id = booking_data.get('performance_id')
+                seats = [seat for seat in booking_data.get('seats') or [] if seat.get('seat_id')]
+                if not performance_id or not seats:
+                    return True, None
+
+                # Seats sold, or held in the seat hold engine by someone else
+                seats_by_reservation = {}
+                for seat in seats:
+                    reservation_id = seat.get('reservation_id') or booking_data.get('reservation_id')
+                    seats_by_reservation.setdefault(reservation_id, []).append(seat['seat_id'])
+                unavailable = []
+                for reservation_id, seat_ids in seats_by_reservation.items():
+                    unavailable += SeatHoldService.get_unavailable_seats(performance_id, seat_ids, reservation_id)
+                if unavailable:
+                    return False, f"Seats {unavailable} are not available"
+
+                return True, None
+
             else:
                 # For other product types, no capacity check needed
                 return True, None
@@ -295,7 +244,7 @@ class AddToCartView(APIView):
         
         try:
             # 1. Check cart item count limit
-            current_items = cart.items.count()
+            current_items = cart.item_count
             if current_items >= max_items:
                 if user_type == 'guest':
                     return False, f"Guest users can add maximum {max_items} items to cart. Please register to add more items.", 'GUEST_CART_LIMIT_EXCEEDED'
@@ -303,7 +252,7 @@ class AddToCartView(APIView):
                     return False, f"Authenticated users can add maximum {max_items} items to cart. Please remove some items to add more.", 'CART_ITEMS_LIMIT_EXCEEDED'
             
             # 2. Check cart total limit
-            cart_total = sum(Decimal(str(item.total_price)) for item in cart.items.all() if item.total_price)
+            cart_total = cart.subtotal
 
             # Use calculated total_price if available, otherwise fall back to unit_price calculation
             if data.get('total_price'):
@@ -327,13 +276,8 @@ class AddToCartView(APIView):
                     return False, f"Too many guest carts created (max {settings.cart_max_carts_guest}). Please register or wait before creating new carts."
                 
                 # Check rate limiting for guest cart operations
-                guest_rate_key = f"guest_cart_rate_{ip_address}"
-                guest_requests = cache.get(guest_rate_key, 0)
-                if guest_requests >= settings.cart_rate_limit_guest:
+                if not RateLimiter.check_request(request, 'guest_cart').allowed:
                     return False, f"Too many cart operations (max {settings.cart_rate_limit_guest}/minute). Please wait before trying again."
-                
-                # Increment counters
-                cache.set(guest_rate_key, guest_requests + 1, 60)
             
             return True, None, None
             
@@ -434,8 +378,13 @@ class AddToCartView(APIView):
             # Track guest cart creation
             if not request.user.is_authenticated:
                 ip_address = request.META.get('REMOTE_ADDR', 'unknown')
-                guest_cart_count = cache.get(f"guest_carts_{ip_address}", 0)
-                cache.set(f"guest_carts_{ip_address}", guest_cart_count + 1, 3600)  # 1 hour expiry
+                guest_carts_key = f"guest_carts_{ip_address}"
+                if not cache.add(guest_carts_key, 1, 3600):  # 1 hour expiry
+                    try:
+                        cache.incr(guest_carts_key)
+                    except ValueError:
+                        # Expired or evicted since the add
+                        cache.set(guest_carts_key, 1, 3600)
 
         # Get product instance based on product_type and product_id
         product_type = data['product_type']
@@ -808,7 +757,7 @@ class AddToCartView(APIView):
                     product_type='tour',
                     product_id=data['product_id'],
                     variant_id=data.get('variant_id'),
-                    booking_data__schedule_id=data.get('booking_data', {}).get('schedule_id')
+                    schedule_id=parse_booking_counts(data.get('booking_data'))[0]
                 ).first()
             else:
                 existing_item = cart.items.filter(
@@ -1448,6 +1397,7 @@ class AddEventSeatsToCartView(APIView):
             seats = request.data['seats']
             selected_options = request.data.get('selected_options', [])
             special_requests = request.data.get('special_requests', '')
+            reservation_id = request.data.get('reservation_id')
             
             # Validate seats
             if not seats or not isinstance(seats, list):
@@ -1469,7 +1419,8 @@ class AddEventSeatsToCartView(APIView):
                 ticket_type_id=ticket_type_id,
                 seats=seats,
                 selected_options=selected_options,
-                special_requests=special_requests
+                special_requests=special_requests,
+                reservation_id=reservation_id
             )
             
             if is_new_item:
@@ -1483,12 +1434,38 @@ class AddEventSeatsToCartView(APIView):
                     'cart_item': CartItemSerializer(cart_item).data
                 }, status=status.HTTP_200_OK)
             
+        except SeatNotAvailableError as e:
+            return Response({
+                'message': str(e),
+                'code': 'SEATS_NOT_AVAILABLE'
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({
                 'message': f'Error adding seats to cart: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class CartQuoteView(APIView):
+    """
+    Price several cart items in one call, with cart-level fees and taxes.
+    Replaces one AddToCartView dry run per item; nothing is written.
+    """
+    
+    permission_classes = [permissions.AllowAny]
+    
+    def post(self, request):
+        from .quote import CartQuoteService
+        
+        serializer = CartQuoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        return Response(CartQuoteService.quote(
+            data['items'], data['apply_fees'], data['apply_taxes']
+        ))
+
+
 class CheckCapacityView(APIView):
     """Check real-time capacity availability."""
 
@@ -1532,19 +1509,25 @@ class CartSummaryView(APIView):
     permission_classes = [permissions.AllowAny]  # Allow guest access
 
     def get(self, request):
-        user = request.user
-
-        # Get consistent session ID
-        session_id = CartService.get_session_id(request)
-
-        cart = CartService.get_or_create_cart(
-            session_id=session_id,
-            user=user
-        )
+        # Read-only: visitors without a cart get an empty summary and no cart is created
+        cart_id = CartService.find_request_cart_id(request)
+        cart = Cart.objects.filter(pk=cart_id, is_active=True).first() if cart_id else None
+        if cart is None:
+            return Response({
+                'total_items': 0,
+                'distinct_items': 0,
+                'subtotal': 0.0,
+                'fees_total': 0.0,
+                'tax_total': 0.0,
+                'grand_total': 0.0,
+                'total_price': 0.0,
+                'currency': 'USD',
+                'items': []
+            })
 
-        # Calculate totals using correct pricing logic
-        total_items = sum(item.quantity for item in cart.items.all())
-        distinct_items = cart.items.count()
+        # Totals are stored on the cart
+        total_items = cart.total_quantity
+        distinct_items = cart.item_count
 
         # Use CartSerializer methods for consistency (including fees/tax/grand total)
         cart_serializer = CartSerializer(cart)
@@ -1554,10 +1537,8 @@ class CartSummaryView(APIView):
         tax_total = cart_serializer.get_tax_total(cart)
         grand_total = cart_serializer.get_grand_total(cart)
 
-        # Get currency (use first item's currency or default)
-        currency = 'USD'
-        if cart.items.exists():
-            currency = cart.items.first().currency
+        # Currency of the first item added (or the cart default)
+        currency = cart.currency
 
         return Response({
             'total_items': total_items,
@@ -1725,11 +1706,11 @@ def merge_cart_view(request):
     from decimal import Decimal
     
     settings = SystemSettings.get_settings()
-    current_items = user_cart.items.count()
-    current_total = sum(Decimal(str(item.total_price)) for item in user_cart.items.all() if item.total_price)
+    current_items = user_cart.item_count
+    current_total = user_cart.subtotal
     
-    guest_items = session_cart.items.count()
-    guest_total = sum(Decimal(str(item.total_price)) for item in session_cart.items.all() if item.total_price)
+    guest_items = session_cart.item_count
+    guest_total = session_cart.subtotal
     
     # Check if merge would exceed limits
     if current_items + guest_items > settings.cart_max_items_user:
@@ -1782,7 +1763,7 @@ def merge_cart_view(request):
                     items__product_type='tour',
                     items__product_id=session_item.product_id,
                     items__variant_id=session_item.variant_id,
-                    items__booking_data__schedule_id=schedule_id,
+                    items__schedule_id=session_item.schedule_id,
                     status='pending'
                 ).exists()
                 
@@ -1799,7 +1780,7 @@ def merge_cart_view(request):
                     product_type='tour',
                     product_id=session_item.product_id,
                     variant_id=session_item.variant_id,
-                    booking_data__schedule_id=schedule_id
+                    schedule_id=session_item.schedule_id
                 ).exists()
                 
                 if existing_cart_item:
@@ -1861,68 +1842,74 @@ def merge_cart_view(request):
         merged_items = 0
         skipped_items = 0
         
-        for session_item in session_cart.items.all():
-            # Check if item already exists in user cart
-            # For tours, also check schedule_id to prevent duplicates
-            if session_item.product_type == 'tour':
-                existing_item = user_cart.items.filter(
-                    product_type=session_item.product_type,
-                    product_id=session_item.product_id,
-                    variant_id=session_item.variant_id,
-                    booking_data__schedule_id=session_item.booking_data.get('schedule_id')
-                ).first()
-            else:
-                existing_item = user_cart.items.filter(
-                    product_type=session_item.product_type,
-                    product_id=session_item.product_id,
-                    variant_id=session_item.variant_id
-                ).first()
+        # Items being merged share one pricing catalog
+        session_items = list(session_cart.items.all())
+        with CartPricingEngine.batch(session_items):
+            for session_item in session_items:
+                skipped_before = skipped_items
+                # Check if item already exists in user cart
+                # For tours, also check schedule_id to prevent duplicates
+                if session_item.product_type == 'tour':
+                    existing_item = user_cart.items.filter(
+                        product_type=session_item.product_type,
+                        product_id=session_item.product_id,
+                        variant_id=session_item.variant_id,
+                        schedule_id=session_item.schedule_id
+                    ).first()
+                else:
+                    existing_item = user_cart.items.filter(
+                        product_type=session_item.product_type,
+                        product_id=session_item.product_id,
+                        variant_id=session_item.variant_id
+                    ).first()
             
-            if existing_item:
-                # Check if merging quantities would exceed limits
-                new_quantity = existing_item.quantity + session_item.quantity
-                if new_quantity > 10:  # Max quantity per item
-                    skipped_items += 1
-                    print(f"🔍 Skipped item due to quantity limit: {session_item.product_type} #{session_item.product_id}")
-                    continue
+                if existing_item:
+                    # Check if merging quantities would exceed limits
+                    new_quantity = existing_item.quantity + session_item.quantity
+                    if new_quantity > 10:  # Max quantity per item
+                        skipped_items += 1
+                        print(f"🔍 Skipped item due to quantity limit: {session_item.product_type} #{session_item.product_id}")
+                        continue
 
-                # Merge with retry mechanism
-                for attempt in range(max_retries):
-                    try:
-                        existing_item.quantity = new_quantity
-                        existing_item.save()
-                        print(f"🔍 Merged existing item: {session_item.product_type} #{session_item.product_id} (qty: {session_item.quantity})")
-                        break
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            print(f"⚠️ Item merge attempt {attempt + 1} failed: {e}")
-                            import time
-                            time.sleep(0.05 * (attempt + 1))
-                            continue
-                        else:
-                            print(f"❌ Failed to merge existing item after {max_retries} attempts: {e}")
-                            skipped_items += 1
+                    # Merge with retry mechanism
+                    for attempt in range(max_retries):
+                        try:
+                            existing_item.quantity = new_quantity
+                            existing_item.save()
+                            print(f"🔍 Merged existing item: {session_item.product_type} #{session_item.product_id} (qty: {session_item.quantity})")
                             break
-        else:
-            # Move item with retry mechanism
-            for attempt in range(max_retries):
-                try:
-                    session_item.cart = user_cart
-                    session_item.save()
-                    print(f"🔍 Moved guest item to user cart: {session_item.product_type} #{session_item.product_id} (qty: {session_item.quantity})")
-                    break
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        print(f"⚠️ Item move attempt {attempt + 1} failed: {e}")
-                        import time
-                        time.sleep(0.05 * (attempt + 1))
-                        continue
-                    else:
-                        print(f"❌ Failed to move item after {max_retries} attempts: {e}")
-                        skipped_items += 1
-                        break
+                        except Exception as e:
+                            if attempt < max_retries - 1:
+                                print(f"⚠️ Item merge attempt {attempt + 1} failed: {e}")
+                                import time
+                                time.sleep(0.05 * (attempt + 1))
+                                continue
+                            else:
+                                print(f"❌ Failed to merge existing item after {max_retries} attempts: {e}")
+                                skipped_items += 1
+                                break
+                else:
+                    # Move item with retry mechanism
+                    for attempt in range(max_retries):
+                        try:
+                            session_item.cart = user_cart
+                            session_item.save()
+                            print(f"🔍 Moved guest item to user cart: {session_item.product_type} #{session_item.product_id} (qty: {session_item.quantity})")
+                            break
+                        except Exception as e:
+                            if attempt < max_retries - 1:
+                                print(f"⚠️ Item move attempt {attempt + 1} failed: {e}")
+                                import time
+                                time.sleep(0.05 * (attempt + 1))
+                                continue
+                            else:
+                                print(f"❌ Failed to move item after {max_retries} attempts: {e}")
+                                skipped_items += 1
+                                break
             
-            merged_items += 1
+                # Count merged and moved items, but not ones that failed above
+                if skipped_items == skipped_before:
+                    merged_items += 1
         
         # Delete session cart with retry mechanism
         for attempt in range(max_retries):
@@ -1947,6 +1934,7 @@ def merge_cart_view(request):
                         print(f"⚠️ Failed to clear session cart items: {e2}")
                         # Continue anyway - the merge was successful
     
+    user_cart.refresh_from_db(fields=Cart.TOTAL_FIELDS)
     return Response({
         'message': f'Successfully merged {merged_items} items from session cart.',
         'cart': CartSerializer(user_cart).data,
@@ -1963,17 +1951,19 @@ def merge_cart_view(request):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Allow guest access
 def cart_count_view(request):
-    """Get cart item count for navbar."""
-    
-    user = request.user
-    
-    # Get consistent session ID
-    session_id = CartService.get_session_id(request)
-    
-    cart = CartService.get_or_create_cart(
-        session_id=session_id,
-        user=user
-    )
+    """
+    Get cart item count for navbar.
+    Read-only and cached: visitors without a cart get 0 and no cart or session
+    is created. Supports If-None-Match.
+    """
     # Business requirement: count each cart line as 1 regardless of internal quantities
-    count = cart.items.count()
-    return Response({'count': count})
\ No newline at end of file
+    count = CartService.get_item_count(request)
+    etag = f'"cart-count-{count}"'
+    
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response({'count': count})
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
\ No newline at end of file
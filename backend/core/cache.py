@@ -0,0 +1,42 @@
+"""
+Named caches for the Peykan Tourism Platform.
+Aliases are configured in settings.CACHE_NAMESPACES: 'hot' for read-through
+query caches, 'rate_limit' for rate limit counters, 'pricing' for prices and
+pricing plans and 'sessions' for session storage. In production they all live
+on Redis, shared by web and Celery workers.
+"""
+
+import fnmatch
+import logging
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger(__name__)
+
+hot_cache = ConnectionProxy(caches, 'hot')
+rate_limit_cache = ConnectionProxy(caches, 'rate_limit')
+pricing_cache = ConnectionProxy(caches, 'pricing')
+
+
+def delete_pattern(pattern, alias='default'):
+    """
+    Delete the keys matching a glob pattern from a cache on any backend.
+    Uses django-redis delete_pattern when available and scans locmem caches.
+    Returns the number of deleted keys.
+    """
+    backend = caches[alias]
+    if hasattr(backend, 'delete_pattern'):
+        return backend.delete_pattern(pattern)
+
+    if isinstance(backend, LocMemCache):
+        full_pattern = backend.make_key(pattern)
+        with backend._lock:
+            keys = [key for key in backend._cache if fnmatch.fnmatchcase(key, full_pattern)]
+            for key in keys:
+                backend._delete(key)
+        return len(keys)
+
+    logger.warning(f"Cache '{alias}' does not support pattern deletion; {pattern} not deleted")
+    return 0
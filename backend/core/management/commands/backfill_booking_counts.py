@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from cart.models import CartItem
+from core.models import backfill_booking_counts, backfill_booking_keys
+from orders.models import OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Populate schedule, participant count and booking key columns of cart and order items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk update.')
+
+    def handle(self, *args, **options):
+        for model in (OrderItem, CartItem):
+            updated = backfill_booking_counts(model, options['batch_size'])
+            updated += backfill_booking_keys(model, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Updated {updated} {model._meta.verbose_name_plural}"))
@@ -3,9 +3,14 @@ Core models for Peykan Tourism Platform.
 Following Clean Architecture and DDD principles.
 """
 
+import threading
+import time
 import uuid
 from decimal import Decimal
-from django.db import models
+from types import MappingProxyType
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
@@ -160,6 +165,154 @@ class BaseBookingModel(BaseModel):
         super().save(*args, **kwargs)
 
 
+def parse_booking_counts(booking_data):
+    """
+    Extract (schedule_id, adult_count, child_count, infant_count) from booking_data.
+    Missing or malformed values count as None / 0.
+    """
+    booking_data = booking_data if isinstance(booking_data, dict) else {}
+
+    try:
+        schedule_id = uuid.UUID(str(booking_data.get('schedule_id')))
+    except (TypeError, ValueError, AttributeError):
+        schedule_id = None
+
+    participants = booking_data.get('participants') or {}
+    if not isinstance(participants, dict):
+        participants = {}
+
+    counts = []
+    for age_group in ('adult', 'child', 'infant'):
+        try:
+            counts.append(max(0, int(participants.get(age_group) or 0)))
+        except (TypeError, ValueError):
+            counts.append(0)
+
+    return (schedule_id, *counts)
+
+
+def backfill_booking_counts(model, batch_size=1000):
+    """
+    Populate the booking count columns of every row of model from booking_data.
+    Works with historical models in migrations. Returns the number of rows updated.
+    """
+    fields = ['schedule_id', 'adult_count', 'child_count', 'infant_count']
+    updated = 0
+    batch = []
+    for item in model.objects.only('id', 'booking_data', *fields).iterator(chunk_size=batch_size):
+        values = parse_booking_counts(item.booking_data)
+        if values == tuple(getattr(item, field) for field in fields):
+            continue
+        for field, value in zip(fields, values):
+            setattr(item, field, value)
+        batch.append(item)
+        if len(batch) >= batch_size:
+            updated += model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        updated += model.objects.bulk_update(batch, fields)
+    return updated
+
+
+def _normalize_id(value):
+    """UUIDs in canonical form, anything else as a string ('' for None)."""
+    if value is None:
+        return ''
+    try:
+        return str(uuid.UUID(str(value)))
+    except (TypeError, ValueError, AttributeError):
+        return str(value)
+
+
+def make_booking_key(product_type, product_id, variant_id, schedule_id=None, booking_date=None):
+    """
+    Normalized key of the slot an item books: tours by schedule, other products
+    by booking date. The owner is matched through the item's cart or order,
+    which change hands on login and cart merge.
+    """
+    if product_type == 'tour':
+        slot = _normalize_id(schedule_id) if schedule_id else ''
+    else:
+        slot = booking_date.isoformat() if hasattr(booking_date, 'isoformat') else str(booking_date or '')
+    return ':'.join([
+        product_type or '', _normalize_id(product_id), _normalize_id(variant_id), slot
+    ])
+
+
+def backfill_booking_keys(model, batch_size=1000):
+    """
+    Populate booking_key on every row of model. Works with historical models in
+    migrations. Returns the number of rows updated.
+    """
+    fields = ['product_type', 'product_id', 'variant_id', 'schedule_id', 'booking_date']
+    updated = 0
+    batch = []
+    for item in model.objects.only('id', 'booking_key', *fields).iterator(chunk_size=batch_size):
+        booking_key = make_booking_key(*(getattr(item, field) for field in fields))
+        if booking_key == item.booking_key:
+            continue
+        item.booking_key = booking_key
+        batch.append(item)
+        if len(batch) >= batch_size:
+            updated += model.objects.bulk_update(batch, ['booking_key'])
+            batch = []
+    if batch:
+        updated += model.objects.bulk_update(batch, ['booking_key'])
+    return updated
+
+
+class BaseBookingCountsModel(BaseModel):
+    """
+    Abstract base model for items that carry booking_data.
+    Schedule and participant counts are mirrored into indexed columns on save,
+    so capacity checks can filter and SUM in the database instead of scanning JSON.
+    """
+    schedule_id = models.UUIDField(null=True, blank=True, db_index=True, verbose_name=_('Schedule ID'))
+    adult_count = models.PositiveIntegerField(default=0, verbose_name=_('Adult count'))
+    child_count = models.PositiveIntegerField(default=0, verbose_name=_('Child count'))
+    infant_count = models.PositiveIntegerField(default=0, verbose_name=_('Infant count'))
+    booking_key = models.CharField(
+        max_length=200, blank=True, db_index=True, verbose_name=_('Booking key')
+    )
+
+    BOOKING_COUNT_FIELDS = ('schedule_id', 'adult_count', 'child_count', 'infant_count')
+    # Fields booking_key is derived from
+    BOOKING_KEY_SOURCE_FIELDS = ('product_type', 'product_id', 'variant_id', 'booking_date', 'booking_data')
+
+    class Meta:
+        abstract = True
+
+    @property
+    def capacity_count(self):
+        """Participants that occupy capacity (adults and children; infants are free)."""
+        return self.adult_count + self.child_count
+
+    def sync_booking_counts(self):
+        """Copy schedule and participant counts from booking_data into their columns."""
+        (
+            self.schedule_id, self.adult_count, self.child_count, self.infant_count
+        ) = parse_booking_counts(self.booking_data)
+
+    def sync_booking_key(self):
+        """Derive booking_key from the product, variant and schedule or date."""
+        self.booking_key = make_booking_key(
+            self.product_type, self.product_id, self.variant_id, self.schedule_id, self.booking_date
+        )
+
+    def save(self, *args, **kwargs):
+        self.sync_booking_counts()
+        self.sync_booking_key()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'booking_data' in update_fields:
+                update_fields |= set(self.BOOKING_COUNT_FIELDS)
+            if update_fields & set(self.BOOKING_KEY_SOURCE_FIELDS):
+                update_fields.add('booking_key')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+
 class BaseOptionModel(BaseModel):
     """
     Abstract base model for product options (extras, add-ons).
@@ -220,6 +373,35 @@ class BaseScheduleModel(BaseModel):
         return False 
 
 
+class SystemSettingsSnapshot:
+    """
+    Read-only copy of the SystemSettings values, shared by all requests of a
+    process. version changes whenever the settings are saved.
+    """
+
+    def __init__(self, values, version):
+        object.__setattr__(self, '_values', MappingProxyType(dict(values)))
+        object.__setattr__(self, 'version', version)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SystemSettings snapshot is read-only; save a SystemSettings instance instead')
+
+    def __repr__(self):
+        return f"<SystemSettingsSnapshot version={self.version}>"
+
+
+# Process-local snapshot, checked against the shared version stamp
+_settings_snapshot = None
+_settings_checked_at = 0.0
+_settings_lock = threading.Lock()
+
+
 class SystemSettings(BaseModel):
     """
     System-wide settings for cart and order management.
@@ -296,9 +478,11 @@ class SystemSettings(BaseModel):
     def __str__(self):
         return f"System Settings (ID: {self.id})"
     
+    VERSION_CACHE_KEY = 'system_settings:version'
+
     @classmethod
-    def get_settings(cls):
-        """Get current system settings, create default if none exists."""
+    def load(cls):
+        """Load the settings row from the database, create default if none exists."""
         settings, created = cls.objects.get_or_create(
             id=1,
             defaults={
@@ -315,4 +499,62 @@ class SystemSettings(BaseModel):
                 'guest_booking_timeout': 15,
             }
         )
-        return settings 
\ No newline at end of file
+        return settings
+
+    @classmethod
+    def get_settings(cls):
+        """
+        Get current system settings as a read-only snapshot.
+
+        The snapshot lives in process memory; every few seconds its version is
+        compared with the shared cache stamp, which is bumped on save, so
+        changes reach all workers without a query per read.
+        """
+        global _settings_snapshot, _settings_checked_at
+
+        now = time.monotonic()
+        snapshot = _settings_snapshot
+        check_interval = getattr(django_settings, 'SYSTEM_SETTINGS_CHECK_INTERVAL', 5)
+        if snapshot is not None and now - _settings_checked_at < check_interval:
+            return snapshot
+
+        with _settings_lock:
+            version = cache.get(cls.VERSION_CACHE_KEY)
+            if version is None:
+                version = uuid.uuid4().hex
+                if not cache.add(cls.VERSION_CACHE_KEY, version, None):
+                    version = cache.get(cls.VERSION_CACHE_KEY, version)
+
+            snapshot = _settings_snapshot
+            if snapshot is None or snapshot.version != version:
+                instance = cls.load()
+                snapshot = SystemSettingsSnapshot(
+                    {field.attname: field.to_python(getattr(instance, field.attname))
+                     for field in cls._meta.concrete_fields},
+                    version
+                )
+                _settings_snapshot = snapshot
+            _settings_checked_at = now
+            return snapshot
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop this process's snapshot and bump the shared version for other workers."""
+        global _settings_snapshot
+        _settings_snapshot = None
+        cache.set(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+    def save(self, *args, **kwargs):
+        # No snapshot can hold values of a row that did not exist yet
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            self.invalidate_cache()
+            # Bump again after commit so no worker keeps values read mid-transaction
+            transaction.on_commit(self.invalidate_cache)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_cache()
+        transaction.on_commit(self.invalidate_cache)
+        return result
@@ -0,0 +1,199 @@
+"""
+Shared rate limiting for the Peykan Tourism Platform.
+Sliding-window counters with atomic increments: a Lua script on Redis, or
+cache add/incr on the 'rate_limit' cache (locmem in development and tests).
+Limits are declared per scope in RATE_LIMITS and can be applied from
+services, views or as a DRF throttle.
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import rate_limit_cache
+
+logger = logging.getLogger(__name__)
+
+
+# scope -> {'user': (limit, window_seconds), 'anon': (limit, window_seconds)}
+# A limit given as a string names a SystemSettings field, so admins can tune it.
+# Extend or override per deployment with settings.RATE_LIMITS.
+DEFAULT_RATE_LIMITS = {
+    'api': {'user': (1000, 3600), 'anon': (100, 3600)},
+    'cart': {'user': ('cart_rate_limit_user', 60), 'anon': ('cart_rate_limit_guest', 60)},
+    'guest_cart': {'anon': ('cart_rate_limit_guest', 60)},
+    'order': {'user': (5, 10)},
+    'login': {'user': (5, 300), 'anon': (5, 300)},
+    'password_reset': {'user': (3, 3600), 'anon': (3, 3600)},
+}
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'limit', 'remaining', 'retry_after'])
+
+
+# KEYS: current window, previous window  ARGV: limit, window_ms, elapsed_ms
+# Returns {allowed, hits in the sliding window}
+SLIDING_WINDOW_SCRIPT = """
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local window = tonumber(ARGV[2])
+local weighted = math.floor(previous * (window - tonumber(ARGV[3])) / window)
+if weighted + current >= tonumber(ARGV[1]) then
+    return {0, weighted + current}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {1, weighted + current}
+"""
+
+
+class CacheRateLimitStore:
+    """Sliding-window counters on the rate_limit cache, using atomic incr."""
+
+    def hit(self, current_key, previous_key, limit, window, elapsed):
+        try:
+            rate_limit_cache.add(current_key, 0, window * 2)
+            current = rate_limit_cache.incr(current_key)
+        except ValueError:
+            # Key expired between add and incr
+            rate_limit_cache.add(current_key, 1, window * 2)
+            current = 1
+
+        weighted = int(rate_limit_cache.get(previous_key, 0) * (window - elapsed) / window)
+        if weighted + current > limit:
+            # Rejected requests do not count against the window
+            try:
+                rate_limit_cache.decr(current_key)
+            except ValueError:
+                pass
+            return False, weighted + current - 1
+        return True, weighted + current
+
+
+class RedisRateLimitStore:
+    """Sliding-window counters on Redis, checked and incremented in one Lua call."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self._hit = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, current_key, previous_key, limit, window, elapsed):
+        allowed, hits = self._hit(
+            keys=[current_key, previous_key],
+            args=[limit, int(window * 1000), int(elapsed * 1000)]
+        )
+        return bool(allowed), int(hits)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Service class for sliding-window rate limits.
+    """
+
+    @staticmethod
+    def get_store():
+        """Return the configured counter store, created once per process."""
+        global _store
+        if _store is None:
+            with _store_lock:
+                if _store is None:
+                    backend = getattr(settings, 'RATE_LIMIT_BACKEND', 'cache')
+                    if backend == 'redis':
+                        _store = RedisRateLimitStore(settings.RATE_LIMIT_REDIS_URL)
+                    else:
+                        _store = CacheRateLimitStore()
+        return _store
+
+    @staticmethod
+    def get_rule(scope, authenticated):
+        """Return (limit, window_seconds) for a scope, or None when it is not limited."""
+        rules = {**DEFAULT_RATE_LIMITS, **getattr(settings, 'RATE_LIMITS', {})}
+        rule = rules.get(scope, {}).get('user' if authenticated else 'anon')
+        if rule is None:
+            return None
+
+        limit, window = rule
+        if isinstance(limit, str):
+            from core.models import SystemSettings
+            limit = getattr(SystemSettings.get_settings(), limit)
+        return int(limit), int(window)
+
+    @staticmethod
+    def hit(scope, identifier, limit, window_seconds):
+        """
+        Count one request of identifier against limit per window_seconds.
+        Returns a RateLimitResult; denied requests are not counted.
+        """
+        now = time.time()
+        window_index, elapsed = divmod(now, window_seconds)
+        prefix = f"rl:{scope}:{window_seconds}:{identifier}"
+
+        try:
+            allowed, hits = RateLimiter.get_store().hit(
+                f"{prefix}:{int(window_index)}",
+                f"{prefix}:{int(window_index) - 1}",
+                limit, window_seconds, elapsed
+            )
+        except Exception as e:
+            # Fail open: a counter outage must not take the site down
+            logger.error(f"Rate limiter unavailable for {scope}: {e}")
+            return RateLimitResult(True, limit, limit, 0)
+
+        return RateLimitResult(
+            allowed,
+            limit,
+            max(0, limit - hits),
+            0 if allowed else int(window_seconds - elapsed) + 1
+        )
+
+    @staticmethod
+    def get_identifier(request):
+        """user_<id> for authenticated requests, ip_<address> otherwise."""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user_{user.pk}"
+        return f"ip_{BaseThrottle().get_ident(request)}"
+
+    @staticmethod
+    def check(scope, identifier, authenticated):
+        """Apply the scope's rule to identifier. Unlimited scopes always pass."""
+        rule = RateLimiter.get_rule(scope, authenticated)
+        if rule is None:
+            return RateLimitResult(True, None, None, 0)
+        return RateLimiter.hit(scope, identifier, *rule)
+
+    @staticmethod
+    def check_request(request, scope, identifier=None):
+        """Apply the scope's rule to a request. Unlimited scopes always pass."""
+        user = getattr(request, 'user', None)
+        authenticated = user is not None and user.is_authenticated
+        return RateLimiter.check(
+            scope, identifier or RateLimiter.get_identifier(request), authenticated
+        )
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    DRF throttle backed by RateLimiter. The scope comes from the view's
+    rate_limit_scope attribute and defaults to 'api'.
+    """
+
+    default_scope = 'api'
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'rate_limit_scope', self.default_scope)
+        self.result = RateLimiter.check_request(request, scope)
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after
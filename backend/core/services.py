@@ -8,7 +8,8 @@ from typing import Dict, List, Tuple, Optional
 from django.core.cache import cache
 from django.db import transaction
 from django.contrib.auth import get_user_model
-from .models import SystemSettings
+from .models import SystemSettings, SystemSettingsSnapshot, parse_booking_counts
+from .rate_limit import RateLimiter
 
 User = get_user_model()
 
@@ -19,8 +20,8 @@ class LimitValidationService:
     """
     
     @staticmethod
-    def get_settings() -> SystemSettings:
-        """Get current system settings."""
+    def get_settings() -> SystemSettingsSnapshot:
+        """Get current system settings (read-only snapshot)."""
         return SystemSettings.get_settings()
     
     @staticmethod
@@ -124,23 +125,13 @@ class LimitValidationService:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        settings = LimitValidationService.get_settings()
-        
-        if user and user.is_authenticated:
-            rate_limit = settings.cart_rate_limit_user
-            client_id = f"user_{user.id}"
-        else:
-            rate_limit = settings.cart_rate_limit_guest
-            client_id = f"ip_guest"  # In real implementation, use IP address
-        
-        cache_key = f"{request_type}_rate_limit_{client_id}"
-        current_requests = cache.get(cache_key, 0)
+        authenticated = bool(user and user.is_authenticated)
+        client_id = f"user_{user.id}" if authenticated else "ip_guest"  # In real implementation, use IP address
         
-        if current_requests >= rate_limit:
+        # Cart limits apply to every request type
+        rate_limit, window_seconds = RateLimiter.get_rule('cart', authenticated)
+        if not RateLimiter.hit(request_type, client_id, rate_limit, window_seconds).allowed:
             return False, f"Too many requests. Please wait before trying again."
-        
-        # Increment counter
-        cache.set(cache_key, current_requests + 1, 60)  # 60 seconds
         return True, None
     
     @staticmethod
@@ -157,14 +148,14 @@ class LimitValidationService:
         
         # Check pending orders
         if product_type == 'tour':
-            schedule_id = booking_data.get('schedule_id')
+            schedule_id = parse_booking_counts(booking_data)[0]
             if schedule_id:
                 existing_pending = Order.objects.filter(
                     user=user,
                     items__product_type='tour',
                     items__product_id=product_id,
                     items__variant_id=variant_id,
-                    items__booking_data__schedule_id=schedule_id,
+                    items__schedule_id=schedule_id,
                     status='pending'
                 ).exists()
                 
@@ -197,8 +188,8 @@ class LimitValidationMixin:
         """Validate cart limits using the centralized service."""
         return LimitValidationService.validate_cart_limits(
             request.user,
-            cart.items.count(),
-            sum(Decimal(str(item.total_price)) for item in cart.items.all() if item.total_price),
+            cart.item_count,
+            cart.subtotal,
             Decimal(str(data.get('total_price', 0)))
         )
     
@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from .cache import delete_pattern, hot_cache, rate_limit_cache
+from .models import SystemSettings
+from .rate_limit import RateLimiter, RateLimitThrottle
+
+
+@override_settings(SYSTEM_SETTINGS_CHECK_INTERVAL=60)
+class SystemSettingsSnapshotTests(TestCase):
+    def setUp(self):
+        SystemSettings.invalidate_cache()
+
+    def tearDown(self):
+        # Snapshots outlive the test transaction rollback
+        SystemSettings.invalidate_cache()
+
+    def test_snapshot_served_without_queries(self):
+        snapshot = SystemSettings.get_settings()
+        with self.assertNumQueries(0):
+            self.assertIs(SystemSettings.get_settings(), snapshot)
+        with self.assertRaises(AttributeError):
+            snapshot.cart_max_items_user = 99
+
+    def test_save_invalidates_snapshot(self):
+        old = SystemSettings.get_settings()
+        instance = SystemSettings.load()
+        instance.cart_max_items_user = 42
+        instance.save()
+
+        new = SystemSettings.get_settings()
+        self.assertEqual(new.cart_max_items_user, 42)
+        self.assertNotEqual(new.version, old.version)
+
+    @override_settings(SYSTEM_SETTINGS_CHECK_INTERVAL=0)
+    def test_version_bump_from_another_worker_reloads(self):
+        old = SystemSettings.get_settings()
+        SystemSettings.objects.filter(pk=SystemSettings.load().pk).update(cart_max_items_guest=7)
+        self.assertEqual(SystemSettings.get_settings().cart_max_items_guest, old.cart_max_items_guest)
+
+        cache.set(SystemSettings.VERSION_CACHE_KEY, 'other-worker', None)
+        self.assertEqual(SystemSettings.get_settings().cart_max_items_guest, 7)
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        rate_limit_cache.clear()
+
+    def test_sliding_window_limit(self):
+        results = [RateLimiter.hit('test', 'ip_1', 3, 60) for _ in range(5)]
+        self.assertEqual([r.allowed for r in results], [True, True, True, False, False])
+        self.assertEqual(results[2].remaining, 0)
+        self.assertGreater(results[3].retry_after, 0)
+        # Other identifiers have their own window
+        self.assertTrue(RateLimiter.hit('test', 'ip_2', 3, 60).allowed)
+
+    def test_previous_window_is_weighted(self):
+        with mock.patch('core.rate_limit.time.time', return_value=1000 * 60 + 30):
+            for _ in range(4):
+                RateLimiter.hit('test', 'ip_1', 4, 60)
+        # Half-way into the next window half of the previous hits still count
+        with mock.patch('core.rate_limit.time.time', return_value=1001 * 60 + 30):
+            allowed = [RateLimiter.hit('test', 'ip_1', 4, 60).allowed for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+
+    def test_throttle_uses_view_scope(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+        view = mock.Mock(rate_limit_scope='password_reset')
+        throttle = RateLimitThrottle()
+        self.assertEqual(
+            [throttle.allow_request(request, view) for _ in range(4)],
+            [True, True, True, False]
+        )
+        self.assertGreater(throttle.wait(), 0)
+
+    @override_settings(RATE_LIMITS={'login': {'anon': (2, 60)}})
+    def test_login_limit_follows_config(self):
+        from users.services import SecurityService
+
+        allowed = [SecurityService.check_login_rate_limit('ip_1')[0] for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        # Scopes without a rule for the caller are not limited
+        self.assertEqual(SecurityService.check_login_rate_limit('user_1', authenticated=True), (True, None))
+
+
+class DeletePatternTests(TestCase):
+    def setUp(self):
+        hot_cache.clear()
+
+    def test_deletes_matching_keys_of_one_cache(self):
+        hot_cache.set('performance_seats_1_a', 1)
+        hot_cache.set('performance_seats_1_b', 2)
+        hot_cache.set('performance_seats_2_a', 3)
+        cache.set('performance_seats_1_a', 4)
+
+        self.assertEqual(delete_pattern('performance_seats_1_*', alias='hot'), 2)
+        self.assertIsNone(hot_cache.get('performance_seats_1_a'))
+        self.assertEqual(hot_cache.get('performance_seats_2_a'), 3)
+        # Other aliases keep their keys
+        self.assertEqual(cache.get('performance_seats_1_a'), 4)
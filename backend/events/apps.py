@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
-    verbose_name = 'Events' 
\ No newline at end of file
+    verbose_name = 'Events'
+    
+    def ready(self):
+        """Import signals when app is ready."""
+        import events.signals
@@ -7,10 +7,124 @@ from decimal import Decimal
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, Count, Min, Max, Case, CharField, F, Value, When
 from .models import Event, EventPerformance, EventSection, SectionTicketType, TicketType, Seat
 
 
+class CapacityMatrix:
+    """
+    Seat availability for one or more performances, grouped as
+    performance → section → (ticket_type_id, status) → count.
+    Built from a single grouped Seat query by CapacityManager.get_capacity_matrix.
+    Seats held in the seat hold engine count as reserved.
+    """
+    
+    def __init__(self, performance_ids, rows):
+        self.performance_ids = set(performance_ids)
+        self._cells = {}
+        for row in rows:
+            sections = self._cells.setdefault(row['performance_id'], {})
+            sections.setdefault(row['section'], {})[
+                (row['ticket_type_id'], row['seat_status'])
+            ] = row
+    
+    def covers(self, performance_id):
+        """Check whether the matrix was built for this performance."""
+        return performance_id in self.performance_ids
+    
+    def has_seats(self, performance_id):
+        """Check whether the performance has any seats."""
+        return bool(self._cells.get(performance_id))
+    
+    def sections(self, performance_id):
+        """Section names that have seats, in name order."""
+        return sorted(self._cells.get(performance_id, {}))
+    
+    def section_counts(self, performance_id, section_name):
+        """Return {(ticket_type_id, status): count} for one section."""
+        cells = self._cells.get(performance_id, {}).get(section_name, {})
+        return {key: row['total'] for key, row in cells.items()}
+    
+    def count(self, performance_id, section_name=None, status=None):
+        """Count seats of a performance, optionally narrowed by section and status."""
+        sections = self._cells.get(performance_id, {})
+        if section_name is not None:
+            sections = {section_name: sections.get(section_name, {})}
+        return sum(
+            row['total']
+            for cells in sections.values()
+            for (_, seat_status), row in cells.items()
+            if status is None or seat_status == status
+        )
+    
+    def ticket_type_count(self, performance_id, section_name, ticket_type_id, status=None):
+        """
+        Count seats of a ticket type in a section. Mirrors SectionTicketType:
+        falls back to seats without a ticket type when none are assigned.
+        """
+        cells = self._cells.get(performance_id, {}).get(section_name, {})
+        
+        def _total(tt_id):
+            return sum(
+                row['total'] for (row_tt_id, seat_status), row in cells.items()
+                if row_tt_id == tt_id and (status is None or seat_status == status)
+            )
+        
+        specific_seats = _total(ticket_type_id)
+        if specific_seats == 0:
+            return _total(None)
+        return specific_seats
+    
+    def ticket_type_capacity(self, section, section_ticket_type):
+        """Capacity figures for a SectionTicketType of the given section."""
+        def _count(status=None):
+            return self.ticket_type_count(
+                section.performance_id, section.name,
+                section_ticket_type.ticket_type_id, status
+            )
+        
+        return {
+            'allocated_capacity': _count(),
+            'available_capacity': _count('available'),
+            'reserved_capacity': _count('reserved'),
+            'sold_capacity': _count('sold'),
+        }
+    
+    def section_capacity(self, section):
+        """Capacity figures for an EventSection, summed over its ticket types."""
+        capacity = {
+            'available_capacity': 0,
+            'reserved_capacity': 0,
+            'sold_capacity': 0,
+        }
+        for stt in section.ticket_types.all():
+            stt_capacity = self.ticket_type_capacity(section, stt)
+            for key in capacity:
+                capacity[key] += stt_capacity[key]
+        
+        occupied = capacity['reserved_capacity'] + capacity['sold_capacity']
+        capacity['occupancy_rate'] = (
+            (occupied / section.total_capacity) * 100 if section.total_capacity else 0
+        )
+        return capacity
+    
+    def price_summary(self, performance_id, section_name, status='available'):
+        """Seat count, price range and premium flag for a section and status."""
+        rows = [
+            row for (_, seat_status), row in
+            self._cells.get(performance_id, {}).get(section_name, {}).items()
+            if seat_status == status
+        ]
+        if not rows:
+            return None
+        return {
+            'total_seats': sum(row['total'] for row in rows),
+            'min_price': min(row['min_price'] for row in rows),
+            'max_price': max(row['max_price'] for row in rows),
+            'has_premium': any(row['premium'] for row in rows),
+        }
+
+
 class CapacityManager:
     """
     Service class for managing capacity across the entire hierarchy.
@@ -138,6 +252,46 @@ class CapacityManager:
         except ValidationError as e:
             return False, str(e)
     
+    @staticmethod
+    def get_capacity_matrix(performances):
+        """
+        Build the availability matrix for one or many performances
+        from a single grouped Seat query. Held seats are grouped as reserved.
+        """
+        from .seat_holds import SeatHoldService
+        
+        if isinstance(performances, EventPerformance):
+            performances = [performances]
+        performance_ids = [getattr(p, 'pk', p) for p in performances]
+        
+        held_ids = [
+            seat_id
+            for performance_id in performance_ids
+            for seat_id in SeatHoldService.get_held_seats(performance_id)
+        ]
+        seat_status = F('status')
+        if held_ids:
+            seat_status = Case(
+                When(status='available', id__in=held_ids, then=Value('reserved')),
+                default=F('status'),
+                output_field=CharField()
+            )
+        
+        rows = Seat.objects.filter(
+            performance_id__in=performance_ids
+        ).annotate(
+            seat_status=seat_status
+        ).values(
+            'performance_id', 'section', 'ticket_type_id', 'seat_status'
+        ).annotate(
+            total=Count('id'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            premium=Count('id', filter=Q(is_premium=True))
+        ).order_by()
+        
+        return CapacityMatrix(performance_ids, rows)
+    
     @staticmethod
     def get_capacity_summary(performance):
         """Get comprehensive capacity summary for a performance."""
@@ -1,11 +1,13 @@
+from decimal import Decimal
+
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from events.models import EventPerformance, Seat
+from events.models import EventPerformance
+from events.seat_import import SeatImportService
 import csv
 
 
 class Command(BaseCommand):
-    help = 'Import or generate seats for a given performance.'
+    help = 'Import, generate or clone seats for a given performance.'
 
     def add_arguments(self, parser):
         parser.add_argument('--performance', required=True, help='Performance UUID')
@@ -16,68 +18,52 @@ class Command(BaseCommand):
         parser.add_argument('--seats-per-row', type=int, default=10, help='Number of seats per row (for generate-grid)')
         parser.add_argument('--base-price', type=float, default=100.0, help='Base price for generated seats')
         parser.add_argument('--currency', default='USD', help='Currency code (default USD)')
+        parser.add_argument('--clone-to', nargs='+', metavar='PERFORMANCE', help='Copy the seats of --performance to these performance UUIDs')
+        parser.add_argument('--clone-to-all', action='store_true', help='Copy the seats of --performance to every other performance of its event')
+        parser.add_argument('--chunk-size', type=int, default=SeatImportService.DEFAULT_CHUNK_SIZE, help='Seats written per batch')
 
     def handle(self, *args, **options):
         performance_id = options['performance']
         csv_path = options.get('csv')
         generate_grid = options.get('generate_grid')
+        clone_to = options.get('clone_to')
+        clone_to_all = options.get('clone_to_all')
 
         try:
             performance = EventPerformance.objects.get(id=performance_id)
         except EventPerformance.DoesNotExist:
             raise CommandError('Performance not found')
 
-        created = 0
+        if csv_path:
+            processed, created = self._import_from_csv(performance, csv_path, options)
+        elif generate_grid:
+            processed, created = self._generate_grid(performance, options)
+        elif clone_to or clone_to_all:
+            processed, created = self._clone_layout(performance, options)
+        else:
+            raise CommandError('Provide either --csv, --generate-grid, --clone-to or --clone-to-all')
 
-        with transaction.atomic():
-            if csv_path:
-                created = self._import_from_csv(performance, csv_path, options)
-            elif generate_grid:
-                created = self._generate_grid(performance, options)
-            else:
-                raise CommandError('Provide either --csv or --generate-grid')
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} seats, created {created} for performance {performance.id}"
+        ))
 
-        self.stdout.write(self.style.SUCCESS(f"Created {created} seats for performance {performance.id}"))
+    def _progress(self, processed, created):
+        self.stdout.write(f"  {processed} seats processed, {created} created")
 
-    def _import_from_csv(self, performance, csv_path, options) -> int:
-        created = 0
+    def _import_from_csv(self, performance, csv_path, options):
         with open(csv_path, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                section = row.get('section') or 'General'
-                row_number = row.get('row_number') or row.get('row') or '1'
-                seat_number = row.get('seat_number') or row.get('seat')
-                if not seat_number:
-                    continue
-                price = float(row.get('price') or options.get('base_price') or 100.0)
-                currency = row.get('currency') or options.get('currency') or 'USD'
-                is_premium = str(row.get('is_premium', '')).lower() in ['1', 'true', 'yes']
-                is_wheelchair = str(row.get('is_wheelchair_accessible', '')).lower() in ['1', 'true', 'yes']
+            return SeatImportService.import_rows(
+                performance,
+                csv.DictReader(f),
+                base_price=Decimal(str(options.get('base_price') or 100.0)),
+                currency=options.get('currency') or 'USD',
+                chunk_size=options['chunk_size'],
+                progress=self._progress
+            )
 
-                obj, was_created = Seat.objects.get_or_create(
-                    performance=performance,
-                    seat_number=str(seat_number),
-                    row_number=str(row_number),
-                    section=str(section),
-                    defaults={
-                        'price': price,
-                        'currency': currency,
-                        'is_premium': is_premium,
-                        'is_wheelchair_accessible': is_wheelchair,
-                        'status': 'available',
-                    }
-                )
-                if was_created:
-                    created += 1
-        return created
-
-    def _generate_grid(self, performance, options) -> int:
-        created = 0
+    def _generate_grid(self, performance, options):
         sections = (options.get('sections') or 'A').split(',')
         rows_spec = options.get('rows') or '1-10'
-        seats_per_row = int(options.get('seats_per_row') or 10)
-        base_price = float(options.get('base_price') or 100.0)
-        currency = options.get('currency') or 'USD'
 
         # parse rows_spec like 1-10
         if '-' in rows_spec:
@@ -88,25 +74,29 @@ class Command(BaseCommand):
         else:
             row_numbers = [r.strip() for r in rows_spec.split(',') if r.strip()]
 
-        for section in sections:
-            for row_number in row_numbers:
-                for seat_idx in range(1, seats_per_row + 1):
-                    seat_number = str(seat_idx)
-                    obj, was_created = Seat.objects.get_or_create(
-                        performance=performance,
-                        seat_number=seat_number,
-                        row_number=str(row_number),
-                        section=str(section),
-                        defaults={
-                            'price': base_price,
-                            'currency': currency,
-                            'is_premium': False,
-                            'is_wheelchair_accessible': False,
-                            'status': 'available',
-                        }
-                    )
-                    if was_created:
-                        created += 1
-        return created
+        return SeatImportService.generate_grid(
+            performance,
+            sections,
+            row_numbers,
+            int(options.get('seats_per_row') or 10),
+            base_price=Decimal(str(options.get('base_price') or 100.0)),
+            currency=options.get('currency') or 'USD',
+            chunk_size=options['chunk_size'],
+            progress=self._progress
+        )
 
+    def _clone_layout(self, performance, options):
+        if options.get('clone_to_all'):
+            targets = EventPerformance.objects.filter(event_id=performance.event_id).exclude(id=performance.id)
+        else:
+            targets = EventPerformance.objects.filter(id__in=options['clone_to'])
+            missing = set(options['clone_to']) - {str(target.id) for target in targets}
+            if missing:
+                raise CommandError(f"Performances not found: {', '.join(sorted(missing))}")
 
+        return SeatImportService.clone_layout(
+            performance,
+            list(targets),
+            chunk_size=options['chunk_size'],
+            progress=self._progress
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from events.seat_counters import SeatCounterService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized seat status counters from Seat rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--performance',
+            action='append',
+            dest='performances',
+            help='Performance UUID to rebuild (repeatable). Rebuilds all when omitted.'
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = SeatCounterService.rebuild(options.get('performances'))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt seat counters for {rebuilt} performances"))
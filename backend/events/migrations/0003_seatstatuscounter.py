@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_seat_counters(apps, schema_editor):
+    Seat = apps.get_model('events', 'Seat')
+    SeatStatusCounter = apps.get_model('events', 'SeatStatusCounter')
+    aggregates = Seat.objects.values(
+        'performance_id', 'section', 'ticket_type_id', 'status'
+    ).annotate(total=Count('id')).order_by()
+    SeatStatusCounter.objects.bulk_create([
+        SeatStatusCounter(
+            performance_id=row['performance_id'],
+            section=row['section'],
+            ticket_type_id=row['ticket_type_id'],
+            status=row['status'],
+            count=row['total'],
+        )
+        for row in aggregates
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=50, verbose_name='Section')),
+                ('status', models.CharField(choices=[('available', 'Available'), ('reserved', 'Reserved'), ('sold', 'Sold'), ('blocked', 'Blocked')], max_length=20, verbose_name='Status')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('performance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_counters', to='events.eventperformance', verbose_name='Performance')),
+                ('ticket_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='seat_counters', to='events.tickettype', verbose_name='Ticket type')),
+            ],
+            options={
+                'verbose_name': 'Seat Status Counter',
+                'verbose_name_plural': 'Seat Status Counters',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('ticket_type__isnull', False)), fields=('performance', 'section', 'ticket_type', 'status'), name='uniq_seat_counter_ticket_type'), models.UniqueConstraint(condition=models.Q(('ticket_type__isnull', True)), fields=('performance', 'section', 'status'), name='uniq_seat_counter_unassigned')],
+            },
+        ),
+        migrations.RunPython(populate_seat_counters, migrations.RunPython.noop),
+    ]
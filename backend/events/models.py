@@ -413,6 +413,56 @@ class Seat(BaseModel):
         return self.status in ['available', 'reserved']
 
 
+class SeatStatusCounter(models.Model):
+    """
+    Denormalized seat counts per performance, section, ticket type and status.
+    Maintained by events.seat_counters.SeatCounterService; rebuilt from Seat
+    with the rebuild_seat_counters management command.
+    """
+
+    performance = models.ForeignKey(
+        EventPerformance,
+        on_delete=models.CASCADE,
+        related_name='seat_counters',
+        verbose_name=_('Performance')
+    )
+    section = models.CharField(max_length=50, verbose_name=_('Section'))
+    ticket_type = models.ForeignKey(
+        TicketType,
+        on_delete=models.CASCADE,
+        related_name='seat_counters',
+        null=True,
+        blank=True,
+        verbose_name=_('Ticket type')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Seat.STATUS_CHOICES,
+        verbose_name=_('Status')
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name=_('Count'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated at'))
+
+    class Meta:
+        verbose_name = _('Seat Status Counter')
+        verbose_name_plural = _('Seat Status Counters')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['performance', 'section', 'ticket_type', 'status'],
+                condition=models.Q(ticket_type__isnull=False),
+                name='uniq_seat_counter_ticket_type'
+            ),
+            models.UniqueConstraint(
+                fields=['performance', 'section', 'status'],
+                condition=models.Q(ticket_type__isnull=True),
+                name='uniq_seat_counter_unassigned'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.performance_id} - {self.section} - {self.status}: {self.count}"
+
+
 class EventOption(BaseOptionModel):
     """
     Event options and add-ons.
@@ -668,6 +718,8 @@ class EventSection(BaseModel):
             delattr(self, '_cached_reserved_capacity')
         if hasattr(self, '_cached_sold_capacity'):
             delattr(self, '_cached_sold_capacity')
+        if hasattr(self, '_cached_seat_counts'):
+            delattr(self, '_cached_seat_counts')
     
     @property
     def occupancy_rate(self):
@@ -735,95 +787,53 @@ class SectionTicketType(BaseModel):
     def __str__(self):
         return f"{self.section.name} - {self.ticket_type.name}"
     
-    @property
-    def allocated_capacity(self):
-        """Calculate allocated capacity from actual seats."""
-        # First try to find seats with this specific ticket type
-        specific_seats = Seat.objects.filter(
-            performance=self.section.performance,
-            section=self.section.name,
-            ticket_type=self.ticket_type
-        ).count()
-        
-        # If no specific seats found, look for unassigned seats in this section
+    def _seat_status_counts(self):
+        """Seat counts for this section keyed by (ticket_type_id, status), loaded once per section."""
+        section = self.section
+        if not hasattr(section, '_cached_seat_counts'):
+            from .seat_counters import SeatCounterService
+            section._cached_seat_counts = SeatCounterService.get_section_counts(
+                section.performance_id, section.name
+            )
+        return section._cached_seat_counts
+
+    def _count_seats(self, status=None):
+        """
+        Count seats of this ticket type from the denormalized counters.
+        Falls back to seats without a ticket type assignment when none match.
+        """
+        counts = self._seat_status_counts()
+
+        def _total(ticket_type_id):
+            return sum(
+                value for (tt_id, seat_status), value in counts.items()
+                if tt_id == ticket_type_id and (status is None or seat_status == status)
+            )
+
+        specific_seats = _total(self.ticket_type_id)
         if specific_seats == 0:
-            unassigned_seats = Seat.objects.filter(
-                performance=self.section.performance,
-                section=self.section.name,
-                ticket_type__isnull=True  # Seats without ticket type assignment
-            ).count()
-            return unassigned_seats
-        
+            return _total(None)
         return specific_seats
+
+    @property
+    def allocated_capacity(self):
+        """Calculate allocated capacity from seat counters."""
+        return self._count_seats()
     
     @property
     def available_capacity(self):
-        """Calculate available capacity from actual seats."""
-        # First try to find seats with this specific ticket type
-        specific_seats = Seat.objects.filter(
-            performance=self.section.performance,
-            section=self.section.name,
-            ticket_type=self.ticket_type,
-            status='available'
-        ).count()
-        
-        # If no specific seats found, look for unassigned seats in this section
-        if specific_seats == 0:
-            unassigned_seats = Seat.objects.filter(
-                performance=self.section.performance,
-                section=self.section.name,
-                ticket_type__isnull=True,  # Seats without ticket type assignment
-                status='available'
-            ).count()
-            return unassigned_seats
-        
-        return specific_seats
+        """Calculate available capacity from seat counters."""
+        return self._count_seats('available')
     
     @property
     def reserved_capacity(self):
-        """Calculate reserved capacity from actual seats."""
-        # First try to find seats with this specific ticket type
-        specific_seats = Seat.objects.filter(
-            performance=self.section.performance,
-            section=self.section.name,
-            ticket_type=self.ticket_type,
-            status='reserved'
-        ).count()
-        
-        # If no specific seats found, look for unassigned seats in this section
-        if specific_seats == 0:
-            unassigned_seats = Seat.objects.filter(
-                performance=self.section.performance,
-                section=self.section.name,
-                ticket_type__isnull=True,  # Seats without ticket type assignment
-                status='reserved'
-            ).count()
-            return unassigned_seats
-        
-        return specific_seats
+        """Calculate reserved capacity from seat counters."""
+        return self._count_seats('reserved')
     
     @property
     def sold_capacity(self):
-        """Calculate sold capacity from actual seats."""
-        # First try to find seats with this specific ticket type
-        specific_seats = Seat.objects.filter(
-            performance=self.section.performance,
-            section=self.section.name,
-            ticket_type=self.ticket_type,
-            status='sold'
-        ).count()
-        
-        # If no specific seats found, look for unassigned seats in this section
-        if specific_seats == 0:
-            unassigned_seats = Seat.objects.filter(
-                performance=self.section.performance,
-                section=self.section.name,
-                ticket_type__isnull=True,  # Seats without ticket type assignment
-                status='sold'
-            ).count()
-            return unassigned_seats
-        
-        return specific_seats
+        """Calculate sold capacity from seat counters."""
+        return self._count_seats('sold')
     
     def clean(self):
         super().clean()
@@ -3,8 +3,9 @@ Query optimizations for Events app.
 """
 
 from django.db.models import Prefetch, Q, Count, Avg
-from django.core.cache import cache
+from core.cache import delete_pattern, hot_cache
 from .models import Event, EventPerformance, TicketType, Seat
+from .seat_counters import SeatCounterService
 
 class EventQueryOptimizer:
     """Optimized queries for events."""
@@ -15,7 +16,7 @@ class EventQueryOptimizer:
         Get event with all related data in optimized queries.
         """
         cache_key = f"event_optimized_{event_id}"
-        cached_data = cache.get(cache_key)
+        cached_data = hot_cache.get(cache_key)
         
         if cached_data:
             return cached_data
@@ -41,7 +42,7 @@ class EventQueryOptimizer:
         ).get(id=event_id)
         
         # Cache for 15 minutes
-        cache.set(cache_key, event, 900)
+        hot_cache.set(cache_key, event, 900)
         
         return event
     
@@ -51,7 +52,7 @@ class EventQueryOptimizer:
         Get performance with optimized seat queries.
         """
         cache_key = f"performance_seats_{performance_id}_{section}_{ticket_type_id}"
-        cached_data = cache.get(cache_key)
+        cached_data = hot_cache.get(cache_key)
         
         if cached_data:
             return cached_data
@@ -74,7 +75,7 @@ class EventQueryOptimizer:
         ).get(id=performance_id)
         
         # Cache for 5 minutes (seats change frequently)
-        cache.set(cache_key, performance, 300)
+        hot_cache.set(cache_key, performance, 300)
         
         return performance
     
@@ -84,7 +85,7 @@ class EventQueryOptimizer:
         Get events list with optimized statistics.
         """
         cache_key = "events_list_stats"
-        cached_data = cache.get(cache_key)
+        cached_data = hot_cache.get(cache_key)
         
         if cached_data:
             return cached_data
@@ -103,7 +104,7 @@ class EventQueryOptimizer:
         ).order_by('-created_at')
         
         # Cache for 10 minutes
-        cache.set(cache_key, list(events), 600)
+        hot_cache.set(cache_key, list(events), 600)
         
         return events
     
@@ -113,7 +114,7 @@ class EventQueryOptimizer:
         Get available seats count for a performance.
         """
         cache_key = f"seats_count_{performance_id}"
-        cached_count = cache.get(cache_key)
+        cached_count = hot_cache.get(cache_key)
         
         if cached_count is not None:
             return cached_count
@@ -125,7 +126,7 @@ class EventQueryOptimizer:
         ).count()
         
         # Cache for 2 minutes (very frequent changes)
-        cache.set(cache_key, count, 120)
+        hot_cache.set(cache_key, count, 120)
         
         return count
     
@@ -140,7 +141,7 @@ class EventQueryOptimizer:
         ]
         
         for key in cache_keys:
-            cache.delete(key)
+            hot_cache.delete(key)
     
     @staticmethod
     def invalidate_performance_cache(performance_id):
@@ -148,8 +149,8 @@ class EventQueryOptimizer:
         Invalidate cache for a specific performance.
         """
         # Delete all performance-related cache keys
-        cache.delete_pattern(f"performance_seats_{performance_id}_*")
-        cache.delete(f"seats_count_{performance_id}")
+        delete_pattern(f"performance_seats_{performance_id}_*", alias='hot')
+        hot_cache.delete(f"seats_count_{performance_id}")
 
 class SeatSelectionOptimizer:
     """Optimizations for seat selection."""
@@ -160,7 +161,7 @@ class SeatSelectionOptimizer:
         Get seat availability for a specific section.
         """
         cache_key = f"section_availability_{performance_id}_{section}"
-        cached_data = cache.get(cache_key)
+        cached_data = hot_cache.get(cache_key)
         
         if cached_data:
             return cached_data
@@ -184,64 +185,80 @@ class SeatSelectionOptimizer:
             availability[ticket_type].append(seat)
         
         # Cache for 3 minutes
-        cache.set(cache_key, availability, 180)
+        hot_cache.set(cache_key, availability, 180)
         
         return availability
     
+    @staticmethod
+    def invalidate_performance_cache(performance_id):
+        """
+        Invalidate seat availability caches of a performance.
+        """
+        delete_pattern(f"section_availability_{performance_id}_*", alias='hot')
+        EventQueryOptimizer.invalidate_performance_cache(performance_id)
+    
     @staticmethod
     def reserve_seats(seat_ids, duration_minutes=30):
         """
-        Reserve seats temporarily.
+        Reserve seats temporarily in the seat hold engine.
         """
-        from django.utils import timezone
-        from datetime import timedelta
+        from .seat_holds import SeatHoldService
         
-        # Update seat status to reserved
-        seats = Seat.objects.filter(
+        seats_by_performance = {}
+        for seat_id, performance_id in Seat.objects.filter(
             id__in=seat_ids,
             status='available'
-        )
+        ).values_list('id', 'performance_id'):
+            seats_by_performance.setdefault(performance_id, []).append(seat_id)
         
-        # Use select_for_update to prevent race conditions
-        with transaction.atomic():
-            seats = seats.select_for_update()
-            
-            # Check if all seats are still available
-            if seats.count() != len(seat_ids):
-                return False, "Some seats are no longer available"
-            
-            # Update seats to reserved
-            seats.update(
-                status='reserved',
-                reservation_expires_at=timezone.now() + timedelta(minutes=duration_minutes)
+        # Check if all seats are still available
+        if sum(len(ids) for ids in seats_by_performance.values()) != len(seat_ids):
+            return False, "Some seats are no longer available"
+        
+        # One reservation across performances; undo partial holds on conflict
+        reservation_id = None
+        held_performances = []
+        for perf_id, perf_seat_ids in seats_by_performance.items():
+            held, result = SeatHoldService.hold_seats(
+                perf_id, perf_seat_ids, duration_minutes * 60, reservation_id
             )
-            
-            # Invalidate related caches
-            performance_ids = set(seats.values_list('performance_id', flat=True))
-            for perf_id in performance_ids:
-                SeatSelectionOptimizer.invalidate_performance_cache(perf_id)
-            
-            return True, f"Reserved {len(seat_ids)} seats"
+            if not held:
+                for held_perf_id in held_performances:
+                    SeatHoldService.release_seats(held_perf_id, reservation_id=reservation_id)
+                return False, "Some seats are no longer available"
+            reservation_id = result['reservation_id']
+            held_performances.append(perf_id)
+        
+        # Invalidate related caches
+        for perf_id in held_performances:
+            SeatSelectionOptimizer.invalidate_performance_cache(perf_id)
+        
+        return True, f"Reserved {len(seat_ids)} seats"
     
     @staticmethod
     def release_seats(seat_ids):
         """
         Release reserved seats.
         """
-        # Update seat status back to available
-        seats = Seat.objects.filter(
-            id__in=seat_ids,
-            status='reserved'
+        from .seat_holds import SeatHoldService
+        
+        performance_ids = set(
+            Seat.objects.filter(id__in=seat_ids).values_list('performance_id', flat=True)
         )
         
-        updated_count = seats.update(
-            status='available',
+        updated_count = 0
+        for perf_id in performance_ids:
+            updated_count += SeatHoldService.release_seats(perf_id, seat_ids=seat_ids)
+        
+        # Seats reserved directly on Seat rows before the hold engine
+        updated_count += SeatCounterService.transition(
+            Seat.objects.filter(id__in=seat_ids, status='reserved'),
+            'available',
             reservation_expires_at=None
         )
         
         # Invalidate related caches
         if updated_count > 0:
-            performance_ids = set(seats.values_list('performance_id', flat=True))
             for perf_id in performance_ids:
                 SeatSelectionOptimizer.invalidate_performance_cache(perf_id)
         
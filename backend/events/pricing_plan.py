@@ -0,0 +1,147 @@
+"""
+Compiled pricing plans for Events.
+A plan holds everything needed to price tickets of one performance: section
+prices and modifiers and active options. It is compiled in a few queries,
+cached under the event and performance pricing versions and never modified,
+so quotes are in-memory arithmetic.
+Seat availability changes far more often than prices and is checked
+separately, for any number of ticket requests in one query.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+from core.cache import pricing_cache
+from .models import (
+    EventOption, EventSection, SectionTicketType, SeatStatusCounter,
+)
+from .seat_counters import SeatCounterService
+
+
+@dataclass(frozen=True)
+class TicketPrice:
+    """Price of one ticket type in one section."""
+    section_name: str
+    ticket_type_id: str
+    base_price: Decimal
+    price_modifier: Decimal
+
+
+@dataclass(frozen=True)
+class OptionPrice:
+    """Price of one active event option."""
+    option_id: str
+    name: str
+    option_type: str
+    price: Decimal
+
+
+@dataclass(frozen=True)
+class PricingPlan:
+    """Immutable pricing data of a performance."""
+    event_id: str
+    performance_id: str
+    # (section_name, ticket_type_id) -> TicketPrice
+    tickets: Dict[Tuple[str, str], TicketPrice]
+    section_names: frozenset
+    # option_id -> OptionPrice
+    options: Dict[str, OptionPrice]
+
+    def get_ticket(self, section_name: str, ticket_type_id) -> TicketPrice:
+        """Return the ticket price or raise ValidationError like the model lookups did."""
+        ticket = self.tickets.get((section_name, str(ticket_type_id)))
+        if ticket is not None:
+            return ticket
+        if section_name not in self.section_names:
+            raise ValidationError(_(f'Section "{section_name}" not found for this performance'))
+        raise ValidationError(_(f'Ticket type "{ticket_type_id}" not available in section "{section_name}"'))
+
+    def get_option(self, option_id) -> Optional[OptionPrice]:
+        return self.options.get(str(option_id))
+
+
+class PricingPlanService:
+    """
+    Service class for compiling and caching performance pricing plans.
+    """
+
+    PLAN_TIMEOUT = 3600
+
+    @staticmethod
+    def _plan_key(event_id, performance_id, versions):
+        event_version, performance_version = versions
+        return f"event_pricing_plan:{event_id}:{performance_id}:{event_version}.{performance_version}"
+
+    @staticmethod
+    def get_plan(event_id, performance_id, versions) -> PricingPlan:
+        """
+        Return the plan for the given (event, performance) pricing versions,
+        compiling it on a cache miss. Version bumps make old plans unreachable.
+        """
+        cache_key = PricingPlanService._plan_key(event_id, performance_id, versions)
+        plan = pricing_cache.get(cache_key)
+        if plan is None:
+            plan = PricingPlanService.compile(event_id, performance_id)
+            pricing_cache.set(cache_key, plan, PricingPlanService.PLAN_TIMEOUT)
+        return plan
+
+    @staticmethod
+    def compile(event_id, performance_id) -> PricingPlan:
+        """Load the pricing data of a performance."""
+        tickets = {}
+        for section_name, ticket_type_id, base_price, price_modifier in SectionTicketType.objects.filter(
+            section__performance_id=performance_id
+        ).values_list('section__name', 'ticket_type_id', 'section__base_price', 'price_modifier'):
+            tickets[(section_name, str(ticket_type_id))] = TicketPrice(
+                section_name, str(ticket_type_id), base_price, price_modifier
+            )
+        # All section names, so a missing ticket type and a missing section differ
+        section_names = frozenset(EventSection.objects.filter(
+            performance_id=performance_id
+        ).values_list('name', flat=True))
+
+        options = {
+            str(option_id): OptionPrice(str(option_id), name, option_type, price)
+            for option_id, name, option_type, price in EventOption.objects.filter(
+                event_id=event_id, is_active=True
+            ).values_list('id', 'name', 'option_type', 'price')
+        }
+
+        return PricingPlan(
+            event_id=str(event_id),
+            performance_id=str(performance_id),
+            tickets=tickets,
+            section_names=section_names,
+            options=options,
+        )
+
+    @staticmethod
+    def get_available_capacity(performance_id) -> Counter:
+        """
+        Available seats of a performance keyed by (section_name, ticket_type_id
+        or None). Seats held in the seat hold engine are not available.
+        """
+        capacity = Counter()
+        for section_name, ticket_type_id, count in SeatStatusCounter.objects.filter(
+            performance_id=performance_id, status='available'
+        ).values_list('section', 'ticket_type_id', 'count'):
+            capacity[(section_name, str(ticket_type_id) if ticket_type_id else None)] += count
+
+        held = SeatCounterService.get_held_counts(performance_id)
+        for (section_name, ticket_type_id), count in held.items():
+            capacity[(section_name, str(ticket_type_id) if ticket_type_id else None)] -= count
+        return capacity
+
+    @staticmethod
+    def available_quantity(capacity, section_name, ticket_type_id) -> int:
+        """
+        Available seats for a ticket type in a section. Mirrors
+        SectionTicketType.available_capacity: falls back to seats without a
+        ticket type when none are assigned.
+        """
+        return capacity[(section_name, str(ticket_type_id))] or capacity[(section_name, None)]
@@ -3,13 +3,17 @@ Event Pricing Service for comprehensive price calculation.
 Handles base price, options, discounts, fees, and taxes.
 """
 
+import hashlib
+import json
+import time
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from django.core.cache import cache
 from django.utils import timezone
-from .models import Event, EventPerformance, EventSection, SectionTicketType, EventOption, EventBooking
+from core.cache import pricing_cache
+from .models import Event, EventPerformance, EventSection, SectionTicketType, EventBooking
+from .pricing_plan import PricingPlan, PricingPlanService
 
 
 class EventPriceCalculator:
@@ -22,19 +26,79 @@ class EventPriceCalculator:
         self.performance = performance
         self.currency = 'USD'  # Default currency
         self.cache_timeout = 300  # 5 minutes cache
+        self._pricing_versions = None
+        self._plan = None
+    
+    @staticmethod
+    def _version_key(scope: str, object_id) -> str:
+        return f"event_pricing_version:{scope}:{object_id}"
+    
+    @staticmethod
+    def _version_seed() -> int:
+        # Time-based, so a version lost from the cache never reuses an old number
+        return time.time_ns() // 1_000_000
+    
+    @staticmethod
+    def get_pricing_versions(event_id, performance_id) -> Tuple[int, int]:
+        """Current (event, performance) pricing versions, shared by all workers."""
+        keys = [
+            EventPriceCalculator._version_key('event', event_id),
+            EventPriceCalculator._version_key('performance', performance_id),
+        ]
+        versions = pricing_cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                pricing_cache.add(key, EventPriceCalculator._version_seed(), None)
+                versions[key] = pricing_cache.get(key, 0)
+        return versions[keys[0]], versions[keys[1]]
+    
+    @staticmethod
+    def bump_pricing_version(event_id=None, performance_id=None):
+        """
+        Invalidate cached prices of an event (all its performances) or of one
+        performance in O(1), by moving to a new version.
+        """
+        for scope, object_id in (('event', event_id), ('performance', performance_id)):
+            if object_id is None:
+                continue
+            key = EventPriceCalculator._version_key(scope, object_id)
+            if pricing_cache.add(key, EventPriceCalculator._version_seed(), None):
+                continue
+            try:
+                pricing_cache.incr(key)
+            except ValueError:
+                pricing_cache.set(key, EventPriceCalculator._version_seed(), None)
+    
+    def _get_versions(self) -> Tuple[int, int]:
+        if self._pricing_versions is None:
+            self._pricing_versions = self.get_pricing_versions(self.event.id, self.performance.id)
+        return self._pricing_versions
+    
+    def get_plan(self) -> PricingPlan:
+        """Return the compiled pricing plan of this performance."""
+        if self._plan is None:
+            self._plan = PricingPlanService.get_plan(
+                self.event.id, self.performance.id, self._get_versions()
+            )
+        return self._plan
     
     def _get_cache_key(self, section_name: str, ticket_type_id: str, quantity: int, 
                        selected_options: Optional[List[Dict]] = None, discount_code: Optional[str] = None,
                        is_group_booking: bool = False, apply_fees: bool = False, apply_taxes: bool = False) -> str:
-        """Generate cache key for pricing calculation."""
+        """
+        Generate cache key for pricing calculation.
+        Stable across processes and scoped to the current pricing versions.
+        """
         # Sort options by option_id to ensure consistent cache keys
-        if selected_options:
-            sorted_options = sorted(selected_options, key=lambda x: x.get('option_id', ''))
-            options_hash = hash(str(sorted_options))
-        else:
-            options_hash = hash('[]')
-        cache_key = f"pricing_{self.event.id}_{self.performance.id}_{section_name}_{ticket_type_id}_{quantity}_{options_hash}_{discount_code}_{is_group_booking}_{apply_fees}_{apply_taxes}"
-        return cache_key
+        sorted_options = sorted(selected_options or [], key=lambda x: str(x.get('option_id', '')))
+        params = json.dumps(
+            [section_name, str(ticket_type_id), quantity, sorted_options, discount_code,
+             is_group_booking, apply_fees, apply_taxes],
+            sort_keys=True, default=str
+        )
+        digest = hashlib.blake2b(params.encode(), digest_size=16).hexdigest()
+        event_version, performance_version = self._get_versions()
+        return f"event_pricing:{self.event.id}:{self.performance.id}:{event_version}.{performance_version}:{digest}"
     
     def calculate_ticket_price(
         self,
@@ -46,10 +110,13 @@ class EventPriceCalculator:
         is_group_booking: bool = False,
         apply_fees: bool = False,
         apply_taxes: bool = False,
-        use_cache: bool = True
+        use_cache: bool = True,
+        check_capacity: bool = True
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive ticket price with all components and caching.
+        Prices come from the compiled pricing plan, so only the capacity
+        check touches the database.
         
         Args:
             section_name: Name of the section (e.g., 'VIP', 'Normal')
@@ -61,6 +128,7 @@ class EventPriceCalculator:
             apply_fees: Whether to apply service fees
             apply_taxes: Whether to apply taxes
             use_cache: Whether to use caching (default: True)
+            check_capacity: Whether to check seat availability (default: True)
         
         Returns:
             Dict with complete price breakdown
@@ -71,7 +139,7 @@ class EventPriceCalculator:
                 section_name, ticket_type_id, quantity, selected_options,
                 discount_code, is_group_booking, apply_fees, apply_taxes
             )
-            cached_result = cache.get(cache_key)
+            cached_result = pricing_cache.get(cache_key)
             if cached_result:
                 # Update timestamp for cache freshness
                 cached_result['calculation_timestamp'] = timezone.now().isoformat()
@@ -87,28 +155,22 @@ class EventPriceCalculator:
                 raise ValidationError(_('Section name and ticket type ID are required'))
             
             # Get section and ticket type with validation
-            try:
-                section = self.performance.sections.get(name=section_name)
-            except EventSection.DoesNotExist:
-                raise ValidationError(_(f'Section "{section_name}" not found for this performance'))
-            
-            try:
-                section_ticket = section.ticket_types.get(ticket_type__id=ticket_type_id)
-            except SectionTicketType.DoesNotExist:
-                raise ValidationError(_(f'Ticket type "{ticket_type_id}" not available in section "{section_name}"'))
+            ticket = self.get_plan().get_ticket(section_name, ticket_type_id)
             
             # Validate capacity
-            if section_ticket.available_capacity < quantity:
-                raise ValidationError(
-                    _(f'Only {section_ticket.available_capacity} seats available, {quantity} requested')
-                )
+            if check_capacity:
+                self.check_capacity([{
+                    'section_name': section_name,
+                    'ticket_type_id': ticket_type_id,
+                    'quantity': quantity,
+                }])
             
             # Base calculation with validation
-            base_price = section.base_price
+            base_price = ticket.base_price
             if base_price <= 0:
                 raise ValidationError(_('Base price must be positive'))
             
-            price_modifier = section_ticket.price_modifier
+            price_modifier = ticket.price_modifier
             if price_modifier <= 0:
                 raise ValidationError(_('Price modifier must be positive'))
             
@@ -207,11 +269,7 @@ class EventPriceCalculator:
             
             # Cache the result if caching is enabled
             if use_cache:
-                cache_key = self._get_cache_key(
-                    section_name, ticket_type_id, quantity, selected_options,
-                    discount_code, is_group_booking, apply_fees, apply_taxes
-                )
-                cache.set(cache_key, breakdown, self.cache_timeout)
+                pricing_cache.set(cache_key, breakdown, self.cache_timeout)
             
             return breakdown
             
@@ -229,39 +287,25 @@ class EventPriceCalculator:
         options_breakdown = []
         options_total = Decimal('0.00')
         
+        plan = self.get_plan()
+        
         for option_data in selected_options:
-            option_id = option_data.get('option_id')
+            option = plan.get_option(option_data.get('option_id'))
+            if option is None:
+                continue
             quantity = int(option_data.get('quantity', 1))
             
-            try:
-                option = EventOption.objects.get(
-                    id=option_id,
-                    event=self.event,
-                    is_active=True
-                )
-                
-                # Calculate option price
-                if hasattr(option, 'price_percentage') and option.price_percentage > 0:
-                    # Percentage-based pricing
-                    option_price = subtotal * (option.price_percentage / Decimal('100'))
-                else:
-                    # Fixed pricing
-                    option_price = option.price
-                
-                option_total = option_price * quantity
-                options_total += option_total
-                
-                options_breakdown.append({
-                    'option_id': str(option.id),
-                    'name': option.name,
-                    'type': option.option_type,
-                    'price': option_price,
-                    'quantity': quantity,
-                    'total': option_total
-                })
-                
-            except EventOption.DoesNotExist:
-                continue
+            option_total = option.price * quantity
+            options_total += option_total
+            
+            options_breakdown.append({
+                'option_id': option.option_id,
+                'name': option.name,
+                'type': option.option_type,
+                'price': option.price,
+                'quantity': quantity,
+                'total': option_total
+            })
         
         return {
             'options': options_breakdown,
@@ -473,16 +517,36 @@ class EventPriceCalculator:
             return False
 
     def clear_pricing_cache(self, section_name: str = None, ticket_type_id: str = None):
-        """Clear pricing cache for specific section or ticket type."""
-        if section_name and ticket_type_id:
-            # Clear specific cache
-            cache_key_pattern = f"pricing_{self.event.id}_{self.performance.id}_{section_name}_{ticket_type_id}_*"
-            # Note: Django cache doesn't support pattern deletion, so we'll clear all related caches
-            cache.delete_pattern(cache_key_pattern)
-        else:
-            # Clear all pricing caches for this event/performance
-            cache_key_pattern = f"pricing_{self.event.id}_{self.performance.id}_*"
-            cache.delete_pattern(cache_key_pattern)
+        """
+        Clear pricing cache for this performance.
+        Bumps the performance pricing version, so section_name and ticket_type_id
+        no longer narrow the invalidation; they are kept for compatibility.
+        """
+        self.bump_pricing_version(performance_id=self.performance.id)
+        self._pricing_versions = None
+        self._plan = None
+    
+    def check_capacity(self, ticket_requests: List[Dict], capacity=None, remaining: Optional[Dict] = None):
+        """
+        Check seat availability for ticket requests in one query. Requests for
+        the same section and ticket type share its seats, also across calls
+        given the same capacity and remaining dict.
+        Raises ValidationError for the first request that does not fit.
+        """
+        if capacity is None:
+            capacity = PricingPlanService.get_available_capacity(self.performance.id)
+        if remaining is None:
+            remaining = {}
+        for request in ticket_requests:
+            key = (request['section_name'], str(request['ticket_type_id']))
+            if key not in remaining:
+                remaining[key] = PricingPlanService.available_quantity(capacity, *key)
+            quantity = request.get('quantity', 1)
+            if remaining[key] < quantity:
+                raise ValidationError(
+                    _(f'Only {remaining[key]} seats available, {quantity} requested')
+                )
+            remaining[key] -= quantity
     
     def calculate_bulk_pricing(
         self,
@@ -532,6 +596,10 @@ class EventPriceCalculator:
         unique_ticket_types = set()
         total_tickets = 0
         
+        # One availability read for all requests; prices come from the plan
+        capacity = PricingPlanService.get_available_capacity(self.performance.id)
+        remaining = {}
+        
         # Calculate individual ticket prices
         for request in ticket_requests:
             try:
@@ -553,8 +621,11 @@ class EventPriceCalculator:
                     is_group_booking=False,  # Apply group discount at bulk level
                     apply_fees=apply_fees,
                     apply_taxes=apply_taxes,
-                    use_cache=use_cache
+                    use_cache=use_cache,
+                    check_capacity=False
                 )
+                # Only priced requests take seats from the shared capacity
+                self.check_capacity([request], capacity, remaining)
                 
                 # Add to bulk result
                 bulk_result['tickets'].append({
@@ -0,0 +1,210 @@
+"""
+Seat status counters for Events.
+Keeps SeatStatusCounter rows in step with Seat.status so capacity reads
+are a single lookup instead of per-property COUNT queries.
+"""
+
+import logging
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Seat, SeatStatusCounter
+from .seat_holds import SeatHoldService
+
+logger = logging.getLogger(__name__)
+
+
+class SeatCounterService:
+    """
+    Service class for maintaining denormalized seat status counters.
+    """
+
+    @staticmethod
+    def get_section_counts(performance_id, section_name):
+        """
+        Return {(ticket_type_id, status): count} for one section of a performance.
+        Seats held in the seat hold engine count as reserved, not available.
+        """
+        rows = SeatStatusCounter.objects.filter(
+            performance_id=performance_id,
+            section=section_name
+        ).values_list('ticket_type_id', 'status', 'count')
+        counts = {(ticket_type_id, status): count for ticket_type_id, status, count in rows}
+
+        held = SeatCounterService.get_held_counts(performance_id, section_name)
+        for (_, ticket_type_id), count in held.items():
+            counts[(ticket_type_id, 'available')] = counts.get((ticket_type_id, 'available'), 0) - count
+            counts[(ticket_type_id, 'reserved')] = counts.get((ticket_type_id, 'reserved'), 0) + count
+        return counts
+
+    @staticmethod
+    def get_held_counts(performance_id, section_name=None):
+        """
+        Count seats that are held in the seat hold engine but still available
+        on their Seat row, keyed by (section, ticket_type_id).
+        """
+        counts = Counter()
+        held_seats = SeatHoldService.get_held_seats(performance_id)
+        if not held_seats:
+            return counts
+
+        seats = Seat.objects.filter(
+            performance_id=performance_id, status='available', id__in=list(held_seats)
+        )
+        if section_name is not None:
+            seats = seats.filter(section=section_name)
+        for section, ticket_type_id, count in seats.values_list(
+            'section', 'ticket_type_id'
+        ).annotate(count=Count('id')).order_by():
+            counts[(section, ticket_type_id)] += count
+        return counts
+
+    @staticmethod
+    def apply_deltas(deltas):
+        """
+        Apply counter deltas keyed by (performance_id, section, ticket_type_id, status).
+        Must be called inside the transaction that changed the seats.
+        """
+        for (performance_id, section, ticket_type_id, status), delta in deltas.items():
+            if delta == 0:
+                continue
+
+            counter_qs = SeatStatusCounter.objects.filter(
+                performance_id=performance_id,
+                section=section,
+                ticket_type_id=ticket_type_id,
+                status=status
+            )
+
+            if delta < 0:
+                counter_qs.update(count=Greatest(F('count') + delta, Value(0)))
+                continue
+
+            if counter_qs.update(count=F('count') + delta):
+                continue
+
+            try:
+                with transaction.atomic():
+                    SeatStatusCounter.objects.create(
+                        performance_id=performance_id,
+                        section=section,
+                        ticket_type_id=ticket_type_id,
+                        status=status,
+                        count=delta
+                    )
+            except IntegrityError:
+                # Another transaction created the row first
+                counter_qs.update(count=F('count') + delta)
+
+    @staticmethod
+    def transition(queryset, to_status, skip_locked=False, **fields):
+        """
+        Move every seat in queryset to to_status and update the counters
+        in the same transaction. Extra fields are written alongside status.
+
+        Returns the number of seats updated.
+        """
+        with transaction.atomic():
+            locked = list(
+                queryset.select_for_update(skip_locked=skip_locked).values_list(
+                    'id', 'performance_id', 'section', 'ticket_type_id', 'status'
+                )
+            )
+            if not locked:
+                return 0
+
+            updated = Seat.objects.filter(
+                id__in=[row[0] for row in locked]
+            ).update(status=to_status, **fields)
+
+            deltas = Counter()
+            for _, performance_id, section, ticket_type_id, status in locked:
+                if status == to_status:
+                    continue
+                deltas[(performance_id, section, ticket_type_id, status)] -= 1
+                deltas[(performance_id, section, ticket_type_id, to_status)] += 1
+            SeatCounterService.apply_deltas(deltas)
+
+        return updated
+
+    @staticmethod
+    def hold_seats(queryset, reservation_id, expires_at):
+        """Reserve available seats in queryset."""
+        return SeatCounterService.transition(
+            queryset.filter(status='available'),
+            'reserved',
+            reservation_id=reservation_id,
+            reservation_expires_at=expires_at
+        )
+
+    @staticmethod
+    def release_seats(queryset, skip_locked=False):
+        """Release reserved seats in queryset back to available."""
+        return SeatCounterService.transition(
+            queryset.filter(status='reserved'),
+            'available',
+            skip_locked=skip_locked,
+            reservation_id=None,
+            reservation_expires_at=None
+        )
+
+    @staticmethod
+    def sell_seats(queryset):
+        """Mark available or reserved seats in queryset as sold."""
+        return SeatCounterService.transition(
+            queryset.filter(status__in=['available', 'reserved']),
+            'sold',
+            reservation_expires_at=None
+        )
+
+    @staticmethod
+    def expire_holds(now):
+        """Release reserved seats whose hold expired before now, skipping locked rows."""
+        return SeatCounterService.release_seats(
+            Seat.objects.filter(reservation_expires_at__lt=now),
+            skip_locked=True
+        )
+
+    @staticmethod
+    def rebuild(performance_ids=None):
+        """
+        Rebuild counters from Seat in bulk, one performance per transaction.
+
+        Returns the number of performances rebuilt.
+        """
+        if performance_ids is None:
+            performance_ids = Seat.objects.values_list(
+                'performance_id', flat=True
+            ).distinct().order_by()
+            # Also clear counters of performances that no longer have seats
+            SeatStatusCounter.objects.exclude(
+                performance_id__in=Seat.objects.values('performance_id')
+            ).delete()
+
+        rebuilt = 0
+        for performance_id in list(performance_ids):
+            with transaction.atomic():
+                aggregates = Seat.objects.filter(
+                    performance_id=performance_id
+                ).values(
+                    'section', 'ticket_type_id', 'status'
+                ).annotate(total=Count('id')).order_by()
+
+                SeatStatusCounter.objects.filter(performance_id=performance_id).delete()
+                SeatStatusCounter.objects.bulk_create([
+                    SeatStatusCounter(
+                        performance_id=performance_id,
+                        section=row['section'],
+                        ticket_type_id=row['ticket_type_id'],
+                        status=row['status'],
+                        count=row['total']
+                    )
+                    for row in aggregates
+                ])
+            rebuilt += 1
+
+        logger.info(f"Rebuilt seat counters for {rebuilt} performances")
+        return rebuilt
@@ -0,0 +1,388 @@
+"""
+Seat hold engine for Events.
+Holds live in Redis (or process memory for development) with a TTL instead of
+locked Seat rows, so expired holds free up immediately and hold/release never
+waits on database row locks. Seat rows are only written when a hold is confirmed.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS: index, seat keys...  ARGV: reservation_id, ttl_ms, now_ms, seat ids...
+HOLD_SCRIPT = """
+local conflicts = {}
+for i = 2, #KEYS do
+    local holder = redis.call('GET', KEYS[i])
+    if holder and holder ~= ARGV[1] then
+        table.insert(conflicts, ARGV[i + 2])
+    end
+end
+if #conflicts > 0 then
+    return conflicts
+end
+local expires = tonumber(ARGV[3]) + tonumber(ARGV[2])
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[1], 'PX', ARGV[2])
+    redis.call('ZADD', KEYS[1], expires, ARGV[i + 2])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return conflicts
+"""
+
+# KEYS: index, seat keys...  ARGV: reservation_id, ttl_ms, now_ms, seat ids...
+EXTEND_SCRIPT = """
+local missing = {}
+for i = 2, #KEYS do
+    if redis.call('GET', KEYS[i]) ~= ARGV[1] then
+        table.insert(missing, ARGV[i + 2])
+    end
+end
+if #missing > 0 then
+    return missing
+end
+local expires = tonumber(ARGV[3]) + tonumber(ARGV[2])
+for i = 2, #KEYS do
+    redis.call('PEXPIRE', KEYS[i], ARGV[2])
+    redis.call('ZADD', KEYS[1], expires, ARGV[i + 2])
+end
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return missing
+"""
+
+# KEYS: index, seat keys...  ARGV: reservation_id ('' releases any holder), seat ids...
+RELEASE_SCRIPT = """
+local released = 0
+for i = 2, #KEYS do
+    local holder = redis.call('GET', KEYS[i])
+    if holder and (ARGV[1] == '' or holder == ARGV[1]) then
+        redis.call('DEL', KEYS[i])
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+class LocalSeatHoldStore:
+    """
+    In-process seat hold store for development and tests.
+    Same semantics as the Redis store, guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holds = {}
+
+    def _live_holds(self, performance_id, now):
+        """Return the holds of a performance, dropping expired ones."""
+        holds = self._holds.setdefault(str(performance_id), {})
+        for seat_id in [s for s, (_, expires) in holds.items() if expires <= now]:
+            del holds[seat_id]
+        return holds
+
+    def hold(self, performance_id, seat_ids, reservation_id, ttl_seconds):
+        with self._lock:
+            now = time.time()
+            holds = self._live_holds(performance_id, now)
+            conflicts = [
+                seat_id for seat_id in seat_ids
+                if seat_id in holds and holds[seat_id][0] != reservation_id
+            ]
+            if not conflicts:
+                for seat_id in seat_ids:
+                    holds[seat_id] = (reservation_id, now + ttl_seconds)
+            return conflicts
+
+    def extend(self, performance_id, seat_ids, reservation_id, ttl_seconds):
+        with self._lock:
+            now = time.time()
+            holds = self._live_holds(performance_id, now)
+            missing = [
+                seat_id for seat_id in seat_ids
+                if holds.get(seat_id, (None,))[0] != reservation_id
+            ]
+            if not missing:
+                for seat_id in seat_ids:
+                    holds[seat_id] = (reservation_id, now + ttl_seconds)
+            return missing
+
+    def release(self, performance_id, seat_ids, reservation_id=None):
+        with self._lock:
+            holds = self._live_holds(performance_id, time.time())
+            released = 0
+            for seat_id in seat_ids:
+                holder = holds.get(seat_id, (None,))[0]
+                if holder and (not reservation_id or holder == reservation_id):
+                    del holds[seat_id]
+                    released += 1
+            return released
+
+    def held_seats(self, performance_id):
+        with self._lock:
+            holds = self._live_holds(performance_id, time.time())
+            return {seat_id: reservation_id for seat_id, (reservation_id, _) in holds.items()}
+
+    def reservation_seats(self, performance_id, reservation_id):
+        return [
+            seat_id for seat_id, holder in self.held_seats(performance_id).items()
+            if holder == reservation_id
+        ]
+
+
+class RedisSeatHoldStore:
+    """
+    Redis seat hold store. Each seat hold is a key with a TTL; a sorted set per
+    performance, scored by expiry, indexes live holds for seat-map reads.
+    Multi-seat holds are applied atomically by Lua scripts.
+    """
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._hold = self.client.register_script(HOLD_SCRIPT)
+        self._extend = self.client.register_script(EXTEND_SCRIPT)
+        self._release = self.client.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def _index_key(performance_id):
+        return f"seat_hold:{performance_id}"
+
+    @staticmethod
+    def _seat_key(performance_id, seat_id):
+        return f"seat_hold:{performance_id}:{seat_id}"
+
+    def _keys(self, performance_id, seat_ids):
+        return [self._index_key(performance_id)] + [
+            self._seat_key(performance_id, seat_id) for seat_id in seat_ids
+        ]
+
+    def hold(self, performance_id, seat_ids, reservation_id, ttl_seconds):
+        now_ms = int(time.time() * 1000)
+        return self._hold(
+            keys=self._keys(performance_id, seat_ids),
+            args=[reservation_id, int(ttl_seconds * 1000), now_ms, *seat_ids]
+        )
+
+    def extend(self, performance_id, seat_ids, reservation_id, ttl_seconds):
+        now_ms = int(time.time() * 1000)
+        return self._extend(
+            keys=self._keys(performance_id, seat_ids),
+            args=[reservation_id, int(ttl_seconds * 1000), now_ms, *seat_ids]
+        )
+
+    def release(self, performance_id, seat_ids, reservation_id=None):
+        return self._release(
+            keys=self._keys(performance_id, seat_ids),
+            args=[reservation_id or '', *seat_ids]
+        )
+
+    def held_seats(self, performance_id):
+        now_ms = int(time.time() * 1000)
+        seat_ids = self.client.zrangebyscore(self._index_key(performance_id), now_ms, '+inf')
+        if not seat_ids:
+            return {}
+        holders = self.client.mget([self._seat_key(performance_id, s) for s in seat_ids])
+        return {
+            seat_id: holder for seat_id, holder in zip(seat_ids, holders) if holder
+        }
+
+    def reservation_seats(self, performance_id, reservation_id):
+        return [
+            seat_id for seat_id, holder in self.held_seats(performance_id).items()
+            if holder == reservation_id
+        ]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class SeatHoldService:
+    """
+    Service class for TTL-based seat holds.
+    """
+
+    @staticmethod
+    def get_store():
+        """Return the configured hold store, created once per process."""
+        global _store
+        if _store is None:
+            with _store_lock:
+                if _store is None:
+                    backend = getattr(settings, 'SEAT_HOLD_BACKEND', 'local')
+                    if backend == 'redis':
+                        _store = RedisSeatHoldStore(settings.SEAT_HOLD_REDIS_URL)
+                    else:
+                        _store = LocalSeatHoldStore()
+        return _store
+
+    @staticmethod
+    def hold_seats(performance_id, seat_ids, ttl_seconds=None, reservation_id=None):
+        """
+        Hold all seats atomically or none of them.
+
+        Returns (True, hold) with reservation_id, expires_at and seat_ids,
+        or (False, conflicting_seat_ids).
+        """
+        ttl_seconds = ttl_seconds or settings.SEAT_HOLD_TTL_SECONDS
+        seat_ids = [str(seat_id) for seat_id in seat_ids]
+        reservation_id = reservation_id or uuid.uuid4().hex
+
+        conflicts = SeatHoldService.get_store().hold(
+            str(performance_id), seat_ids, reservation_id, ttl_seconds
+        )
+        if conflicts:
+            return False, list(conflicts)
+
+        return True, {
+            'reservation_id': reservation_id,
+            'expires_at': timezone.now() + timedelta(seconds=ttl_seconds),
+            'seat_ids': seat_ids,
+        }
+
+    @staticmethod
+    def release_seats(performance_id, reservation_id=None, seat_ids=None):
+        """Release held seats by reservation or by seat ids. Returns the number released."""
+        store = SeatHoldService.get_store()
+        if reservation_id and not seat_ids:
+            seat_ids = store.reservation_seats(str(performance_id), reservation_id)
+        if not seat_ids:
+            return 0
+        return store.release(
+            str(performance_id), [str(seat_id) for seat_id in seat_ids], reservation_id
+        )
+
+    @staticmethod
+    def get_held_seats(performance_id):
+        """Return {seat_id: reservation_id} for live holds of a performance."""
+        return SeatHoldService.get_store().held_seats(str(performance_id))
+
+    @staticmethod
+    def get_unavailable_seats(performance_id, seat_ids, reservation_id=None):
+        """
+        Return the seats among seat_ids that cannot be booked under
+        reservation_id: missing, not available on their Seat row, or held by
+        another reservation.
+        """
+        from .models import Seat
+
+        seat_ids = [str(seat_id) for seat_id in seat_ids]
+        available = {
+            str(seat_id) for seat_id in Seat.objects.filter(
+                performance_id=performance_id, id__in=seat_ids, status='available'
+            ).values_list('id', flat=True)
+        }
+        held_seats = SeatHoldService.get_held_seats(performance_id)
+        return [
+            seat_id for seat_id in seat_ids
+            if seat_id not in available or held_seats.get(seat_id, reservation_id) != reservation_id
+        ]
+
+    @staticmethod
+    def hold_selected_seats(performance_id, seats, reservation_id=None, ttl_seconds=None):
+        """
+        Hold the seats of a cart or order item, given as booking_data seat
+        dicts with a seat_id. Seats keep the reservation they were held under
+        and their holds are extended; seats without one are held under
+        reservation_id, or a new reservation, recorded on the seat dict.
+
+        Returns the seat ids that are sold or held by someone else; on any
+        conflict no new hold is kept.
+        """
+        new_reservation_id = reservation_id or uuid.uuid4().hex
+        groups = {}
+        for seat in seats:
+            if seat.get('seat_id'):
+                groups.setdefault(seat.get('reservation_id') or new_reservation_id, []).append(seat['seat_id'])
+
+        for group_reservation_id, seat_ids in groups.items():
+            unavailable = SeatHoldService.get_unavailable_seats(performance_id, seat_ids, group_reservation_id)
+            if unavailable:
+                return unavailable
+
+        for group_reservation_id, seat_ids in groups.items():
+            held, result = SeatHoldService.hold_seats(
+                performance_id, seat_ids, ttl_seconds, group_reservation_id
+            )
+            if not held:
+                if new_reservation_id in groups:
+                    SeatHoldService.release_seats(
+                        performance_id, new_reservation_id, groups[new_reservation_id]
+                    )
+                return result
+
+        for seat in seats:
+            if seat.get('seat_id') and not seat.get('reservation_id'):
+                seat['reservation_id'] = new_reservation_id
+        return []
+
+    @staticmethod
+    def confirm_hold(performance_id, reservation_id, seat_ids=None):
+        """
+        Confirm a hold and sell its seats in the current transaction. The hold
+        is dropped once the transaction commits; until then it keeps the seats
+        from being re-held. With seat_ids only those seats are confirmed, and
+        seats whose hold expired are held again as long as nobody else took them.
+
+        Returns (True, seat_ids) or (False, error message).
+        """
+        from .models import Seat
+        from .seat_counters import SeatCounterService
+
+        store = SeatHoldService.get_store()
+        if seat_ids is None:
+            seat_ids = store.reservation_seats(str(performance_id), reservation_id)
+            if not seat_ids:
+                return False, 'Reservation not found or expired'
+            missing = store.extend(
+                str(performance_id), seat_ids, reservation_id,
+                settings.SEAT_HOLD_CONFIRM_TTL_SECONDS
+            )
+        else:
+            seat_ids = [str(seat_id) for seat_id in seat_ids]
+            missing = SeatHoldService.get_unavailable_seats(performance_id, seat_ids, reservation_id)
+            if not missing:
+                missing = store.hold(
+                    str(performance_id), seat_ids, reservation_id,
+                    settings.SEAT_HOLD_CONFIRM_TTL_SECONDS
+                )
+        if missing:
+            return False, 'Reservation expired'
+
+        sold_count = SeatCounterService.sell_seats(
+            Seat.objects.filter(performance_id=performance_id, id__in=seat_ids)
+        )
+        if sold_count != len(seat_ids):
+            logger.warning(
+                f"Seat hold {reservation_id} confirmed {len(seat_ids)} seats but sold {sold_count}"
+            )
+
+        logger.info(f"Confirmed seat hold {reservation_id} for {len(seat_ids)} seats")
+        transaction.on_commit(
+            lambda: SeatHoldService._release_confirmed(performance_id, reservation_id, seat_ids)
+        )
+        return True, seat_ids
+
+    @staticmethod
+    def _release_confirmed(performance_id, reservation_id, seat_ids):
+        """Drop the hold of sold seats. On failure the hold simply expires."""
+        try:
+            SeatHoldService.release_seats(performance_id, reservation_id=reservation_id, seat_ids=seat_ids)
+        except Exception as e:
+            logger.warning(f"Could not release confirmed seat hold {reservation_id}: {e}")
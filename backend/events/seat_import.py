@@ -0,0 +1,187 @@
+"""
+Bulk seat import for Events.
+Seats are written with bulk_create in chunks, each in its own transaction,
+and existing seats are skipped through the Seat unique constraint.
+Counters and seat-map layouts are refreshed once per performance afterwards.
+"""
+
+import logging
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+
+from .models import Seat, TicketType
+from .seat_counters import SeatCounterService
+from .seat_map import SeatMapService
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = ['1', 'true', 'yes']
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SeatImportService:
+    """
+    Service class for importing, generating and cloning seats in bulk.
+    """
+
+    DEFAULT_CHUNK_SIZE = 2000
+
+    @staticmethod
+    def _ticket_type_lookup(event_id):
+        """Map ticket type ids and lower-cased names of an event to ids."""
+        lookup = {}
+        for ticket_type_id, name in TicketType.objects.filter(
+            event_id=event_id
+        ).values_list('id', 'name'):
+            lookup[str(ticket_type_id)] = ticket_type_id
+            lookup[name.lower()] = ticket_type_id
+        return lookup
+
+    @staticmethod
+    def _bulk_insert(performance_ids, seat_chunks, progress=None):
+        """
+        Insert chunks of unsaved seats, one transaction per chunk.
+        Returns (processed, created).
+        """
+        performance_ids = list(performance_ids)
+        seats_qs = Seat.objects.filter(performance_id__in=performance_ids)
+        before = seats_qs.count()
+        processed = created = 0
+
+        try:
+            for chunk in seat_chunks:
+                with transaction.atomic():
+                    Seat.objects.bulk_create(chunk, ignore_conflicts=True)
+                processed += len(chunk)
+                after = seats_qs.count()
+                created += after - before
+                before = after
+                if progress:
+                    progress(processed, created)
+        finally:
+            # bulk_create skips signals, so refresh derived data once at the end
+            SeatCounterService.rebuild(performance_ids)
+            for performance_id in performance_ids:
+                SeatMapService.invalidate_layout(performance_id)
+
+        return processed, created
+
+    @staticmethod
+    def import_rows(performance, rows, base_price=Decimal('100.00'), currency='USD',
+                    chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """
+        Import seats from dict rows (as read from a CSV). Rows without a seat
+        number are skipped. Returns (processed, created).
+        """
+        ticket_types = SeatImportService._ticket_type_lookup(performance.event_id)
+
+        def build_seats():
+            for row in rows:
+                seat_number = row.get('seat_number') or row.get('seat')
+                if not seat_number:
+                    continue
+                ticket_type = str(row.get('ticket_type') or row.get('ticket_type_id') or '').strip()
+                yield Seat(
+                    performance_id=performance.id,
+                    ticket_type_id=ticket_types.get(ticket_type) or ticket_types.get(ticket_type.lower()),
+                    section=str(row.get('section') or 'General'),
+                    row_number=str(row.get('row_number') or row.get('row') or '1'),
+                    seat_number=str(seat_number),
+                    price=Decimal(str(row.get('price') or base_price)),
+                    currency=row.get('currency') or currency,
+                    is_premium=str(row.get('is_premium', '')).lower() in TRUE_VALUES,
+                    is_wheelchair_accessible=str(
+                        row.get('is_wheelchair_accessible', '')
+                    ).lower() in TRUE_VALUES,
+                    status='available',
+                )
+
+        return SeatImportService._bulk_insert(
+            [performance.id], _chunks(build_seats(), chunk_size), progress
+        )
+
+    @staticmethod
+    def generate_grid(performance, sections, row_numbers, seats_per_row,
+                      base_price=Decimal('100.00'), currency='USD',
+                      chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """Generate a sections × rows × seats grid. Returns (processed, created)."""
+        rows = (
+            {
+                'section': section,
+                'row_number': row_number,
+                'seat_number': seat_idx,
+                'price': base_price,
+                'currency': currency,
+            }
+            for section in sections
+            for row_number in row_numbers
+            for seat_idx in range(1, seats_per_row + 1)
+        )
+        return SeatImportService.import_rows(
+            performance, rows, base_price, currency, chunk_size, progress
+        )
+
+    @staticmethod
+    def clone_layout(source_performance, target_performances,
+                     chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """
+        Copy the seats of one performance to many others as available seats.
+        Ticket types are kept within the same event and matched by name across
+        events. Returns (processed, created).
+        """
+        target_performances = [
+            target for target in target_performances if target.id != source_performance.id
+        ]
+        source_seats = list(Seat.objects.filter(performance=source_performance).values(
+            'section', 'row_number', 'seat_number', 'price', 'currency',
+            'is_premium', 'is_wheelchair_accessible', 'ticket_type__name', 'ticket_type_id'
+        ))
+        ticket_types_by_event = {}
+
+        def build_seats():
+            for target in target_performances:
+                if target.event_id not in ticket_types_by_event:
+                    ticket_types_by_event[target.event_id] = SeatImportService._ticket_type_lookup(
+                        target.event_id
+                    )
+                ticket_types = ticket_types_by_event[target.event_id]
+                same_event = target.event_id == source_performance.event_id
+
+                for seat in source_seats:
+                    if same_event:
+                        ticket_type_id = seat['ticket_type_id']
+                    else:
+                        ticket_type_id = ticket_types.get((seat['ticket_type__name'] or '').lower())
+                    yield Seat(
+                        performance_id=target.id,
+                        ticket_type_id=ticket_type_id,
+                        section=seat['section'],
+                        row_number=seat['row_number'],
+                        seat_number=seat['seat_number'],
+                        price=seat['price'],
+                        currency=seat['currency'],
+                        is_premium=seat['is_premium'],
+                        is_wheelchair_accessible=seat['is_wheelchair_accessible'],
+                        status='available',
+                    )
+
+        processed, created = SeatImportService._bulk_insert(
+            [target.id for target in target_performances],
+            _chunks(build_seats(), chunk_size),
+            progress
+        )
+        logger.info(
+            f"Cloned {len(source_seats)} seats from performance {source_performance.id} "
+            f"to {len(target_performances)} performances ({created} created)"
+        )
+        return processed, created
@@ -0,0 +1,198 @@
+"""
+Compact seat maps for Events.
+A performance seat map is split into a static layout, cached and served with an
+ETag, and a status array packed at 2 bits per seat in layout order. Status
+responses carry a content version so clients can poll for deltas.
+"""
+
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from .models import Seat
+
+# 2-bit status codes, in layout order
+STATUS_CODES = {'available': 0, 'reserved': 1, 'sold': 2, 'blocked': 3}
+
+# Layout flag bits
+FLAG_WHEELCHAIR = 1
+FLAG_PREMIUM = 2
+
+# Fields that affect the layout; a change to any of them invalidates it
+LAYOUT_FIELDS = (
+    'performance_id', 'section', 'row_number', 'seat_number',
+    'price', 'currency', 'is_wheelchair_accessible', 'is_premium'
+)
+
+
+def pack_statuses(codes):
+    """Pack 2-bit status codes, four seats per byte, lowest bits first."""
+    packed = bytearray((len(codes) + 3) // 4)
+    for index, code in enumerate(codes):
+        packed[index >> 2] |= (code & 3) << ((index & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_statuses(data, count):
+    """Unpack count 2-bit status codes from packed bytes."""
+    return [(data[index >> 2] >> ((index & 3) * 2)) & 3 for index in range(count)]
+
+
+class SeatMapService:
+    """
+    Service class for compact performance seat maps.
+    """
+
+    LAYOUT_TIMEOUT = 3600
+    # Short-lived status cache absorbs polling bursts during on-sales
+    STATUS_TIMEOUT = 2
+    # How long old status snapshots stay available for deltas
+    SNAPSHOT_TIMEOUT = 600
+
+    @staticmethod
+    def _layout_key(performance_id):
+        return f"seat_map_layout:{performance_id}"
+
+    @staticmethod
+    def _status_key(performance_id):
+        return f"seat_map_status:{performance_id}"
+
+    @staticmethod
+    def _snapshot_key(performance_id, version):
+        return f"seat_map_snapshot:{performance_id}:{version}"
+
+    @staticmethod
+    def get_layout(performance_id):
+        """
+        Return the static layout of a performance as parallel seat arrays.
+        Seat order defines the ordinals used by the status array.
+        """
+        cache_key = SeatMapService._layout_key(performance_id)
+        layout = cache.get(cache_key)
+        if layout is not None:
+            return layout
+
+        sections = {}
+        price_tiers = {}
+        seats = {'id': [], 'section': [], 'row': [], 'number': [], 'tier': [], 'flags': []}
+
+        rows = Seat.objects.filter(performance_id=performance_id).order_by(
+            'section', 'row_number', 'seat_number', 'id'
+        ).values_list(
+            'id', 'section', 'row_number', 'seat_number', 'price', 'currency',
+            'is_wheelchair_accessible', 'is_premium'
+        )
+        for seat_id, section, row, number, price, currency, wheelchair, premium in rows.iterator():
+            tier = (str(price), currency)
+            seats['id'].append(str(seat_id))
+            seats['section'].append(sections.setdefault(section, len(sections)))
+            seats['row'].append(row)
+            seats['number'].append(number)
+            seats['tier'].append(price_tiers.setdefault(tier, len(price_tiers)))
+            seats['flags'].append(
+                (FLAG_WHEELCHAIR if wheelchair else 0) | (FLAG_PREMIUM if premium else 0)
+            )
+
+        layout = {
+            'performance_id': str(performance_id),
+            'count': len(seats['id']),
+            'sections': list(sections),
+            'price_tiers': [
+                {'price': price, 'currency': currency} for price, currency in price_tiers
+            ],
+            'seats': seats,
+        }
+        layout['etag'] = hashlib.blake2b(
+            json.dumps(layout, sort_keys=True).encode(), digest_size=16
+        ).hexdigest()
+
+        cache.set(cache_key, layout, SeatMapService.LAYOUT_TIMEOUT)
+        return layout
+
+    @staticmethod
+    def invalidate_layout(performance_id):
+        """Drop the cached layout and status after seats are added, removed or moved."""
+        cache.delete_many([
+            SeatMapService._layout_key(performance_id),
+            SeatMapService._status_key(performance_id),
+        ])
+
+    @staticmethod
+    def get_status(performance_id):
+        """
+        Return the packed status array of a performance in layout order.
+        Live holds from the hold engine show as reserved.
+        """
+        cache_key = SeatMapService._status_key(performance_id)
+        status = cache.get(cache_key)
+        if status is not None:
+            return status
+
+        from .seat_holds import SeatHoldService
+
+        layout = SeatMapService.get_layout(performance_id)
+        seat_status = {
+            str(seat_id): seat_status for seat_id, seat_status in
+            Seat.objects.filter(performance_id=performance_id).values_list('id', 'status').iterator()
+        }
+        held_seats = SeatHoldService.get_held_seats(performance_id)
+
+        codes = []
+        for seat_id in layout['seats']['id']:
+            code = STATUS_CODES.get(seat_status.get(seat_id), STATUS_CODES['blocked'])
+            if code == STATUS_CODES['available'] and seat_id in held_seats:
+                code = STATUS_CODES['reserved']
+            codes.append(code)
+
+        data = pack_statuses(codes)
+        status = {
+            'version': hashlib.blake2b(
+                layout['etag'].encode() + data, digest_size=8
+            ).hexdigest(),
+            'layout_etag': layout['etag'],
+            'count': len(codes),
+            'data': data,
+        }
+
+        # Snapshots are content-addressed, so a version always maps to the same data
+        cache.add(
+            SeatMapService._snapshot_key(performance_id, status['version']),
+            (layout['etag'], data),
+            SeatMapService.SNAPSHOT_TIMEOUT
+        )
+        cache.set(cache_key, status, SeatMapService.STATUS_TIMEOUT)
+        return status
+
+    @staticmethod
+    def get_changes(performance_id, since_version, status=None):
+        """
+        Return [[ordinal, code], ...] for seats that changed since a version,
+        or None when the version is unknown and the client needs the full array.
+        """
+        status = status or SeatMapService.get_status(performance_id)
+        if since_version == status['version']:
+            return []
+
+        previous = cache.get(SeatMapService._snapshot_key(performance_id, since_version))
+        if previous is None or previous[0] != status['layout_etag']:
+            return None
+
+        old_codes = unpack_statuses(previous[1], status['count'])
+        new_codes = unpack_statuses(status['data'], status['count'])
+        return [
+            [ordinal, code] for ordinal, (old, code) in enumerate(zip(old_codes, new_codes))
+            if old != code
+        ]
+
+    @staticmethod
+    def encode_status(status):
+        """JSON-friendly status with the packed array as base64."""
+        return {
+            'version': status['version'],
+            'layout_etag': status['layout_etag'],
+            'count': status['count'],
+            'encoding': '2bit-base64',
+            'data': base64.b64encode(status['data']).decode('ascii'),
+        }
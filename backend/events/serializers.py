@@ -99,33 +99,40 @@ class EventPerformanceSerializer(serializers.ModelSerializer):
             'min_price',
         ]
     
+    def _capacity_matrix(self, obj):
+        """Capacity matrix shared through the serializer context, or built for obj."""
+        matrix = self.context.get('capacity_matrix')
+        if matrix is not None and matrix.covers(obj.id):
+            return matrix
+        if not hasattr(obj, '_capacity_matrix'):
+            from .capacity_manager import CapacityManager
+            obj._capacity_matrix = CapacityManager.get_capacity_matrix(obj)
+        return obj._capacity_matrix
+    
     def get_sections_summary(self, obj):
-        """Get sections summary grouped by ticket type using efficient database queries."""
+        """Get sections summary grouped by ticket type from the capacity matrix."""
         sections_data = {}
+        matrix = self._capacity_matrix(obj)
         
-        # Get all available seats grouped by section
-        seat_aggregates = obj.seats.filter(status='available').values(
-            'section'
-        ).annotate(
-            total_seats=Count('id'),
-            min_price=Min('price'),
-            max_price=Max('price'),
-            has_premium=Count('id', filter=Q(is_premium=True))
-        )
+        # Available seats grouped by section
+        seat_aggregates = []
+        for section in matrix.sections(obj.id):
+            summary = matrix.price_summary(obj.id, section)
+            if summary:
+                seat_aggregates.append((section, summary))
         
         # Create sections data for each ticket type
         for ticket_type in obj.event.ticket_types.filter(is_active=True):
             ticket_type_id = str(ticket_type.id)
             sections_data[ticket_type_id] = {}
             
-            for aggregate in seat_aggregates:
-                section = aggregate['section']
+            for section, aggregate in seat_aggregates:
                 sections_data[ticket_type_id][section] = {
                     'section_name': section,
                     'total_seats': aggregate['total_seats'],
                     'min_price': float(aggregate['min_price']),
                     'max_price': float(aggregate['max_price']),
-                    'has_premium': aggregate['has_premium'] > 0
+                    'has_premium': aggregate['has_premium']
                 }
         
         return sections_data
@@ -134,10 +141,10 @@ class EventPerformanceSerializer(serializers.ModelSerializer):
         """Get ticket type availability for this performance."""
         availability = {}
         
+        # Count all available seats (since seats are not tied to specific ticket types)
+        available_seats = self._capacity_matrix(obj).count(obj.id, status='available')
+        
         for ticket_type in obj.event.ticket_types.filter(is_active=True):
-            # Count all available seats (since seats are not tied to specific ticket types)
-            available_seats = obj.seats.filter(status='available').count()
-            
             availability[str(ticket_type.id)] = {
                 'ticket_type_name': ticket_type.name,
                 'available_count': available_seats,
@@ -692,7 +699,7 @@ class EventDetailSerializer(serializers.ModelSerializer, ImageFieldSerializerMix
             is_available=True
         ).order_by('date', 'start_time')
         
-        return EventPerformanceSerializer(performances, many=True).data
+        return EventPerformanceSerializer(performances, many=True, context=self.context).data
     
     def get_pricing_summary(self, obj):
         """Get pricing summary for all ticket types with optimized queries."""
@@ -858,18 +865,23 @@ class EventDetailSerializer(serializers.ModelSerializer, ImageFieldSerializerMix
     
     def get_capacity_overview(self, obj):
         """Get overall capacity overview for the event."""
-        total_performances = obj.performances.count()
-        available_performances = obj.performances.filter(is_available=True).count()
-        
-        # Calculate average capacity across all performances
-        performances = obj.performances.all()
+        performances = list(obj.performances.all())
         if performances:
-            total_capacity = sum(p.max_capacity for p in performances)
-            available_capacity = sum(p.available_capacity for p in performances)
+            matrix = self._event_capacity_matrix(obj, performances)
+            total_capacity = 0
+            available_capacity = 0
+            for performance in performances:
+                # Prefer actual seat counts; performances without seats use stored capacity
+                if matrix.has_seats(performance.id):
+                    total_capacity += matrix.count(performance.id)
+                    available_capacity += matrix.count(performance.id, status='available')
+                else:
+                    total_capacity += performance.max_capacity
+                    available_capacity += performance.available_capacity
             
             return {
-                'total_performances': total_performances,
-                'available_performances': available_performances,
+                'total_performances': len(performances),
+                'available_performances': sum(1 for p in performances if p.is_available),
                 'total_capacity': total_capacity,
                 'available_capacity': available_capacity,
                 'overall_occupancy_rate': ((total_capacity - available_capacity) / total_capacity * 100) if total_capacity > 0 else 0
@@ -883,6 +895,23 @@ class EventDetailSerializer(serializers.ModelSerializer, ImageFieldSerializerMix
             'overall_occupancy_rate': 0
         }
 
+    def _event_capacity_matrix(self, obj, performances=None):
+        """Capacity matrix for all performances of the event, built once per event."""
+        matrix = self.context.get('capacity_matrix')
+        if matrix is None or getattr(matrix, 'event_id', None) != obj.id:
+            from .capacity_manager import CapacityManager
+            if performances is None:
+                performances = obj.performances.all()
+            matrix = CapacityManager.get_capacity_matrix(performances)
+            matrix.event_id = obj.id
+            self.context['capacity_matrix'] = matrix
+        return matrix
+
+    def to_representation(self, instance):
+        # Share one capacity matrix with the nested performance serializers
+        self._event_capacity_matrix(instance)
+        return super().to_representation(instance)
+
     def get_cancellation_policies(self, obj):
         """Get cancellation policies for the event."""
         from .models import EventCancellationPolicy
@@ -0,0 +1,109 @@
+"""
+Django signals for keeping seat status counters, seat-map layouts and cached
+prices in sync.
+"""
+
+from collections import Counter
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import (
+    Seat, EventSection, SectionTicketType, TicketType, EventOption,
+    EventDiscount, EventFee, EventPricingRule,
+)
+from .pricing_service import EventPriceCalculator
+from .seat_counters import SeatCounterService
+from .seat_map import LAYOUT_FIELDS, SeatMapService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _counter_key(seat, status=None):
+    return (seat.performance_id, seat.section, seat.ticket_type_id, status or seat.status)
+
+
+def _layout_values(seat):
+    return tuple(getattr(seat, field) for field in LAYOUT_FIELDS)
+
+
+@receiver(pre_save, sender=Seat)
+def capture_old_counter_key(sender, instance, **kwargs):
+    """Capture the counter key and layout values a seat currently has."""
+    instance._old_counter_key = None
+    instance._old_layout_values = None
+    if instance._state.adding:
+        return
+    old = Seat.objects.filter(pk=instance.pk).values(
+        'ticket_type_id', 'status', *LAYOUT_FIELDS
+    ).first()
+    if old:
+        instance._old_counter_key = (
+            old['performance_id'], old['section'], old['ticket_type_id'], old['status']
+        )
+        instance._old_layout_values = tuple(old[field] for field in LAYOUT_FIELDS)
+
+
+@receiver(post_save, sender=Seat)
+def update_counters_on_save(sender, instance, created, **kwargs):
+    """Move the seat between counters when it is created or its status changes."""
+    old_key = getattr(instance, '_old_counter_key', None)
+    new_key = _counter_key(instance)
+    if old_key == new_key:
+        return
+
+    deltas = Counter({new_key: 1})
+    if old_key:
+        deltas[old_key] -= 1
+    SeatCounterService.apply_deltas(deltas)
+
+
+@receiver(post_save, sender=Seat)
+def invalidate_seat_map_on_save(sender, instance, created, **kwargs):
+    """Drop the cached seat-map layout when a seat is added or its layout changes."""
+    old_values = getattr(instance, '_old_layout_values', None)
+    if not created and old_values == _layout_values(instance):
+        return
+
+    SeatMapService.invalidate_layout(instance.performance_id)
+    if old_values and old_values[0] != instance.performance_id:
+        SeatMapService.invalidate_layout(old_values[0])
+
+
+@receiver(post_delete, sender=Seat)
+def update_counters_on_delete(sender, instance, **kwargs):
+    """Decrement the counter of a deleted seat and drop its seat-map layout."""
+    SeatCounterService.apply_deltas(Counter({_counter_key(instance): -1}))
+    SeatMapService.invalidate_layout(instance.performance_id)
+
+
+@receiver(post_save, sender=EventSection)
+@receiver(post_delete, sender=EventSection)
+def invalidate_section_pricing(sender, instance, **kwargs):
+    """Drop cached prices of the performance a section belongs to."""
+    EventPriceCalculator.bump_pricing_version(performance_id=instance.performance_id)
+
+
+@receiver(post_save, sender=SectionTicketType)
+@receiver(post_delete, sender=SectionTicketType)
+def invalidate_section_ticket_pricing(sender, instance, **kwargs):
+    """Drop cached prices of the performance a section ticket type belongs to."""
+    performance_id = EventSection.objects.filter(
+        pk=instance.section_id
+    ).values_list('performance_id', flat=True).first()
+    if performance_id:
+        EventPriceCalculator.bump_pricing_version(performance_id=performance_id)
+
+
+@receiver(post_save, sender=TicketType)
+@receiver(post_delete, sender=TicketType)
+@receiver(post_save, sender=EventOption)
+@receiver(post_delete, sender=EventOption)
+@receiver(post_save, sender=EventDiscount)
+@receiver(post_delete, sender=EventDiscount)
+@receiver(post_save, sender=EventFee)
+@receiver(post_delete, sender=EventFee)
+@receiver(post_save, sender=EventPricingRule)
+@receiver(post_delete, sender=EventPricingRule)
+def invalidate_event_pricing(sender, instance, **kwargs):
+    """Drop cached prices of every performance of the event."""
+    EventPriceCalculator.bump_pricing_version(event_id=instance.event_id)
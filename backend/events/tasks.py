@@ -7,10 +7,11 @@ from celery import shared_task
 from django.utils import timezone
 from django.db import transaction
 from django.core.cache import cache
-from django.db.models import Q
+from django.db.models import Q, Count
 
-from .models import Event, EventPerformance, EventSection, SectionTicketType, Seat
+from .models import Event, EventPerformance, EventSection, SectionTicketType, Seat, SeatStatusCounter
 from .optimizations import SeatSelectionOptimizer
+from .seat_counters import SeatCounterService
 
 logger = logging.getLogger(__name__)
 
@@ -62,15 +63,12 @@ def cleanup_expired_reservations(self):
                 # Get seat IDs for this performance
                 seat_ids = [seat.id for seat in seats]
                 
-                # Update seats back to available
-                updated_count = Seat.objects.filter(
-                    id__in=seat_ids,
-                    status='reserved',
-                    reservation_expires_at__lt=now
-                ).update(
-                    status='available',
-                    reservation_id=None,
-                    reservation_expires_at=None
+                # Update seats back to available together with their status counters
+                updated_count = SeatCounterService.release_seats(
+                    Seat.objects.filter(
+                        id__in=seat_ids,
+                        reservation_expires_at__lt=now
+                    )
                 )
                 
                 total_released += updated_count
@@ -168,85 +166,37 @@ def validate_capacity_consistency(self):
     try:
         logger.info("Starting capacity consistency validation...")
         
-        inconsistencies = []
+        # Compare stored seat counters against actual seat counts in one pass each
+        actual = {
+            (row['performance_id'], row['section'], row['ticket_type_id'], row['status']): row['total']
+            for row in Seat.objects.values(
+                'performance_id', 'section', 'ticket_type_id', 'status'
+            ).annotate(total=Count('id')).order_by()
+        }
+        stored = {
+            (row['performance_id'], row['section'], row['ticket_type_id'], row['status']): row['count']
+            for row in SeatStatusCounter.objects.filter(count__gt=0).values(
+                'performance_id', 'section', 'ticket_type_id', 'status', 'count'
+            )
+        }
         
-        # Check all SectionTicketType objects
-        for stt in SectionTicketType.objects.select_related('section', 'ticket_type').all():
-            try:
-                # Get actual seat counts
-                actual_available = Seat.objects.filter(
-                    performance=stt.section.performance,
-                    section=stt.section.name,
-                    ticket_type=stt.ticket_type,
-                    status='available'
-                ).count()
-                
-                actual_reserved = Seat.objects.filter(
-                    performance=stt.section.performance,
-                    section=stt.section.name,
-                    ticket_type=stt.ticket_type,
-                    status='reserved'
-                ).count()
-                
-                actual_sold = Seat.objects.filter(
-                    performance=stt.section.performance,
-                    section=stt.section.name,
-                    ticket_type=stt.ticket_type,
-                    status='sold'
-                ).count()
-                
-                # Check if there's a mismatch
-                if (stt.available_capacity != actual_available or
-                    stt.reserved_capacity != actual_reserved or
-                    stt.sold_capacity != actual_sold):
-                    
-                    inconsistencies.append({
-                        'stt': stt,
-                        'stored': {
-                            'available': stt.available_capacity,
-                            'reserved': stt.reserved_capacity,
-                            'sold': stt.sold_capacity
-                        },
-                        'actual': {
-                            'available': actual_available,
-                            'reserved': actual_reserved,
-                            'sold': actual_sold
-                        }
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error checking STT {stt.id}: {str(e)}")
-                continue
+        inconsistent_performances = {
+            key[0] for key in set(actual) | set(stored)
+            if actual.get(key, 0) != stored.get(key, 0)
+        }
         
-        if inconsistencies:
-            logger.warning(f"Found {len(inconsistencies)} capacity inconsistencies")
+        if inconsistent_performances:
+            logger.warning(f"Found seat counter drift in {len(inconsistent_performances)} performances")
             
-            # Fix inconsistencies
-            fixed_count = 0
-            for inc in inconsistencies:
-                try:
-                    stt = inc['stt']
-                    actual = inc['actual']
-                    
-                    # Update with actual values
-                    stt.available_capacity = actual['available']
-                    stt.reserved_capacity = actual['reserved']
-                    stt.sold_capacity = actual['sold']
-                    stt.save()
-                    
-                    fixed_count += 1
-                    logger.info(f"Fixed capacity for {stt.section.name} - {stt.ticket_type.name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error fixing inconsistency: {str(e)}")
-                    continue
+            # Rebuild counters for the affected performances from Seat
+            fixed_count = SeatCounterService.rebuild(inconsistent_performances)
             
-            logger.info(f"Fixed {fixed_count} capacity inconsistencies")
+            logger.info(f"Fixed seat counters for {fixed_count} performances")
             
             return {
                 'status': 'success',
                 'message': f'Fixed {fixed_count} capacity inconsistencies',
-                'inconsistencies_found': len(inconsistencies),
+                'inconsistencies_found': len(inconsistent_performances),
                 'inconsistencies_fixed': fixed_count
             }
         else:
@@ -301,3 +251,35 @@ def emergency_capacity_cleanup(self):
             'message': f'Error: {str(e)}',
             'tasks_queued': []
         }
+
+
+@shared_task(bind=True, name='events.write_through_seat_hold', max_retries=5, default_retry_delay=30)
+def write_through_seat_hold(self, performance_id, seat_ids, reservation_id):
+    """
+    Persist a confirmed seat hold: mark the seats sold, then drop the hold.
+    SeatHoldService.confirm_hold now sells seats in the confirming transaction;
+    this task only completes confirmations queued by earlier releases.
+    """
+    from .seat_holds import SeatHoldService
+    
+    try:
+        sold_count = SeatCounterService.sell_seats(
+            Seat.objects.filter(performance_id=performance_id, id__in=seat_ids)
+        )
+    except Exception as e:
+        # The hold outlives the retries, so the seats stay unavailable meanwhile
+        logger.error(f"Error writing through seat hold {reservation_id}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+    
+    SeatHoldService.release_seats(performance_id, reservation_id=reservation_id, seat_ids=seat_ids)
+    
+    if sold_count != len(seat_ids):
+        logger.warning(
+            f"Seat hold {reservation_id} confirmed {len(seat_ids)} seats but sold {sold_count}"
+        )
+    
+    return {
+        'status': 'success',
+        'reservation_id': reservation_id,
+        'seats_sold': sold_count
+    }
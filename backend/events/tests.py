@@ -0,0 +1,551 @@
+"""
+Tests for Event seat capacity.
+"""
+
+import time as time_module
+from collections import Counter
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import (
+    Event, EventCategory, Venue, TicketType, EventPerformance,
+    EventSection, SectionTicketType, Seat, SeatStatusCounter, EventFee
+)
+from core.cache import pricing_cache
+
+from .capacity_manager import CapacityManager
+from .pricing_service import EventPriceCalculator
+from .seat_counters import SeatCounterService
+from .seat_holds import LocalSeatHoldStore, SeatHoldService
+from .seat_map import SeatMapService, pack_statuses, unpack_statuses
+from .tasks import write_through_seat_hold
+
+
+class EventCapacityTestMixin:
+    """Shared fixtures for capacity tests."""
+
+    def setUp(self):
+        """Set up an event with one performance and two sections of seats."""
+        self.category = EventCategory.objects.create(
+            slug='concerts', name='Concerts', description='Live music'
+        )
+        self.venue = Venue.objects.create(
+            slug='arena', name='Arena', description='Main arena', address='Center',
+            city='Istanbul', country='Turkey', total_capacity=1000
+        )
+        self.event = Event.objects.create(
+            slug='rock-night', title='Rock Night', description='Concert',
+            short_description='Concert', price=Decimal('100.00'),
+            city='Istanbul', country='Turkey',
+            category=self.category, venue=self.venue,
+            door_open_time=time(18, 0), start_time=time(19, 0), end_time=time(22, 0)
+        )
+        self.vip = TicketType.objects.create(
+            event=self.event, name='VIP', price_modifier=Decimal('1.50'), capacity=100
+        )
+        self.normal = TicketType.objects.create(
+            event=self.event, name='Normal', price_modifier=Decimal('1.00'), capacity=100
+        )
+        performance_date = date.today() + timedelta(days=10)
+        self.performance = EventPerformance.objects.create(
+            event=self.event, date=performance_date,
+            start_date=performance_date, end_date=performance_date,
+            start_time=time(19, 0), end_time=time(22, 0), max_capacity=10
+        )
+
+        self.vip_section = EventSection.objects.create(
+            performance=self.performance, name='VIP',
+            total_capacity=4, base_price=Decimal('150.00')
+        )
+        self.normal_section = EventSection.objects.create(
+            performance=self.performance, name='Normal',
+            total_capacity=6, base_price=Decimal('100.00')
+        )
+        self.vip_stt = SectionTicketType.objects.create(
+            section=self.vip_section, ticket_type=self.vip
+        )
+        self.normal_stt = SectionTicketType.objects.create(
+            section=self.normal_section, ticket_type=self.normal
+        )
+
+        for number in range(4):
+            Seat.objects.create(
+                performance=self.performance, ticket_type=self.vip,
+                seat_number=str(number), row_number='A', section='VIP',
+                price=Decimal('150.00'), is_premium=True
+            )
+        # Normal seats are not tied to a ticket type
+        for number in range(6):
+            Seat.objects.create(
+                performance=self.performance,
+                seat_number=str(number), row_number='B', section='Normal',
+                price=Decimal('100.00') + number
+            )
+
+
+class SeatCounterTests(EventCapacityTestMixin, TestCase):
+    """Test denormalized seat status counters."""
+
+    def test_counters_follow_seat_saves(self):
+        """Test counters are maintained by seat create, update and delete."""
+        counts = SeatCounterService.get_section_counts(self.performance.id, 'VIP')
+        self.assertEqual(counts, {(self.vip.id, 'available'): 4})
+
+        seat = Seat.objects.filter(section='VIP').first()
+        seat.status = 'sold'
+        seat.save()
+        Seat.objects.filter(section='VIP').exclude(id=seat.id).first().delete()
+
+        counts = SeatCounterService.get_section_counts(self.performance.id, 'VIP')
+        self.assertEqual(counts[(self.vip.id, 'available')], 2)
+        self.assertEqual(counts[(self.vip.id, 'sold')], 1)
+
+    def test_hold_release_and_expire(self):
+        """Test bulk transitions keep counters in step."""
+        expires_at = timezone.now() - timedelta(minutes=1)
+        seat_ids = list(Seat.objects.filter(section='Normal').values_list('id', flat=True)[:3])
+        held = SeatCounterService.hold_seats(
+            Seat.objects.filter(id__in=seat_ids), 'res-1', expires_at
+        )
+        self.assertEqual(held, 3)
+        self.assertEqual(self.normal_stt.reserved_capacity, 3)
+
+        released = SeatCounterService.expire_holds(timezone.now())
+        self.assertEqual(released, 3)
+        self.normal_section.clear_capacity_cache()
+        self.assertEqual(self.normal_stt.available_capacity, 6)
+        self.assertEqual(self.normal_stt.reserved_capacity, 0)
+
+    def test_rebuild_matches_seats(self):
+        """Test rebuild restores counters from seats."""
+        SeatStatusCounter.objects.all().update(count=0)
+        SeatCounterService.rebuild([self.performance.id])
+        self.assertEqual(self.vip_stt.allocated_capacity, 4)
+        self.assertEqual(self.normal_stt.available_capacity, 6)
+
+    def _counters(self):
+        """Non-empty counters keyed by (performance_id, section, ticket_type_id, status)."""
+        return {
+            (row.performance_id, row.section, row.ticket_type_id, row.status): row.count
+            for row in SeatStatusCounter.objects.filter(count__gt=0)
+        }
+
+    def _seat_aggregate(self):
+        """The same figures counted directly from Seat."""
+        return {
+            (row['performance_id'], row['section'], row['ticket_type_id'], row['status']): row['total']
+            for row in Seat.objects.values(
+                'performance_id', 'section', 'ticket_type_id', 'status'
+            ).annotate(total=Count('id')).order_by()
+        }
+
+    def test_counter_deltas_on_create_status_change_and_delete(self):
+        """Test each seat save or delete moves exactly one seat between counters."""
+        def counts():
+            return SeatCounterService.get_section_counts(self.performance.id, 'VIP')
+
+        seat = Seat.objects.create(
+            performance=self.performance, ticket_type=self.vip,
+            seat_number='9', row_number='A', section='VIP', price=Decimal('150.00')
+        )
+        self.assertEqual(counts(), {(self.vip.id, 'available'): 5})
+
+        seat.status = 'reserved'
+        seat.save()
+        self.assertEqual(counts(), {(self.vip.id, 'available'): 4, (self.vip.id, 'reserved'): 1})
+
+        # Saving without a status change leaves the counters alone
+        seat.save()
+        self.assertEqual(counts(), {(self.vip.id, 'available'): 4, (self.vip.id, 'reserved'): 1})
+
+        seat.delete()
+        self.assertEqual(counts(), {(self.vip.id, 'available'): 4, (self.vip.id, 'reserved'): 0})
+        self.assertEqual(self._counters(), self._seat_aggregate())
+
+    def test_apply_deltas(self):
+        """Test bulk deltas increment, create and clamp counters."""
+        available = (self.performance.id, 'VIP', self.vip.id, 'available')
+        sold = (self.performance.id, 'VIP', self.vip.id, 'sold')
+        blocked = (self.performance.id, 'Normal', None, 'blocked')
+        SeatCounterService.apply_deltas(Counter({available: -10, sold: 3, blocked: 0}))
+
+        counts = SeatCounterService.get_section_counts(self.performance.id, 'VIP')
+        self.assertEqual(counts[(self.vip.id, 'available')], 0)
+        self.assertEqual(counts[(self.vip.id, 'sold')], 3)
+        self.assertFalse(SeatStatusCounter.objects.filter(status='blocked').exists())
+
+        SeatCounterService.apply_deltas(Counter({available: 2, sold: -1}))
+        counts = SeatCounterService.get_section_counts(self.performance.id, 'VIP')
+        self.assertEqual(counts[(self.vip.id, 'available')], 2)
+        self.assertEqual(counts[(self.vip.id, 'sold')], 2)
+
+    def test_rebuild_command_matches_seat_aggregate(self):
+        """Test rebuild_seat_counters restores counters equal to a Seat aggregate."""
+        # Queryset updates bypass the counter signals
+        Seat.objects.filter(section='VIP', seat_number='0').update(status='sold')
+        SeatStatusCounter.objects.filter(section='Normal').delete()
+        SeatStatusCounter.objects.filter(section='VIP').update(count=7)
+        self.assertNotEqual(self._counters(), self._seat_aggregate())
+
+        out = StringIO()
+        call_command('rebuild_seat_counters', stdout=out)
+        self.assertIn('Rebuilt seat counters for 1 performances', out.getvalue())
+        self.assertEqual(self._counters(), self._seat_aggregate())
+
+
+class CapacityMatrixTests(EventCapacityTestMixin, TestCase):
+    """Test the grouped capacity matrix."""
+
+    def test_matrix_is_one_query(self):
+        """Test the matrix for a performance is built with a single query."""
+        with self.assertNumQueries(1):
+            matrix = CapacityManager.get_capacity_matrix([self.performance.id])
+        self.assertTrue(matrix.covers(self.performance.id))
+        self.assertEqual(matrix.count(self.performance.id), 10)
+        self.assertEqual(matrix.sections(self.performance.id), ['Normal', 'VIP'])
+
+    def test_matrix_matches_model_properties(self):
+        """Test matrix figures agree with section and ticket type properties."""
+        Seat.objects.filter(section='Normal').first().delete()
+        seat = Seat.objects.filter(section='VIP').first()
+        seat.status = 'sold'
+        seat.save()
+
+        matrix = CapacityManager.get_capacity_matrix(self.performance)
+        for section, stt in ((self.vip_section, self.vip_stt), (self.normal_section, self.normal_stt)):
+            section.clear_capacity_cache()
+            stt_capacity = matrix.ticket_type_capacity(section, stt)
+            self.assertEqual(stt_capacity['allocated_capacity'], stt.allocated_capacity)
+            self.assertEqual(stt_capacity['available_capacity'], stt.available_capacity)
+            self.assertEqual(stt_capacity['sold_capacity'], stt.sold_capacity)
+
+            section_capacity = matrix.section_capacity(section)
+            self.assertEqual(section_capacity['available_capacity'], section.available_capacity)
+            self.assertEqual(section_capacity['occupancy_rate'], section.occupancy_rate)
+
+    def test_price_summary(self):
+        """Test available seat price range per section."""
+        matrix = CapacityManager.get_capacity_matrix(self.performance)
+        summary = matrix.price_summary(self.performance.id, 'Normal')
+        self.assertEqual(summary['total_seats'], 6)
+        self.assertEqual(summary['min_price'], Decimal('100.00'))
+        self.assertEqual(summary['max_price'], Decimal('105.00'))
+        self.assertFalse(summary['has_premium'])
+        self.assertTrue(matrix.price_summary(self.performance.id, 'VIP')['has_premium'])
+
+
+class SeatHoldTests(EventCapacityTestMixin, TestCase):
+    """Test the TTL seat hold engine."""
+
+    def setUp(self):
+        super().setUp()
+        self.seat_ids = [
+            str(seat_id) for seat_id in
+            Seat.objects.filter(section='Normal').values_list('id', flat=True)
+        ]
+
+    def test_hold_is_all_or_nothing(self):
+        """Test a hold fails without side effects when any seat is taken."""
+        held, first = SeatHoldService.hold_seats(self.performance.id, self.seat_ids[:2])
+        self.assertTrue(held)
+
+        held, conflicts = SeatHoldService.hold_seats(self.performance.id, self.seat_ids[1:4])
+        self.assertFalse(held)
+        self.assertEqual(conflicts, [self.seat_ids[1]])
+        self.assertEqual(
+            set(SeatHoldService.get_held_seats(self.performance.id)), set(self.seat_ids[:2])
+        )
+
+        released = SeatHoldService.release_seats(
+            self.performance.id, reservation_id=first['reservation_id']
+        )
+        self.assertEqual(released, 2)
+        self.assertEqual(SeatHoldService.get_held_seats(self.performance.id), {})
+
+    def test_expired_holds_are_free_immediately(self):
+        """Test a seat can be re-held as soon as its hold expires."""
+        store = LocalSeatHoldStore()
+        self.assertEqual(store.hold('p', ['s1'], 'r1', 0.01), [])
+        self.assertEqual(store.hold('p', ['s1'], 'r2', 60), ['s1'])
+        time_module.sleep(0.02)
+        self.assertEqual(store.hold('p', ['s1'], 'r2', 60), [])
+
+    def test_confirm_sells_seats_and_releases_hold_on_commit(self):
+        """Test confirming a hold sells the seats at once and drops the hold after commit."""
+        held, hold = SeatHoldService.hold_seats(self.performance.id, self.seat_ids[:3])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            confirmed, seat_ids = SeatHoldService.confirm_hold(
+                self.performance.id, hold['reservation_id']
+            )
+            self.assertTrue(confirmed)
+            self.assertEqual(Seat.objects.filter(section='Normal', status='sold').count(), 3)
+            self.assertEqual(len(SeatHoldService.get_held_seats(self.performance.id)), 3)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.normal_stt.sold_capacity, 3)
+        self.assertEqual(SeatHoldService.get_held_seats(self.performance.id), {})
+
+    def test_write_through_task_sells_seats(self):
+        """Test confirmations queued to the write-through task still sell their seats."""
+        held, hold = SeatHoldService.hold_seats(self.performance.id, self.seat_ids[:2])
+        write_through_seat_hold.apply(
+            args=[str(self.performance.id), self.seat_ids[:2], hold['reservation_id']]
+        )
+        self.assertEqual(Seat.objects.filter(section='Normal', status='sold').count(), 2)
+        self.assertEqual(SeatHoldService.get_held_seats(self.performance.id), {})
+
+    def test_held_seats_count_as_reserved(self):
+        """Test counters and the capacity matrix report held seats as reserved."""
+        SeatHoldService.hold_seats(self.performance.id, self.seat_ids[:2])
+        self.assertEqual(self.normal_stt.available_capacity, 4)
+        self.assertEqual(self.normal_stt.reserved_capacity, 2)
+
+        matrix = CapacityManager.get_capacity_matrix(self.performance)
+        stt_capacity = matrix.ticket_type_capacity(self.normal_section, self.normal_stt)
+        self.assertEqual(stt_capacity['available_capacity'], 4)
+        self.assertEqual(stt_capacity['reserved_capacity'], 2)
+        self.assertEqual(matrix.count(self.performance.id, 'Normal'), 6)
+
+    def test_held_seats_cannot_be_booked_by_others(self):
+        """Test availability checks and add-to-cart respect holds of other reservations."""
+        from cart.models import Cart
+        from cart.services import EventCartService
+        from .exceptions import SeatNotAvailableError
+        from .pricing_plan import PricingPlanService
+        from .validators import EventValidator
+
+        held, hold = SeatHoldService.hold_seats(self.performance.id, self.seat_ids[:2])
+        with self.assertRaises(SeatNotAvailableError):
+            EventValidator.validate_seat_availability(self.seat_ids[:1])
+        EventValidator.validate_seat_availability(self.seat_ids[:1], hold['reservation_id'])
+        capacity = PricingPlanService.get_available_capacity(self.performance.id)
+        self.assertEqual(capacity[('Normal', None)], 4)
+
+        cart = Cart.objects.create(session_id='other', expires_at=timezone.now() + timedelta(hours=1))
+        seats = [{'seat_id': seat_id, 'price': '100.00', 'section': 'Normal'} for seat_id in self.seat_ids[1:3]]
+        with self.assertRaises(SeatNotAvailableError):
+            EventCartService.add_event_seats_to_cart(
+                cart, str(self.event.id), str(self.performance.id), str(self.normal.id), seats
+            )
+        self.assertFalse(cart.items.exists())
+        self.assertNotIn(self.seat_ids[2], SeatHoldService.get_held_seats(self.performance.id))
+
+    def test_order_confirmation_confirms_holds(self):
+        """Test seats held from the cart are sold when the order is confirmed."""
+        from django.contrib.auth import get_user_model
+        from cart.models import Cart
+        from cart.services import EventCartService
+        from orders.models import OrderService
+
+        user = get_user_model().objects.create_user(username='seat-buyer', password='x')
+        cart = Cart.objects.create(
+            session_id='seats', user=user, expires_at=timezone.now() + timedelta(hours=1)
+        )
+        seats = [{'seat_id': seat_id, 'price': '100.00', 'section': 'Normal'} for seat_id in self.seat_ids[:2]]
+        EventCartService.add_event_seats_to_cart(
+            cart, str(self.event.id), str(self.performance.id), str(self.normal.id), seats
+        )
+        self.assertTrue(cart.items.get().booking_data['seats'][0]['reservation_id'])
+        order = OrderService.create_order_from_cart(cart, user)
+
+        self.assertIn(self.seat_ids[0], SeatHoldService.get_held_seats(self.performance.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            results = OrderService.update_capacity_for_status_changes([(order, 'pending', 'confirmed')])
+        self.assertEqual(list(results.values()), [(True, '')])
+        self.assertEqual(Seat.objects.filter(section='Normal', status='sold').count(), 2)
+        self.assertEqual(SeatHoldService.get_held_seats(self.performance.id), {})
+
+
+class SeatMapTests(EventCapacityTestMixin, TestCase):
+    """Test the compact seat-map layout and status endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.layout_url = f'/api/v1/events/performances/{self.performance.id}/seat-map/layout/'
+        self.status_url = f'/api/v1/events/performances/{self.performance.id}/seat-map/status/'
+
+    def test_pack_round_trip(self):
+        """Test 2-bit packing keeps four seats per byte."""
+        codes = [0, 1, 2, 3, 3, 0, 1]
+        packed = pack_statuses(codes)
+        self.assertEqual(len(packed), 2)
+        self.assertEqual(unpack_statuses(packed, len(codes)), codes)
+
+    def test_layout_etag(self):
+        """Test the layout is revalidated by ETag and changes when seats are added."""
+        response = self.client.get(self.layout_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 10)
+        self.assertEqual(response.data['sections'], ['Normal', 'VIP'])
+        etag = response['ETag']
+
+        response = self.client.get(self.layout_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Seat.objects.create(
+            performance=self.performance, seat_number='9', row_number='C',
+            section='Normal', price=Decimal('90.00')
+        )
+        response = self.client.get(self.layout_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_status_delta(self):
+        """Test status polls return only seats changed since a version."""
+        layout = SeatMapService.get_layout(self.performance.id)
+        response = self.client.get(self.status_url, {'encoding': 'binary'})
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(unpack_statuses(response.content, 10), [0] * 10)
+        version = response['X-Seat-Map-Version']
+
+        sold_id, held_id = layout['seats']['id'][0], layout['seats']['id'][9]
+        seat = Seat.objects.get(id=sold_id)
+        seat.status = 'sold'
+        seat.save()
+        SeatHoldService.hold_seats(self.performance.id, [held_id])
+        cache.delete(SeatMapService._status_key(self.performance.id))
+
+        response = self.client.get(self.status_url, {'since': version})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['changes'], [[0, 2], [9, 1]])
+
+        response = self.client.get(self.status_url, {'since': 'unknown'})
+        self.assertEqual(response.data['encoding'], '2bit-base64')
+
+
+class SeatImportTests(EventCapacityTestMixin, TestCase):
+    """Test bulk seat import and layout cloning."""
+
+    def setUp(self):
+        super().setUp()
+        performance_date = self.performance.date + timedelta(days=1)
+        self.other_performance = EventPerformance.objects.create(
+            event=self.event, date=performance_date,
+            start_date=performance_date, end_date=performance_date,
+            start_time=time(19, 0), end_time=time(22, 0), max_capacity=10
+        )
+
+    def test_generate_grid_skips_existing_seats(self):
+        """Test grid generation is idempotent and keeps counters in step."""
+        out = StringIO()
+        args = [
+            'import_performance_seats', '--performance', str(self.performance.id),
+            '--generate-grid', '--sections', 'Balcony', '--rows', '1-3',
+            '--seats-per-row', '5', '--chunk-size', '4'
+        ]
+        call_command(*args, stdout=out)
+        self.assertIn('created 15', out.getvalue())
+
+        call_command(*args, stdout=StringIO())
+        self.assertEqual(Seat.objects.filter(section='Balcony').count(), 15)
+        counts = SeatCounterService.get_section_counts(self.performance.id, 'Balcony')
+        self.assertEqual(counts, {(None, 'available'): 15})
+
+    def test_clone_layout(self):
+        """Test a layout is copied to other performances as available seats."""
+        Seat.objects.filter(section='VIP').update(status='sold')
+        call_command(
+            'import_performance_seats', '--performance', str(self.performance.id),
+            '--clone-to-all', stdout=StringIO()
+        )
+        cloned = Seat.objects.filter(performance=self.other_performance)
+        self.assertEqual(cloned.count(), 10)
+        self.assertEqual(cloned.filter(status='available').count(), 10)
+        self.assertEqual(cloned.filter(ticket_type=self.vip).count(), 4)
+        self.assertEqual(SeatMapService.get_layout(self.other_performance.id)['count'], 10)
+
+
+class PricingCacheKeyTests(EventCapacityTestMixin, TestCase):
+    """Test pricing cache keys and their invalidation."""
+
+    def setUp(self):
+        super().setUp()
+        pricing_cache.clear()
+
+    def _key(self, options):
+        calculator = EventPriceCalculator(self.event, self.performance)
+        return calculator._get_cache_key('VIP', str(self.vip.id), 2, options)
+
+    def test_key_is_stable(self):
+        """Test the key ignores option order and is the same for new calculators."""
+        options = [{'option_id': 'b', 'quantity': 1}, {'option_id': 'a', 'quantity': 2}]
+        key = self._key(options)
+        self.assertEqual(key, self._key(list(reversed(options))))
+        self.assertNotEqual(key, self._key(options[:1]))
+
+    def test_pricing_changes_invalidate_keys(self):
+        """Test section and event pricing changes move to new keys."""
+        first = self._key(None)
+
+        self.vip_section.base_price = Decimal('175.00')
+        self.vip_section.save()
+        second = self._key(None)
+        self.assertNotEqual(first, second)
+
+        self.vip.price_modifier = Decimal('2.00')
+        self.vip.save()
+        third = self._key(None)
+        self.assertNotIn(third, (first, second))
+
+        EventPriceCalculator(self.event, self.performance).clear_pricing_cache()
+        self.assertNotEqual(third, self._key(None))
+
+
+class PricingPlanTests(EventCapacityTestMixin, TestCase):
+    """Test quotes priced from the compiled pricing plan."""
+
+    def setUp(self):
+        super().setUp()
+        pricing_cache.clear()
+        # Compile the plan once
+        EventPriceCalculator(self.event, self.performance).get_plan()
+
+    def test_quote_is_in_memory(self):
+        """Test a warm plan prices tickets without queries."""
+        calculator = EventPriceCalculator(self.event, self.performance)
+        with self.assertNumQueries(0):
+            result = calculator.calculate_ticket_price(
+                'VIP', str(self.vip.id), 2, use_cache=False, check_capacity=False
+            )
+        self.assertEqual(result['unit_price'], Decimal('150.00'))
+        self.assertEqual(result['subtotal'], Decimal('300.00'))
+
+    def test_event_fees_do_not_change_quotes(self):
+        """Test quotes keep the default fees and VAT when the event has fee rows."""
+        def quote():
+            return EventPriceCalculator(self.event, self.performance).calculate_ticket_price(
+                'VIP', str(self.vip.id), 2, apply_fees=True, apply_taxes=True,
+                use_cache=False, check_capacity=False
+            )
+
+        before = quote()
+        EventFee.objects.create(event=self.event, name='Booking', fee_type='booking', fee_value=Decimal('10.00'))
+        EventFee.objects.create(event=self.event, name='Tax', fee_type='tax', fee_value=Decimal('20.00'))
+        after = quote()
+        for field in ('fees_total', 'taxes_total', 'final_price'):
+            self.assertEqual(after[field], before[field])
+
+    def test_bulk_capacity_is_one_query(self):
+        """Test bulk quotes share one availability read across requests."""
+        calculator = EventPriceCalculator(self.event, self.performance)
+        requests = [
+            {'section_name': 'VIP', 'ticket_type_id': str(self.vip.id), 'quantity': 3},
+            {'section_name': 'VIP', 'ticket_type_id': str(self.vip.id), 'quantity': 2},
+            {'section_name': 'Normal', 'ticket_type_id': str(self.normal.id), 'quantity': 6},
+        ]
+        with self.assertNumQueries(1):
+            result = calculator.calculate_bulk_pricing(requests, use_cache=False)
+        # The second VIP request no longer fits the four VIP seats
+        self.assertEqual(len(result['tickets']), 2)
+        self.assertEqual(result['subtotal'], Decimal('1050.00'))
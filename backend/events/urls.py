@@ -94,6 +94,14 @@ urlpatterns = [
          EventViewSet.as_view({'post': 'release_seats'}), 
          name='performance-release-seats'),
     
+    path('performances/<uuid:performance_id>/seat-map/layout/', 
+         EventViewSet.as_view({'get': 'performance_seat_map_layout'}), 
+         name='performance-seat-map-layout'),
+    
+    path('performances/<uuid:performance_id>/seat-map/status/', 
+         EventViewSet.as_view({'get': 'performance_seat_map_status'}), 
+         name='performance-seat-map-status'),
+    
     # Quick access routes for frontend
     path('events/<slug:slug>/quick-info/', 
          EventViewSet.as_view({'get': 'retrieve'}), 
@@ -51,8 +51,10 @@ class EventValidator:
             raise InvalidPerformanceDateError(f"Performance date {performance.date} is in the past")
     
     @staticmethod
-    def validate_seat_availability(seat_ids):
-        """Validate that all seats are available."""
+    def validate_seat_availability(seat_ids, reservation_id=None):
+        """Validate that all seats are available and not held by another reservation."""
+        from .seat_holds import SeatHoldService
+        
         seats = Seat.objects.filter(id__in=seat_ids)
         
         if seats.count() != len(seat_ids):
@@ -63,6 +65,15 @@ class EventValidator:
             unavailable_ids = list(unavailable_seats.values_list('id', flat=True))
             raise SeatNotAvailableError(f"Seats {unavailable_ids} are not available")
         
+        for performance_id in set(seats.values_list('performance_id', flat=True)):
+            held_seats = SeatHoldService.get_held_seats(performance_id)
+            held_ids = [
+                seat_id for seat_id in map(str, seat_ids)
+                if held_seats.get(seat_id, reservation_id) != reservation_id
+            ]
+            if held_ids:
+                raise SeatNotAvailableError(f"Seats {held_ids} are held by another reservation")
+        
         return seats
     
     @staticmethod
@@ -86,10 +97,12 @@ class EventValidator:
     @staticmethod
     def validate_performance_capacity(performance_id, requested_seats):
         """Validate that performance has enough available seats."""
+        from .seat_holds import SeatHoldService
+        
         available_count = Seat.objects.filter(
             performance_id=performance_id,
             status='available'
-        ).count()
+        ).exclude(id__in=list(SeatHoldService.get_held_seats(performance_id))).count()
         
         if available_count < requested_seats:
             raise InsufficientSeatsError(
@@ -175,7 +188,7 @@ class CartValidator:
     @staticmethod
     def validate_cart_item_limits(cart, max_items=10):
         """Validate cart item limits."""
-        if cart.items.count() >= max_items:
+        if cart.item_count >= max_items:
             raise CartOperationError(f"Maximum {max_items} items allowed in cart")
     
     @staticmethod
@@ -310,10 +310,14 @@ class EventViewSet(viewsets.ModelViewSet):
                 'sections__ticket_types__ticket_type'
             ).all()
             
+            # Seat counts for every performance come from one grouped query
+            from events.capacity_manager import CapacityManager
+            matrix = CapacityManager.get_capacity_matrix(performances)
+            
             capacity_info = {
                 'event_id': event.id,
                 'event_title': event.title,
-                'total_performances': performances.count(),
+                'total_performances': len(performances),
                 'performances': []
             }
             
@@ -333,14 +337,15 @@ class EventViewSet(viewsets.ModelViewSet):
                     # Process sections with their ticket types
                     for section in performance.sections.all():
                         try:
+                            section_capacity = matrix.section_capacity(section)
                             section_info = {
                                 'name': section.name,
                                 'description': section.description,
                                 'total_capacity': section.total_capacity,
-                                'available_capacity': section.available_capacity,
-                                'reserved_capacity': section.reserved_capacity,
-                                'sold_capacity': section.sold_capacity,
-                                'occupancy_rate': section.occupancy_rate,
+                                'available_capacity': section_capacity['available_capacity'],
+                                'reserved_capacity': section_capacity['reserved_capacity'],
+                                'sold_capacity': section_capacity['sold_capacity'],
+                                'occupancy_rate': section_capacity['occupancy_rate'],
                                 'is_premium': section.is_premium,
                                 'is_wheelchair_accessible': section.is_wheelchair_accessible,
                                 'ticket_types': []
@@ -349,14 +354,15 @@ class EventViewSet(viewsets.ModelViewSet):
                             # Process ticket types for this section
                             for stt in section.ticket_types.all():
                                 try:
+                                    stt_capacity = matrix.ticket_type_capacity(section, stt)
                                     ticket_info = {
                                         'id': stt.ticket_type.id,
                                         'name': stt.ticket_type.name,
                                         'description': stt.ticket_type.description,
-                                        'allocated_capacity': stt.allocated_capacity,
-                                        'available_capacity': stt.available_capacity,
-                                        'reserved_capacity': stt.reserved_capacity,
-                                        'sold_capacity': stt.sold_capacity,
+                                        'allocated_capacity': stt_capacity['allocated_capacity'],
+                                        'available_capacity': stt_capacity['available_capacity'],
+                                        'reserved_capacity': stt_capacity['reserved_capacity'],
+                                        'sold_capacity': stt_capacity['sold_capacity'],
                                         'price_modifier': stt.price_modifier,
                                         'final_price': stt.final_price
                                     }
@@ -487,17 +493,22 @@ class EventViewSet(viewsets.ModelViewSet):
             if section_name:
                 sections_qs = sections_qs.filter(name=section_name)
             
+            # Seat counts for all sections come from one grouped query
+            from events.capacity_manager import CapacityManager
+            matrix = CapacityManager.get_capacity_matrix(performance)
+            
             for section in sections_qs.all():
                 try:
+                    section_capacity = matrix.section_capacity(section)
                     section_data = {
                         'name': section.name,
                         'description': section.description,
                         'base_price': section.base_price,
                         'total_capacity': section.total_capacity,
-                        'available_capacity': section.available_capacity,
-                        'reserved_capacity': section.reserved_capacity,
-                        'sold_capacity': section.sold_capacity,
-                        'occupancy_rate': section.occupancy_rate,
+                        'available_capacity': section_capacity['available_capacity'],
+                        'reserved_capacity': section_capacity['reserved_capacity'],
+                        'sold_capacity': section_capacity['sold_capacity'],
+                        'occupancy_rate': section_capacity['occupancy_rate'],
                         'is_premium': section.is_premium,
                         'is_wheelchair_accessible': section.is_wheelchair_accessible,
                         'ticket_types': []
@@ -509,6 +520,7 @@ class EventViewSet(viewsets.ModelViewSet):
                             if ticket_type_id and str(stt.ticket_type.id) != ticket_type_id:
                                 continue
                             
+                            stt_capacity = matrix.ticket_type_capacity(section, stt)
                             ticket_data = {
                                 'id': stt.id,  # SectionTicketType ID
                                 'ticket_type': {
@@ -517,10 +529,10 @@ class EventViewSet(viewsets.ModelViewSet):
                                     'description': stt.ticket_type.description,
                                     'benefits': stt.ticket_type.benefits
                                 },
-                                'allocated_capacity': stt.allocated_capacity,
-                                'available_capacity': stt.available_capacity,
-                                'reserved_capacity': stt.reserved_capacity,
-                                'sold_capacity': stt.sold_capacity,
+                                'allocated_capacity': stt_capacity['allocated_capacity'],
+                                'available_capacity': stt_capacity['available_capacity'],
+                                'reserved_capacity': stt_capacity['reserved_capacity'],
+                                'sold_capacity': stt_capacity['sold_capacity'],
                                 'price_modifier': stt.price_modifier,
                                 'final_price': stt.final_price
                             }
@@ -567,11 +579,11 @@ class EventViewSet(viewsets.ModelViewSet):
             # Fallback: derive sections from seats if no explicit sections are linked
             if not sections_data:
                 try:
-                    from django.db.models import Count, Min
-                    seat_aggregates = performance.seats.filter(status='available').values('section').annotate(
-                        total_seats=Count('id'),
-                        min_price=Min('price'),
-                    )
+                    seat_aggregates = []
+                    for sec_name in matrix.sections(performance.id):
+                        summary = matrix.price_summary(performance.id, sec_name)
+                        if summary:
+                            seat_aggregates.append({'section': sec_name, **summary})
                     for aggregate in seat_aggregates:
                         try:
                             sec_name = aggregate['section'] or 'General'
@@ -655,19 +667,90 @@ class EventViewSet(viewsets.ModelViewSet):
         """Return a simplified seat-map for a specific performance (no SVG geometry yet)."""
         try:
             performance = EventPerformance.objects.get(id=performance_id)
-            seats = performance.seats.all().values(
+            seats = list(performance.seats.all().values(
                 'id', 'section', 'row_number', 'seat_number', 'status', 'price', 'currency',
                 'is_wheelchair_accessible', 'is_premium', 'reservation_id', 'reservation_expires_at'
-            )
+            ))
+            
+            # Seats held in the hold engine show as reserved
+            from .seat_holds import SeatHoldService
+            held_seats = SeatHoldService.get_held_seats(performance.id)
+            if held_seats:
+                for seat in seats:
+                    if seat['status'] == 'available' and str(seat['id']) in held_seats:
+                        seat['status'] = 'reserved'
+            
             return Response({
                 'performance_id': performance.id,
                 'performance_date': performance.date,
                 'performance_time': performance.start_time,
-                'seats': list(seats)
+                'seats': seats
             })
         except EventPerformance.DoesNotExist:
             return Response({'error': 'Performance not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=False, methods=['get'], url_path='performances/(?P<performance_id>[^/.]+)/seat-map/layout', permission_classes=[AllowAny])
+    def performance_seat_map_layout(self, request, performance_id=None):
+        """Return the static seat-map layout; cacheable by ETag."""
+        if not EventPerformance.objects.filter(id=performance_id).exists():
+            return Response({'error': 'Performance not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        from .seat_map import SeatMapService
+        layout = SeatMapService.get_layout(performance_id)
+        etag = f'"{layout["etag"]}"'
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(layout)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='performances/(?P<performance_id>[^/.]+)/seat-map/status', permission_classes=[AllowAny])
+    def performance_seat_map_status(self, request, performance_id=None):
+        """
+        Return seat statuses packed at 2 bits per seat in layout order.
+        With ?since=<version> only changed seats are returned when possible;
+        ?encoding=binary returns the raw bytes as application/octet-stream.
+        """
+        if not EventPerformance.objects.filter(id=performance_id).exists():
+            return Response({'error': 'Performance not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        from django.http import HttpResponse
+        from .seat_map import SeatMapService
+        seat_status = SeatMapService.get_status(performance_id)
+        etag = f'"{seat_status["version"]}"'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'X-Seat-Map-Version': seat_status['version'],
+            'X-Seat-Map-Layout': seat_status['layout_etag'],
+        }
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            since = request.query_params.get('since')
+            changes = SeatMapService.get_changes(performance_id, since, seat_status) if since else None
+            
+            if changes is not None:
+                response = Response({
+                    'version': seat_status['version'],
+                    'since': since,
+                    'layout_etag': seat_status['layout_etag'],
+                    'changes': changes,
+                })
+            elif request.query_params.get('encoding') == 'binary':
+                response = HttpResponse(seat_status['data'], content_type='application/octet-stream')
+                headers['X-Seat-Count'] = str(seat_status['count'])
+            else:
+                response = Response(SeatMapService.encode_status(seat_status))
+        
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
     @action(detail=False, methods=['post'], url_path='performances/(?P<performance_id>[^/.]+)/hold')
     def hold_seats(self, request, performance_id=None):
         """Temporarily reserve (hold) seats for a performance."""
@@ -692,24 +775,16 @@ class EventViewSet(viewsets.ModelViewSet):
         if not_available:
             return Response({'error': 'Some seats are not available', 'seats': not_available}, status=status.HTTP_409_CONFLICT)
 
-        # Hold atomically with select_for_update and recheck
-        reservation_id = uuid.uuid4().hex
-        expires_at = timezone.now() + timedelta(seconds=ttl_seconds)
-        from django.db import transaction
-        from .models import Seat as SeatModel
-        with transaction.atomic():
-            lock_qs = SeatModel.objects.select_for_update().filter(id__in=[s.id for s in seats])
-            # Recheck availability under lock
-            not_available = [str(s.id) for s in lock_qs if s.status != 'available']
-            if not_available:
-                return Response({'error': 'Some seats are no longer available', 'seats': not_available}, status=status.HTTP_409_CONFLICT)
-            # Update
-            lock_qs.update(status='reserved', reservation_id=reservation_id, reservation_expires_at=expires_at)
+        # Hold all seats atomically in the hold engine; no database row locks
+        from .seat_holds import SeatHoldService
+        held, result = SeatHoldService.hold_seats(performance.id, seat_ids, ttl_seconds)
+        if not held:
+            return Response({'error': 'Some seats are no longer available', 'seats': result}, status=status.HTTP_409_CONFLICT)
 
         return Response({
             'message': 'Seats held successfully',
-            'reservation_id': reservation_id,
-            'expires_at': expires_at.isoformat(),
+            'reservation_id': result['reservation_id'],
+            'expires_at': result['expires_at'].isoformat(),
             'seat_ids': [str(s.id) for s in seats],
             'ticket_type_id': ticket_type_id
         }, status=status.HTTP_200_OK)
@@ -727,20 +802,26 @@ class EventViewSet(viewsets.ModelViewSet):
         if not reservation_id and not seat_ids:
             return Response({'error': 'Provide reservation_id or seat_ids[] to release'}, status=status.HTTP_400_BAD_REQUEST)
 
+        if not reservation_id and not isinstance(seat_ids, list):
+            return Response({'error': 'Invalid seat_ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        from .seat_holds import SeatHoldService
+        released = SeatHoldService.release_seats(
+            performance.id,
+            reservation_id=reservation_id,
+            seat_ids=None if reservation_id else seat_ids
+        )
+
+        # Seats reserved directly on Seat rows before the hold engine
         from .models import Seat
         qs = Seat.objects.filter(performance=performance, status='reserved')
         if reservation_id:
             qs = qs.filter(reservation_id=reservation_id)
-        elif isinstance(seat_ids, list) and seat_ids:
-            qs = qs.filter(id__in=seat_ids)
         else:
-            return Response({'error': 'Invalid seat_ids'}, status=status.HTTP_400_BAD_REQUEST)
+            qs = qs.filter(id__in=seat_ids)
 
-        from django.db import transaction
-        released = 0
-        with transaction.atomic():
-            locked = qs.select_for_update()
-            released = locked.update(status='available', reservation_id=None, reservation_expires_at=None)
+        from .seat_counters import SeatCounterService
+        released += SeatCounterService.release_seats(qs)
 
         return Response({'message': 'Seats released', 'released_count': released}, status=status.HTTP_200_OK)
     
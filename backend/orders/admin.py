@@ -2,12 +2,19 @@
 Django Admin configuration for Orders app.
 """
 
+import os
+import shutil
+import tempfile
+
 from django.contrib import admin
+from django.db import transaction
+from django.http import FileResponse
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count, Sum
-from .models import Order, OrderItem, OrderHistory
+from .models import Order, OrderItem, OrderHistory, OrderNotification
+from .pdf_export import OrderPDFExport
 
 
 class OrderItemInline(admin.TabularInline):
@@ -63,7 +70,10 @@ class OrderAdmin(admin.ModelAdmin):
     ]
     
     # Add bulk actions
-    actions = ['bulk_confirm_orders', 'bulk_cancel_orders', 'bulk_mark_paid']
+    actions = [
+        'bulk_confirm_orders', 'bulk_cancel_orders', 'bulk_mark_paid',
+        'export_receipts', 'export_invoices'
+    ]
     
     inlines = [OrderItemInline]  # Only OrderItemInline for now
     
@@ -215,34 +225,47 @@ class OrderAdmin(admin.ModelAdmin):
     
     def bulk_mark_paid(self, request, queryset):
         """Bulk mark selected orders as paid."""
+        from .models import OrderService
+        
         paid_count = 0
         failed_count = 0
+        status_changes = []
         
-        for order in queryset:
-            if order.status in ['pending', 'confirmed']:
-                try:
-                    old_status = order.status
-                    order.status = 'paid'
-                    order.payment_status = 'paid'
-                    order.save()
-                    
-                    paid_count += 1
-                    # Log the change
-                    OrderHistory.objects.create(
-                        order=order,
-                        user=request.user,
-                        field_name='status',
-                        old_value=old_status,
-                        new_value='paid',
-                        change_reason=f"Bulk marked as paid by {request.user.username}"
-                    )
-                except Exception as e:
+        with transaction.atomic():
+            for order in queryset:
+                if order.status in ['pending', 'confirmed']:
+                    try:
+                        # Savepoint, so one failed order keeps the batch usable
+                        with transaction.atomic():
+                            old_status = order.status
+                            order.status = 'paid'
+                            order.payment_status = 'paid'
+                            # Capacity of all orders is updated in one batch below
+                            order._defer_capacity_update = True
+                            order.save()
+                            # Log the change
+                            OrderHistory.objects.create(
+                                order=order,
+                                user=request.user,
+                                field_name='status',
+                                old_value=old_status,
+                                new_value='paid',
+                                change_reason=f"Bulk marked as paid by {request.user.username}"
+                            )
+                        status_changes.append((order, old_status, 'paid'))
+                        paid_count += 1
+                    except Exception as e:
+                        failed_count += 1
+                        self.message_user(request, f"Error marking order {order.order_number} as paid: {str(e)}", level='ERROR')
+                else:
                     failed_count += 1
-                    self.message_user(request, f"Error marking order {order.order_number} as paid: {str(e)}", level='ERROR')
-            else:
-                failed_count += 1
-                self.message_user(request, f"Order {order.order_number} cannot be marked as paid", level='WARNING')
+                    self.message_user(request, f"Order {order.order_number} cannot be marked as paid", level='WARNING')
+            
+            capacity_results = OrderService.update_capacity_for_status_changes(status_changes)
         
+        capacity_failures = [item_id for item_id, (success, _error) in capacity_results.items() if not success]
+        if capacity_failures:
+            self.message_user(request, f"Capacity update failed for {len(capacity_failures)} order items.", level='WARNING')
         if paid_count > 0:
             self.message_user(request, f"Successfully marked {paid_count} orders as paid.", level='SUCCESS')
         if failed_count > 0:
@@ -250,6 +273,42 @@ class OrderAdmin(admin.ModelAdmin):
     
     bulk_mark_paid.short_description = _("Mark selected orders as paid")
 
+    def _export_pdfs(self, request, queryset, kind):
+        """Return the PDFs of the selected orders as one ZIP download."""
+        export_dir = tempfile.mkdtemp()
+        output_path = os.path.join(export_dir, f"{kind}s.zip")
+        try:
+            # Rendered in this process: admin selections are small, and forking
+            # a web worker is unsafe. Use the export_order_pdfs command for periods.
+            progress = OrderPDFExport(queryset, output_path, kind=kind, workers=1).run(resume=False)
+            # Stream from a file that deletes itself when closed, so the export
+            # directory can be removed now even where open files cannot be deleted
+            output = tempfile.TemporaryFile()
+            with open(output_path, 'rb') as archive:
+                shutil.copyfileobj(archive, output)
+            output.seek(0)
+        finally:
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+        if progress['failed']:
+            self.message_user(
+                request, f"Failed to render {len(progress['failed'])} orders: {', '.join(progress['failed'])}",
+                level='WARNING'
+            )
+        return FileResponse(output, as_attachment=True, filename=f"{kind}s.zip", content_type='application/zip')
+
+    def export_receipts(self, request, queryset):
+        """Download the receipts of the selected orders as a ZIP."""
+        return self._export_pdfs(request, queryset, 'receipt')
+
+    export_receipts.short_description = _("Download receipts of selected orders (ZIP)")
+
+    def export_invoices(self, request, queryset):
+        """Download the invoices of the selected orders as a ZIP."""
+        return self._export_pdfs(request, queryset, 'invoice')
+
+    export_invoices.short_description = _("Download invoices of selected orders (ZIP)")
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -361,4 +420,19 @@ class OrderHistoryAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         """Add annotations for better performance."""
-        return super().get_queryset(request).select_related('order', 'user') 
\ No newline at end of file
+        return super().get_queryset(request).select_related('order', 'user') 
+
+
+@admin.register(OrderNotification)
+class OrderNotificationAdmin(admin.ModelAdmin):
+    """Admin for the order notification outbox."""
+    
+    list_display = ['order', 'event', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['order__order_number', 'event']
+    readonly_fields = ['order', 'event', 'payload', 'attempts', 'sent_at', 'last_error', 'created_at']
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
+
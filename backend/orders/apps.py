@@ -7,5 +7,7 @@ class OrdersConfig(AppConfig):
     verbose_name = 'Orders'
     
     def ready(self):
-        """Import signals when app is ready."""
-        import orders.signals 
\ No newline at end of file
+        """Import signals and register the PDF fonts when app is ready."""
+        import orders.signals
+        from .pdf_service import register_fonts
+        register_fonts() 
\ No newline at end of file
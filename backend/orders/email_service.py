@@ -2,7 +2,7 @@
 Email service for order notifications.
 """
 
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
@@ -14,13 +14,90 @@ logger = logging.getLogger(__name__)
 
 class OrderEmailService:
     """Service for sending order-related emails."""
+
+    @staticmethod
+    def get_confirmation_content(order):
+        """Return (subject, html) of the order confirmation email."""
+        subject = f"تایید سفارش #{order.order_number} - پیکان توریسم"
+        return subject, get_order_confirmation_template(order)
+
+    @staticmethod
+    def get_status_change_content(order, old_status, new_status):
+        """Return (subject, html) of the order status change email."""
+        subject = f"تغییر وضعیت سفارش #{order.order_number} - پیکان توریسم"
+        return subject, get_order_status_change_template(order, old_status, new_status)
+
+    @staticmethod
+    def get_cancelled_content(order):
+        """Return (subject, html) of the order cancellation email."""
+        subject = f"لغو سفارش #{order.order_number} - پیکان توریسم"
+        
+        html_message = f"""
+        <!DOCTYPE html>
+        <html dir="rtl" lang="fa">
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{ font-family: 'Tahoma', 'Arial', sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
+                .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 10px; padding: 30px; }}
+                .header {{ text-align: center; color: #dc3545; margin-bottom: 30px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>❌ سفارش لغو شد</h1>
+                </div>
+                
+                <p>سلام <strong>{order.customer_name}</strong> عزیز،</p>
+                <p>سفارش شماره <strong>#{order.order_number}</strong> با موفقیت لغو شد.</p>
+                
+                <div style="background: #f8d7da; color: #721c24; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                    <p><strong>توجه:</strong> در صورت پرداخت مبلغ، طی 3-5 روز کاری به حساب شما بازگردانده خواهد شد.</p>
+                </div>
+                
+                <p>در صورت داشتن سوال، با پشتیبانی تماس بگیرید:</p>
+                <p><strong>تلفن:</strong> 021-12345678</p>
+                <p><strong>واتساپ:</strong> 09123456789</p>
+                
+                <p>از اعتماد شما متشکریم! 🙏</p>
+            </div>
+        </body>
+        </html>
+        """
+        return subject, html_message
+
+    @staticmethod
+    def build_message(order, event, payload=None, connection=None):
+        """
+        Build the email of an order notification event ('confirmed',
+        'cancelled' or 'status_changed') without sending it.
+        """
+        payload = payload or {}
+        if event == 'confirmed':
+            subject, html_message = OrderEmailService.get_confirmation_content(order)
+        elif event == 'cancelled':
+            subject, html_message = OrderEmailService.get_cancelled_content(order)
+        else:
+            subject, html_message = OrderEmailService.get_status_change_content(
+                order, payload.get('old_status'), payload.get('new_status')
+            )
+
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=strip_tags(html_message),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[order.customer_email],
+            connection=connection,
+        )
+        message.attach_alternative(html_message, 'text/html')
+        return message
     
     @staticmethod
     def send_order_confirmation(order):
         """Send order confirmation email."""
         try:
-            subject = f"تایید سفارش #{order.order_number} - پیکان توریسم"
-            html_message = get_order_confirmation_template(order)
+            subject, html_message = OrderEmailService.get_confirmation_content(order)
             plain_message = strip_tags(html_message)
             
             from_email = settings.DEFAULT_FROM_EMAIL
@@ -46,8 +123,7 @@ class OrderEmailService:
     def send_order_status_change(order, old_status, new_status):
         """Send order status change email."""
         try:
-            subject = f"تغییر وضعیت سفارش #{order.order_number} - پیکان توریسم"
-            html_message = get_order_status_change_template(order, old_status, new_status)
+            subject, html_message = OrderEmailService.get_status_change_content(order, old_status, new_status)
             plain_message = strip_tags(html_message)
             
             from_email = settings.DEFAULT_FROM_EMAIL
@@ -73,42 +149,7 @@ class OrderEmailService:
     def send_order_cancelled(order):
         """Send order cancellation email."""
         try:
-            subject = f"لغو سفارش #{order.order_number} - پیکان توریسم"
-            
-            html_message = f"""
-            <!DOCTYPE html>
-            <html dir="rtl" lang="fa">
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: 'Tahoma', 'Arial', sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 10px; padding: 30px; }}
-                    .header {{ text-align: center; color: #dc3545; margin-bottom: 30px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>❌ سفارش لغو شد</h1>
-                    </div>
-                    
-                    <p>سلام <strong>{order.customer_name}</strong> عزیز،</p>
-                    <p>سفارش شماره <strong>#{order.order_number}</strong> با موفقیت لغو شد.</p>
-                    
-                    <div style="background: #f8d7da; color: #721c24; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <p><strong>توجه:</strong> در صورت پرداخت مبلغ، طی 3-5 روز کاری به حساب شما بازگردانده خواهد شد.</p>
-                    </div>
-                    
-                    <p>در صورت داشتن سوال، با پشتیبانی تماس بگیرید:</p>
-                    <p><strong>تلفن:</strong> 021-12345678</p>
-                    <p><strong>واتساپ:</strong> 09123456789</p>
-                    
-                    <p>از اعتماد شما متشکریم! 🙏</p>
-                </div>
-            </body>
-            </html>
-            """
-            
+            subject, html_message = OrderEmailService.get_cancelled_content(order)
             plain_message = strip_tags(html_message)
             
             from_email = settings.DEFAULT_FROM_EMAIL
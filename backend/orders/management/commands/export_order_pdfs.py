@@ -0,0 +1,91 @@
+"""
+Management command for bulk export of order receipts and invoices.
+"""
+
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from orders.models import Order
+from orders.pdf_export import EXPORT_FORMATS, OrderPDFExport
+from orders.pdf_cache import PDF_KINDS
+
+
+class Command(BaseCommand):
+    help = 'Export the receipts or invoices of a date range or agent to a ZIP or merged PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output file path')
+        parser.add_argument(
+            '--kind',
+            choices=PDF_KINDS,
+            default='invoice',
+            help='Document to export'
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='zip',
+            help='ZIP of PDFs, or one merged PDF (needs pypdf)'
+        )
+        parser.add_argument('--from', dest='date_from', help='First order date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last order date (YYYY-MM-DD)')
+        parser.add_argument('--agent', help='Agent username')
+        parser.add_argument(
+            '--status',
+            action='append',
+            help='Order status to include; repeat for several (default: all)'
+        )
+        parser.add_argument('--workers', type=int, help='Render processes (default: ORDER_PDF_WORKERS)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Orders per checkpoint')
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the progress of an interrupted run and start over'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Order.objects.all()
+
+        date_from = self.parse_day(options.get('date_from'))
+        date_to = self.parse_day(options.get('date_to'))
+        if date_from:
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+        if date_to:
+            queryset = queryset.filter(created_at__lte=timezone.make_aware(datetime.combine(date_to, time.max)))
+        if options.get('agent'):
+            queryset = queryset.filter(agent__username=options['agent'])
+        if options.get('status'):
+            queryset = queryset.filter(status__in=options['status'])
+
+        try:
+            export = OrderPDFExport(
+                queryset, options['output'], kind=options['kind'],
+                export_format=options['format'], workers=options.get('workers'),
+                chunk_size=options['chunk_size']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        progress = export.run(
+            resume=not options['restart'],
+            on_progress=lambda p: self.stdout.write(f"Exported {p['exported']} orders ({len(p['failed'])} failed)")
+        )
+
+        if progress['failed']:
+            self.stdout.write(self.style.WARNING(
+                f"Failed to render {len(progress['failed'])} orders: {', '.join(progress['failed'][:20])}"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {progress['exported']} {options['kind']}s to {options['output']}"
+        ))
+
+    def parse_day(self, value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Invalid date: {value}')
+        return day
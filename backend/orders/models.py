@@ -2,13 +2,17 @@
 Order models for Peykan Tourism Platform.
 """
 
+import logging
 from decimal import Decimal
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 from django.utils import timezone
 from django.db.models import Sum
-from core.models import BaseModel
+from core.models import BaseModel, BaseBookingCountsModel
+
+logger = logging.getLogger(__name__)
 
 
 class Order(BaseModel):
@@ -240,10 +244,7 @@ class Order(BaseModel):
                         
                         if schedule_id:
                             # Calculate quantity for capacity (adults + children only)
-                            participants = item.booking_data.get('participants', {}) or {}
-                            adult_count = int(participants.get('adult', 0))
-                            child_count = int(participants.get('child', 0))
-                            qty_for_capacity = adult_count + child_count
+                            qty_for_capacity = item.capacity_count
                             
                             if qty_for_capacity > 0:
                                 from tours.services import TourCapacityService
@@ -284,10 +285,7 @@ class Order(BaseModel):
                         
                         if schedule_id:
                             # Calculate quantity for capacity (adults + children only)
-                            participants = item.booking_data.get('participants', {}) or {}
-                            adult_count = int(participants.get('adult', 0))
-                            child_count = int(participants.get('child', 0))
-                            qty_for_capacity = adult_count + child_count
+                            qty_for_capacity = item.capacity_count
                             
                             if qty_for_capacity > 0:
                                 from tours.services import TourCapacityService
@@ -355,7 +353,7 @@ class Order(BaseModel):
         ).exists()
 
 
-class OrderItem(BaseModel):
+class OrderItem(BaseBookingCountsModel):
     """
     Individual items in an order.
     """
@@ -525,6 +523,9 @@ class OrderItem(BaseModel):
         verbose_name = _('Order Item')
         verbose_name_plural = _('Order Items')
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['product_id', 'booking_date']),
+        ]
     
     def __str__(self):
         return f"{self.order.order_number} - {self.product_title}"
@@ -783,10 +784,7 @@ class OrderItem(BaseModel):
                 
                 if schedule_id:
                     # Calculate quantity for capacity (adults + children only)
-                    participants = self.booking_data.get('participants', {}) or {}
-                    adult_count = int(participants.get('adult', 0))
-                    child_count = int(participants.get('child', 0))
-                    qty_for_capacity = adult_count + child_count
+                    qty_for_capacity = self.capacity_count
                     
                     if qty_for_capacity > 0:
                         available = TourCapacityService.get_available_capacity(schedule_id, variant_id)
@@ -823,10 +821,7 @@ class OrderItem(BaseModel):
                 
                 if schedule_id:
                     # Calculate quantity for capacity (adults + children only)
-                    participants = self.booking_data.get('participants', {}) or {}
-                    adult_count = int(participants.get('adult', 0))
-                    child_count = int(participants.get('child', 0))
-                    qty_for_capacity = adult_count + child_count
+                    qty_for_capacity = self.capacity_count
                     
                     if qty_for_capacity > 0:
                         success, error = TourCapacityService.reserve_capacity(
@@ -863,10 +858,7 @@ class OrderItem(BaseModel):
                 
                 if schedule_id:
                     # Calculate quantity for capacity (adults + children only)
-                    participants = self.booking_data.get('participants', {}) or {}
-                    adult_count = int(participants.get('adult', 0))
-                    child_count = int(participants.get('child', 0))
-                    qty_for_capacity = adult_count + child_count
+                    qty_for_capacity = self.capacity_count
                     
                     if qty_for_capacity > 0:
                         TourCapacityService.release_capacity(schedule_id, variant_id, qty_for_capacity)
@@ -940,6 +932,54 @@ class OrderHistory(BaseModel):
         return f"{self.order.order_number} - {self.field_name}"
 
 
+class OrderNotification(BaseModel):
+    """
+    Outbox of order notification emails. Rows are written in the transaction
+    that changes the order and sent by the orders.dispatch_order_notifications
+    task, so order saves never wait for SMTP.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name=_('Order')
+    )
+    # 'confirmed', 'cancelled' or 'status_changed:<old>:<new>'; one row per order and event
+    event = models.CharField(max_length=100, verbose_name=_('Event'))
+    payload = models.JSONField(default=dict, blank=True, verbose_name=_('Payload'))
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_('Attempts'))
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name=_('Next attempt at'))
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Sent at'))
+    last_error = models.TextField(blank=True, verbose_name=_('Last error'))
+
+    class Meta:
+        verbose_name = _('Order Notification')
+        verbose_name_plural = _('Order Notifications')
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'event'], name='unique_order_notification_event'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order.order_number} - {self.event}"
+
+
 class OrderService:
     """
     Service class for order operations.
@@ -960,12 +1000,12 @@ class OrderService:
             settings = SystemSettings.get_settings()
             
             # Check item count limit
-            cart_items_count = cart.items.count()
+            cart_items_count = cart.item_count
             if cart_items_count > settings.cart_max_items_user:
                 raise ValueError(f"Cart exceeds maximum {settings.cart_max_items_user} items limit.")
             
             # Check total amount limit
-            cart_total = sum(Decimal(str(item.total_price)) for item in cart.items.all() if item.total_price)
+            cart_total = cart.subtotal
             if cart_total > settings.cart_max_total_user:
                 raise ValueError(f"Cart exceeds maximum ${settings.cart_max_total_user} total limit.")
             
@@ -985,6 +1025,8 @@ class OrderService:
                 # Validate capacity for transfers before creating order item
                 if cart_item.product_type == 'transfer':
                     OrderService._validate_transfer_capacity(cart_item)
+                elif cart_item.product_type == 'event':
+                    OrderService._hold_event_seats(cart_item)
                 
                 # Map order item fields properly
                 item_data = OrderItemFieldMapper.map_order_item_fields_from_cart_item(cart_item, order)
@@ -1017,10 +1059,7 @@ class OrderService:
 
                 if schedule_id and variant_id:
                     # Calculate quantity for capacity (adults + children only)
-                    participants = cart_item.booking_data.get('participants', {}) or {}
-                    adult_count = int(participants.get('adult', 0))
-                    child_count = int(participants.get('child', 0))
-                    qty_for_capacity = adult_count + child_count
+                    qty_for_capacity = cart_item.capacity_count
 
                     if qty_for_capacity > 0:
                         success, error = TourCapacityService.reserve_capacity(
@@ -1045,6 +1084,27 @@ class OrderService:
         except Exception as e:
             raise ValueError(f"Capacity update failed: {str(e)}")
     
+    @staticmethod
+    def _hold_event_seats(cart_item):
+        """
+        Extend the seat holds of an event cart item for checkout, holding
+        seats added without one. The reservation ids are kept in booking_data,
+        so the order item can confirm its holds later.
+        """
+        from events.seat_holds import SeatHoldService
+
+        booking_data = cart_item.booking_data or {}
+        performance_id = booking_data.get('performance_id')
+        seats = booking_data.get('seats') or []
+        if not performance_id or not seats:
+            return
+
+        unavailable = SeatHoldService.hold_selected_seats(
+            performance_id, seats, ttl_seconds=settings.SEAT_HOLD_CONFIRM_TTL_SECONDS
+        )
+        if unavailable:
+            raise ValueError(f"Seats {unavailable} are no longer available")
+
     @staticmethod
     def _validate_transfer_capacity(cart_item):
         """Validate transfer capacity before creating order."""
@@ -1125,66 +1185,94 @@ class OrderService:
         )
     
     @staticmethod
-    def _update_capacity_for_order_status_change(order, old_status, new_status):
-        """Update capacity when order status changes."""
-        try:
-            from tours.services import TourCapacityService
-
-            # Only update capacity for tour orders
-            for item in order.items.filter(product_type='tour'):
-                schedule_id = item.booking_data.get('schedule_id')
+    def _get_capacity_action(old_status, new_status):
+        """Tour capacity action for an order status change, or None."""
+        if old_status == 'pending' and new_status in ['confirmed', 'paid', 'completed']:
+            # Order confirmed/paid - confirm capacity
+            return 'confirm'
+        if old_status in ['confirmed', 'pending'] and new_status == 'paid':
+            # Order paid - reserve capacity (if not already reserved)
+            return 'reserve'
+        if old_status in ['confirmed', 'paid', 'completed'] and new_status == 'cancelled':
+            # Order cancelled - release confirmed capacity
+            return 'release'
+        # Pending order cancelled - no capacity to release (wasn't reserved yet)
+        return None
 
-                if not schedule_id:
-                    continue
+    @staticmethod
+    def update_capacity_for_status_changes(changes):
+        """
+        Update tour capacity for many order status changes at once, e.g. from
+        admin bulk actions. changes holds (order, old_status, new_status)
+        tuples. All tour items are loaded in one query and applied in one
+        capacity transaction; seat holds of confirmed event items are
+        confirmed. Returns {item_id: (success, error)}.
+        """
+        from tours.services import CapacityTransition, TourCapacityService
 
-                # Calculate quantity for capacity (adults + children only)
-                participants = item.booking_data.get('participants', {}) or {}
-                adult_count = int(participants.get('adult', 0))
-                child_count = int(participants.get('child', 0))
-                qty_for_capacity = adult_count + child_count
+        actions = {}
+        for order, old_status, new_status in changes:
+            action = OrderService._get_capacity_action(old_status, new_status)
+            if action:
+                actions[order.pk] = action
+        if not actions:
+            return {}
 
-                if qty_for_capacity <= 0:
-                    continue
+        transitions = []
+        seat_results = {}
+        for item in OrderItem.objects.filter(order_id__in=actions.keys(), product_type__in=['tour', 'event']):
+            if item.product_type == 'event':
+                if actions[item.order_id] == 'confirm':
+                    seat_results[item.id] = OrderService._confirm_seat_holds(item)
+                continue
+            schedule_id = item.booking_data.get('schedule_id')
+            # Calculate quantity for capacity (adults + children only)
+            if not schedule_id or item.capacity_count <= 0:
+                continue
+            if item.variant_id is None:
+                logger.warning(f"OrderItem {item.id} has variant_id=None, skipping capacity update")
+                continue
+            transitions.append(CapacityTransition(
+                item.id, schedule_id, str(item.variant_id), item.capacity_count, actions[item.order_id]
+            ))
 
-                # Update capacity based on status change
-                if old_status == 'pending' and new_status in ['confirmed', 'paid', 'completed']:
-                    # Order confirmed/paid - confirm capacity
-                    if item.variant_id is None:
-                        print(f"WARNING: OrderItem {item.id} has variant_id=None, skipping capacity confirmation")
-                        continue
+        results = TourCapacityService.apply_capacity_transitions(transitions)
+        results.update(seat_results)
+        for item_id, (success, error) in results.items():
+            if not success:
+                logger.warning(f"Capacity update failed for order item {item_id}: {error}")
+        return results
 
-                    variant_id = str(item.variant_id)
-                    print(f"DEBUG: Confirming capacity for schedule {schedule_id}, variant {variant_id}, qty {qty_for_capacity}")
-                    success, error = TourCapacityService.confirm_capacity(schedule_id, variant_id, qty_for_capacity)
-                    print(f"DEBUG: Confirm result: {success}, error: {error}")
-                    if not success:
-                        print(f"DEBUG: Capacity confirmation FAILED: {error}")
-                elif old_status in ['confirmed', 'pending'] and new_status == 'paid':
-                    # Order paid - reserve capacity (if not already reserved)
-                    if item.variant_id is None:
-                        print(f"WARNING: OrderItem {item.id} has variant_id=None, skipping capacity reservation")
-                        continue
+    @staticmethod
+    def _confirm_seat_holds(item):
+        """Confirm the seat holds of an event order item, so its seats are sold."""
+        from events.seat_holds import SeatHoldService
 
-                    variant_id = str(item.variant_id)
-                    print(f"DEBUG: Reserving capacity for schedule {schedule_id}, variant {variant_id}, qty {qty_for_capacity}")
-                    success, error = TourCapacityService.reserve_capacity(schedule_id, variant_id, qty_for_capacity)
-                    print(f"DEBUG: Reserve result: {success}, error: {error}")
-                    if not success:
-                        print(f"DEBUG: Capacity reservation FAILED: {error}")
-                elif old_status in ['confirmed', 'paid', 'completed'] and new_status == 'cancelled':
-                    # Order cancelled - release confirmed capacity
-                    if item.variant_id is None:
-                        print(f"WARNING: OrderItem {item.id} has variant_id=None, skipping capacity release")
-                        continue
+        booking_data = item.booking_data or {}
+        performance_id = booking_data.get('performance_id')
+        seats_by_reservation = {}
+        for seat in booking_data.get('seats') or []:
+            if seat.get('seat_id'):
+                # Seats booked before holds were recorded get one per order
+                reservation_id = seat.get('reservation_id') or f"order-{item.order_id}"
+                seats_by_reservation.setdefault(reservation_id, []).append(seat['seat_id'])
+        if not performance_id:
+            return True, ''
 
-                    variant_id = str(item.variant_id)
-                    TourCapacityService.release_capacity(schedule_id, variant_id, qty_for_capacity)
-                elif old_status == 'pending' and new_status == 'cancelled':
-                    # Pending order cancelled - no capacity to release (wasn't reserved yet)
-                    pass
+        for reservation_id, seat_ids in seats_by_reservation.items():
+            success, result = SeatHoldService.confirm_hold(performance_id, reservation_id, seat_ids)
+            if not success:
+                return False, result
+        return True, ''
 
+    @staticmethod
+    def _update_capacity_for_order_status_change(order, old_status, new_status):
+        """Update capacity when order status changes."""
+        try:
+            return OrderService.update_capacity_for_status_changes([(order, old_status, new_status)])
         except Exception as e:
-            print(f"Error updating capacity for order status change: {e}")
+            logger.error(f"Error updating capacity for order status change: {e}")
+            return {}
     
     @staticmethod
     def update_payment_status(order, new_status, payment_method=None):
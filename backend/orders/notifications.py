@@ -0,0 +1,158 @@
+"""
+Transactional outbox for order notification emails.
+Notifications are stored with the order change that caused them and sent in
+batches by a Celery task over one SMTP connection per batch. Batches are
+claimed in a short transaction and sent outside it. Failed sends are retried
+with exponential backoff; each (order, event) is queued once.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .email_service import OrderEmailService
+from .models import OrderNotification
+
+logger = logging.getLogger(__name__)
+
+
+class OrderNotificationService:
+    """
+    Service class for queueing and dispatching order notifications.
+    """
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 6
+    RETRY_BASE_DELAY = 60
+    RETRY_MAX_DELAY = 3600
+    # Lease of a claimed batch; longer than sending a batch takes
+    CLAIM_TIMEOUT = 600
+
+    @staticmethod
+    def enqueue(order, event, payload=None):
+        """
+        Queue a notification in the current transaction and schedule a
+        dispatch after commit. Events already queued for the order are ignored.
+        """
+        OrderNotification.objects.bulk_create(
+            [OrderNotification(order=order, event=event, payload=payload or {})],
+            ignore_conflicts=True
+        )
+        transaction.on_commit(OrderNotificationService._queue_dispatch)
+
+    @staticmethod
+    def _queue_dispatch():
+        from .tasks import dispatch_order_notifications
+
+        try:
+            # No publish retries: the periodic dispatch covers a broker outage
+            dispatch_order_notifications.apply_async(retry=False)
+        except Exception as e:
+            # The periodic dispatch picks the notification up later
+            logger.warning(f"Could not queue order notification dispatch: {str(e)}")
+
+    @staticmethod
+    def get_retry_delay(attempts):
+        return timedelta(seconds=min(
+            OrderNotificationService.RETRY_BASE_DELAY * 2 ** (attempts - 1),
+            OrderNotificationService.RETRY_MAX_DELAY
+        ))
+
+    @staticmethod
+    def claim(batch_size, now):
+        """
+        Claim a batch of due notifications in a short transaction. Rows are
+        locked with SKIP LOCKED and leased by moving next_attempt_at past the
+        claim timeout, so concurrent dispatchers never send the same
+        notification and rows of a crashed dispatcher become due again.
+        """
+        with transaction.atomic():
+            notifications = list(
+                OrderNotification.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                    status='pending', next_attempt_at__lte=now
+                ).select_related('order').order_by('next_attempt_at')[:batch_size]
+            )
+            OrderNotification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+                next_attempt_at=now + timedelta(seconds=OrderNotificationService.CLAIM_TIMEOUT)
+            )
+        return notifications
+
+    @staticmethod
+    def dispatch(batch_size=None):
+        """
+        Send one batch of due notifications over one SMTP connection. Mail is
+        sent outside the claiming transaction and each outcome is recorded on
+        its row; a connection failure counts as an attempt for the whole batch.
+        Returns the number of sent, retried and failed notifications.
+        """
+        batch_size = batch_size or OrderNotificationService.BATCH_SIZE
+        result = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        notifications = OrderNotificationService.claim(batch_size, timezone.now())
+        if not notifications:
+            return result
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            for notification in notifications:
+                OrderNotificationService._record_failure(notification, e, timezone.now())
+                OrderNotificationService._count(result, notification)
+            logger.warning(f"Could not connect to send order notifications: {str(e)}")
+            return result
+
+        try:
+            for notification in notifications:
+                OrderNotificationService._send(notification, connection)
+                OrderNotificationService._count(result, notification)
+        finally:
+            connection.close()
+
+        logger.info(f"Dispatched order notifications: {result}")
+        return result
+
+    @staticmethod
+    def _count(result, notification):
+        result['sent' if notification.status == 'sent' else
+               'failed' if notification.status == 'failed' else 'retried'] += 1
+
+    @staticmethod
+    def _save(notification):
+        notification.save(update_fields=[
+            'status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error', 'updated_at'
+        ])
+
+    @staticmethod
+    def _record_failure(notification, error, now):
+        """Count a failed attempt and schedule a retry, or give up."""
+        order = notification.order
+        notification.attempts += 1
+        notification.last_error = str(error)
+        if notification.attempts >= OrderNotificationService.MAX_ATTEMPTS:
+            notification.status = 'failed'
+            logger.error(f"Giving up on {notification.event} email for order {order.order_number}: {str(error)}")
+        else:
+            notification.next_attempt_at = now + OrderNotificationService.get_retry_delay(notification.attempts)
+            logger.warning(f"Failed to send {notification.event} email for order {order.order_number}: {str(error)}")
+        OrderNotificationService._save(notification)
+
+    @staticmethod
+    def _send(notification, connection):
+        """Send one notification and record the outcome on it."""
+        try:
+            OrderEmailService.build_message(
+                notification.order, notification.event.split(':')[0], notification.payload, connection
+            ).send()
+        except Exception as e:
+            OrderNotificationService._record_failure(notification, e, timezone.now())
+            return
+
+        notification.attempts += 1
+        notification.status = 'sent'
+        notification.sent_at = timezone.now()
+        notification.last_error = ''
+        OrderNotificationService._save(notification)
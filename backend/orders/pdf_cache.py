@@ -0,0 +1,179 @@
+"""
+Content-addressed storage of order receipt and invoice PDFs.
+A rendered PDF is stored under the order number and a hash of the order and
+item rows it was rendered from, so any change to the order yields a new file
+and stale PDFs are never served. PDFs are pre-rendered by a Celery task when
+an order is confirmed or paid; downloads only render inline on a miss.
+PDFs contain customer details and live in the private ORDER_PDF_STORAGE,
+never in the publicly served default storage.
+"""
+
+import hashlib
+import json
+import logging
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout changes, so every cached PDF is re-rendered
+RENDER_VERSION = 1
+
+PDF_KINDS = ('receipt', 'invoice')
+
+# Order and item fields that do not appear in the PDFs
+IGNORED_FIELDS = ('updated_at', 'internal_notes', 'admin_notes')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class OrderPDFCache:
+    """
+    Service class for rendering, storing and serving order PDFs.
+    """
+
+    @staticmethod
+    def get_directory():
+        return getattr(settings, 'ORDER_PDF_CACHE_DIR', 'order_pdfs')
+
+    @staticmethod
+    def get_storage():
+        """Private storage configured by ORDER_PDF_STORAGE."""
+        storage_config = settings.ORDER_PDF_STORAGE
+        return import_string(storage_config['BACKEND'])(**storage_config.get('OPTIONS', {}))
+
+    @staticmethod
+    def content_hash(order):
+        """Hash of the order and item rows the PDFs are rendered from."""
+        from .models import Order
+
+        order_row = Order.objects.filter(pk=order.pk).values().first() or {}
+        item_rows = list(order.items.order_by('pk').values())
+        state = {
+            'version': RENDER_VERSION,
+            'order': {k: v for k, v in order_row.items() if k not in IGNORED_FIELDS},
+            'items': [
+                {k: v for k, v in row.items() if k not in IGNORED_FIELDS} for row in item_rows
+            ],
+        }
+        payload = json.dumps(state, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def get_name(order, kind, digest):
+        return posixpath.join(OrderPDFCache.get_directory(), kind, f"{order.order_number}-{digest}.pdf")
+
+    @staticmethod
+    def render(order, kind):
+        from .pdf_service import pdf_generator
+
+        return pdf_generator.generate(order, kind)
+
+    @staticmethod
+    def get_or_render(order, kind):
+        """
+        Return (storage name, digest) of the current PDF of an order,
+        rendering and storing it when it is missing.
+        """
+        if kind not in PDF_KINDS:
+            raise ValueError(f"Unknown PDF kind: {kind}")
+
+        storage = OrderPDFCache.get_storage()
+        digest = OrderPDFCache.content_hash(order)
+        name = OrderPDFCache.get_name(order, kind, digest)
+        if storage.exists(name):
+            return name, digest
+
+        pdf_data = OrderPDFCache.render(order, kind)
+        # A concurrent render may have stored the same content meanwhile
+        if not storage.exists(name):
+            storage.save(name, ContentFile(pdf_data))
+            OrderPDFCache.delete_stale(storage, order, kind, keep=name)
+            logger.info(f"Rendered {kind} PDF for order {order.order_number}")
+        return name, digest
+
+    @staticmethod
+    def delete_stale(storage, order, kind, keep):
+        """Delete older PDFs of an order. Failures only leave unused files behind."""
+        directory = posixpath.join(OrderPDFCache.get_directory(), kind)
+        prefix = f"{order.order_number}-"
+        try:
+            _, files = storage.listdir(directory)
+            for filename in files:
+                name = posixpath.join(directory, filename)
+                if filename.startswith(prefix) and name != keep:
+                    storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete stale {kind} PDFs of order {order.order_number}: {e}")
+
+    @staticmethod
+    def prerender(order):
+        """Render every missing PDF of an order."""
+        for kind in PDF_KINDS:
+            OrderPDFCache.get_or_render(order, kind)
+
+    @staticmethod
+    def response(request, order, kind):
+        """
+        Serve the PDF of an order as an attachment with an ETag, answering
+        If-None-Match with 304 and single byte ranges with 206.
+        """
+        storage = OrderPDFCache.get_storage()
+        name, digest = OrderPDFCache.get_or_render(order, kind)
+        etag = f'"{digest}"'
+        filename = f"{kind}-{order.order_number}.pdf"
+
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        size = storage.size(name)
+        byte_range = None
+        if request.headers.get('If-Range', etag) == etag:
+            byte_range = OrderPDFCache._parse_range(request.headers.get('Range'), size)
+
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif byte_range:
+            start, end = byte_range
+            with storage.open(name, 'rb') as pdf_file:
+                pdf_file.seek(start)
+                content = pdf_file.read(end - start + 1)
+            response = HttpResponse(content, status=206, content_type='application/pdf')
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        else:
+            response = FileResponse(
+                storage.open(name, 'rb'), as_attachment=True,
+                filename=filename, content_type='application/pdf'
+            )
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def _parse_range(header, size):
+        """
+        Return (start, end) for a single satisfiable byte range, 'unsatisfiable'
+        or None when the header is missing or not understood.
+        """
+        match = RANGE_RE.match((header or '').strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        start, end = match.groups()
+        if start == '':
+            # Suffix range: the last n bytes
+            start, end = max(0, size - int(end)), size - 1
+        else:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            return 'unsatisfiable'
+        return start, end
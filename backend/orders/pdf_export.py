@@ -0,0 +1,172 @@
+"""
+Bulk export of order receipts and invoices.
+Orders are read in (created_at, pk) order with a chunked iterator, rendered in
+worker processes and written to a ZIP one entry at a time, so memory does not
+grow with the number of orders. Progress is checkpointed next to the output
+file together with the ZIP central directory at that point, so an
+interrupted ZIP export is cut back to its last checkpoint and resumes there.
+"""
+
+import base64
+import json
+import logging
+import os
+import zipfile
+from collections import deque
+from io import BytesIO
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .pdf_service import render_order_pdfs
+
+try:
+    from pypdf import PdfWriter  # type: ignore
+    HAS_PDF_MERGE = True
+except Exception:
+    HAS_PDF_MERGE = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('zip', 'pdf')
+
+
+class OrderPDFExport:
+    """
+    Export the receipts or invoices of an order queryset to a ZIP file, or
+    to one merged PDF (needs pypdf and is not resumable).
+    """
+
+    def __init__(self, queryset, output_path, kind='invoice', export_format='zip',
+                 workers=None, chunk_size=500):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if export_format == 'pdf' and not HAS_PDF_MERGE:
+            raise ValueError("Merged PDF export requires pypdf")
+
+        self.queryset = queryset.prefetch_related(None).order_by('created_at', 'pk')
+        self.output_path = output_path
+        self.progress_path = f"{output_path}.progress.json"
+        self.kind = kind
+        self.export_format = export_format
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def load_progress(self):
+        """Return the checkpoint of a previous run of this export, if any."""
+        if self.export_format != 'zip' or not os.path.exists(self.output_path):
+            return None
+        try:
+            with open(self.progress_path) as progress_file:
+                progress = json.load(progress_file)
+        except (OSError, ValueError):
+            return None
+        if progress.get('kind') != self.kind or progress.get('done') or not progress.get('zip_directory'):
+            return None
+        return progress
+
+    def save_progress(self, progress):
+        tmp_path = f"{self.progress_path}.tmp"
+        with open(tmp_path, 'w') as progress_file:
+            json.dump(progress, progress_file)
+        os.replace(tmp_path, self.progress_path)
+
+    def run(self, resume=True, on_progress=None):
+        """
+        Write the export and return its final progress record. on_progress
+        is called with the progress record at every checkpoint.
+        """
+        progress = self.load_progress() if resume else None
+        queryset = self.queryset
+        if progress and progress.get('last_created_at'):
+            last_created_at = parse_datetime(progress['last_created_at'])
+            queryset = queryset.filter(
+                Q(created_at__gt=last_created_at)
+                | Q(created_at=last_created_at, pk__gt=progress['last_pk'])
+            )
+        else:
+            progress = {
+                'kind': self.kind, 'format': self.export_format, 'exported': 0,
+                'failed': [], 'last_created_at': None, 'last_pk': None, 'done': False,
+            }
+
+        # Rendered results come back in input order, so rows wait here for them
+        pending = deque()
+
+        def order_ids():
+            for row in queryset.values_list('pk', 'order_number', 'created_at').iterator(
+                chunk_size=self.chunk_size
+            ):
+                pending.append(row)
+                yield row[0]
+
+        results = render_order_pdfs(order_ids(), self.kind, self.workers, self.chunk_size)
+        if self.export_format == 'zip':
+            self._write_zip(results, pending, progress, on_progress)
+        else:
+            self._write_pdf(results, pending, progress)
+
+        progress['done'] = True
+        self.save_progress(progress)
+        if on_progress:
+            on_progress(progress)
+        return progress
+
+    def _record(self, progress, row, error):
+        pk, order_number, created_at = row
+        if error:
+            progress['failed'].append(order_number)
+        else:
+            progress['exported'] += 1
+        progress['last_created_at'] = created_at.isoformat()
+        progress['last_pk'] = str(pk)
+
+    def _open_zip(self, progress):
+        """Open the ZIP for appending, cut back to the checkpoint in progress."""
+        if not progress.get('zip_directory'):
+            return zipfile.ZipFile(self.output_path, 'w', zipfile.ZIP_STORED)
+        with open(self.output_path, 'r+b') as output:
+            output.truncate(progress['zip_data_end'])
+            output.seek(progress['zip_data_end'])
+            output.write(base64.b64decode(progress['zip_directory']))
+        return zipfile.ZipFile(self.output_path, 'a', zipfile.ZIP_STORED)
+
+    def _checkpoint_zip(self, archive, progress):
+        """Close the ZIP, store its central directory in progress and reopen it."""
+        archive.close()
+        archive = zipfile.ZipFile(self.output_path, 'a', zipfile.ZIP_STORED)
+        with open(self.output_path, 'rb') as output:
+            output.seek(archive.start_dir)
+            directory = output.read()
+        progress['zip_data_end'] = archive.start_dir
+        progress['zip_directory'] = base64.b64encode(directory).decode()
+        self.save_progress(progress)
+        return archive
+
+    def _write_zip(self, results, pending, progress, on_progress):
+        # PDFs are already compressed, so entries are stored as they are
+        archive = self._open_zip(progress)
+        try:
+            for count, (_, pdf_data, error) in enumerate(results, start=1):
+                row = pending.popleft()
+                if pdf_data is not None:
+                    archive.writestr(f"{self.kind}-{row[1]}.pdf", pdf_data)
+                self._record(progress, row, error)
+
+                if count % self.chunk_size == 0:
+                    archive = self._checkpoint_zip(archive, progress)
+                    if on_progress:
+                        on_progress(progress)
+        finally:
+            archive.close()
+        progress.pop('zip_directory', None)
+
+    def _write_pdf(self, results, pending, progress):
+        writer = PdfWriter()
+        for _, pdf_data, error in results:
+            row = pending.popleft()
+            if pdf_data is not None:
+                writer.append(BytesIO(pdf_data))
+            self._record(progress, row, error)
+        with open(self.output_path, 'wb') as output:
+            writer.write(output)
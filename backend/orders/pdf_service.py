@@ -12,8 +12,14 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from io import BytesIO
+import logging
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from django.conf import settings
+from django.db import connections
 from decimal import Decimal
 
 try:
@@ -24,6 +30,101 @@ except Exception:
     HAS_RTL_LIBS = False
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+
+def _load_fonts():
+    """Find and register the Persian fonts. Returns (regular, bold) font names."""
+    # 1. Try local fonts in project
+    local_font_candidates = [
+        os.path.join('sahel', 'Sahel.ttf'),
+        os.path.join('sahel', 'Sahel-Bold.ttf'),
+        os.path.join('vazir', 'ttf', 'Vazirmatn-Regular.ttf'),
+        os.path.join('vazir', 'ttf', 'Vazirmatn-Bold.ttf'),
+        'Vazirmatn-Regular.ttf',
+        'Vazirmatn-Bold.ttf',
+        'Vazirmatn[wght].ttf',
+        'Sahel.ttf',
+        'Vazirmatn-Regular.ttf',
+        'arabtype.ttf',  # fallback
+    ]
+
+    for font_file in local_font_candidates:
+        local_font_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', font_file)
+
+        if os.path.exists(local_font_path):
+            try:
+                # Register as Persian family
+                pdfmetrics.registerFont(TTFont('Persian', local_font_path))
+                # Try bold pairing if available
+                bold_candidate = local_font_path.replace('Regular', 'Bold').replace('Sahel.ttf', 'Sahel-Bold.ttf')
+                bold_font = 'Persian'
+                if os.path.exists(bold_candidate):
+                    pdfmetrics.registerFont(TTFont('Persian-Bold', bold_candidate))
+                    bold_font = 'Persian-Bold'
+                logger.info(f"Local Persian font loaded successfully: {font_file}")
+                return 'Persian', bold_font
+            except Exception as font_error:
+                logger.warning(f"Failed to load local font {font_file}: {font_error}")
+                continue
+
+    # 2. Try system fonts (Windows)
+    system_font_candidates = [
+        'C:/Windows/Fonts/tahoma.ttf',
+        'C:/Windows/Fonts/arial.ttf',
+        'C:/Windows/Fonts/calibri.ttf',
+    ]
+
+    for font_path in system_font_candidates:
+        if os.path.exists(font_path):
+            try:
+                pdfmetrics.registerFont(TTFont('SystemPersian', font_path))
+                pdfmetrics.registerFont(TTFont('SystemPersian-Bold', font_path))
+                logger.info(f"System font loaded for Persian support: {os.path.basename(font_path)}")
+                return 'SystemPersian', 'SystemPersian-Bold'
+            except Exception as font_error:
+                logger.warning(f"Failed to load system font {font_path}: {font_error}")
+                continue
+
+    # 3. Final fallback
+    logger.warning("No suitable font found, using Helvetica")
+    return 'Helvetica', 'Helvetica-Bold'
+
+
+_fonts = None
+_fonts_lock = threading.Lock()
+
+
+def register_fonts():
+    """
+    Register the PDF fonts once per process and return (regular, bold) font
+    names. Called from OrdersConfig.ready so requests never probe the disk.
+    """
+    global _fonts
+    if _fonts is None:
+        with _fonts_lock:
+            if _fonts is None:
+                try:
+                    _fonts = _load_fonts()
+                except Exception as e:
+                    logger.error(f"Font setup error: {e}")
+                    _fonts = ('Helvetica', 'Helvetica-Bold')
+    return _fonts
+
+
+@lru_cache(maxsize=4096)
+def shape_text(text):
+    """
+    Reshape and bidi-reorder Persian text for ReportLab. Memoized, as the
+    same labels, statuses and product names recur on every document.
+    """
+    if HAS_RTL_LIBS and text:
+        try:
+            return get_display(arabic_reshaper.reshape(text))
+        except Exception:
+            return text
+    return text
+
 
 class PDFReceiptGenerator:
     """Generate PDF receipts for orders."""
@@ -32,84 +133,14 @@ class PDFReceiptGenerator:
         self.setup_fonts()
     
     def setup_fonts(self):
-        """Setup Persian fonts for PDF."""
-        try:
-            # Try multiple Persian font sources
-            font_loaded = False
-            
-            # 1. Try local fonts in project
-            local_font_candidates = [
-                os.path.join('sahel', 'Sahel.ttf'),
-                os.path.join('sahel', 'Sahel-Bold.ttf'),
-                os.path.join('vazir', 'ttf', 'Vazirmatn-Regular.ttf'),
-                os.path.join('vazir', 'ttf', 'Vazirmatn-Bold.ttf'),
-                'Vazirmatn-Regular.ttf',
-                'Vazirmatn-Bold.ttf',
-                'Vazirmatn[wght].ttf',
-                'Sahel.ttf',
-                'Vazirmatn-Regular.ttf',
-                'arabtype.ttf',  # fallback
-            ]
-            
-            for font_file in local_font_candidates:
-                local_font_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', font_file)
-                
-                if os.path.exists(local_font_path):
-                    try:
-                        font_base = os.path.splitext(os.path.basename(local_font_path))[0]
-                        # Register as Persian family
-                        pdfmetrics.registerFont(TTFont('Persian', local_font_path))
-                        self.persian_font = 'Persian'
-                        # Try bold pairing if available
-                        bold_candidate = local_font_path.replace('Regular', 'Bold').replace('Sahel.ttf', 'Sahel-Bold.ttf')
-                        if os.path.exists(bold_candidate):
-                            pdfmetrics.registerFont(TTFont('Persian-Bold', bold_candidate))
-                            self.persian_font_bold = 'Persian-Bold'
-                        else:
-                            self.persian_font_bold = self.persian_font
-                        print(f"Local Persian font loaded successfully: {font_file}")
-                        font_loaded = True
-                        break
-                    except Exception as font_error:
-                        print(f"Failed to load local font {font_file}: {font_error}")
-                        continue
-            
-            # 2. Try system fonts (Windows)
-            if not font_loaded:
-                system_font_candidates = [
-                    'C:/Windows/Fonts/tahoma.ttf',
-                    'C:/Windows/Fonts/arial.ttf',
-                    'C:/Windows/Fonts/calibri.ttf',
-                ]
-                
-                for font_path in system_font_candidates:
-                    if os.path.exists(font_path):
-                        try:
-                            font_name = os.path.basename(font_path).replace('.ttf', '')
-                            pdfmetrics.registerFont(TTFont('SystemPersian', font_path))
-                            pdfmetrics.registerFont(TTFont('SystemPersian-Bold', font_path))
-                            self.persian_font = 'SystemPersian'
-                            self.persian_font_bold = 'SystemPersian-Bold'
-                            print(f"System font loaded for Persian support: {font_name}")
-                            font_loaded = True
-                            break
-                        except Exception as font_error:
-                            print(f"Failed to load system font {font_path}: {font_error}")
-                            continue
-            
-            # 3. Final fallback
-            if not font_loaded:
-                print("No suitable font found, using Helvetica")
-                self.persian_font = 'Helvetica'
-                self.persian_font_bold = 'Helvetica-Bold'
-                
-        except Exception as e:
-            print(f"Font setup error: {e}")
-            # Ultimate fallback
-            self.persian_font = 'Helvetica'
-            self.persian_font_bold = 'Helvetica-Bold'
-    
+        """Use the process-wide Persian fonts."""
+        self.persian_font, self.persian_font_bold = register_fonts()
 
+    def generate(self, order, kind):
+        """Generate the receipt or invoice PDF of an order."""
+        if kind == 'invoice':
+            return self.generate_invoice(order)
+        return self.generate_receipt(order)
     
     def generate_receipt(self, order):
         """Generate PDF receipt for an order."""
@@ -153,13 +184,7 @@ class PDFReceiptGenerator:
     def _shape(self, text: str) -> str:
         if not isinstance(text, str):
             text = str(text)
-        if HAS_RTL_LIBS and text:
-            try:
-                reshaped = arabic_reshaper.reshape(text)
-                return get_display(reshaped)
-            except Exception:
-                return text
-        return text
+        return shape_text(text)
 
     def _create_header(self, order):
         """Create PDF header."""
@@ -694,3 +719,54 @@ class PDFReceiptGenerator:
 
 # Service instance
 pdf_generator = PDFReceiptGenerator()
+
+
+def _init_render_worker():
+    """Set up Django in a render worker (needed with the spawn start method)."""
+    import django
+    django.setup()
+    register_fonts()
+
+
+def render_order_pdf(order_id, kind='invoice'):
+    """Render one order PDF. Returns (order_id, pdf_data, error)."""
+    from .models import Order
+
+    try:
+        order = Order.objects.prefetch_related('items').get(pk=order_id)
+        return order_id, pdf_generator.generate(order, kind), None
+    except Exception as e:
+        logger.error(f"PDF generation failed for order {order_id}: {e}")
+        return order_id, None, str(e)
+
+
+def _worker_ready(_):
+    return os.getpid()
+
+
+def render_order_pdfs(order_ids, kind='invoice', workers=None, chunk_size=100):
+    """
+    Yield (order_id, pdf_data, error) for each order id, in order. order_ids
+    may be a lazy iterator; it is consumed chunk_size ids at a time. With more
+    than one worker the PDFs are rendered in a process pool, so a batch uses
+    every core; ORDER_PDF_WORKERS sets the default pool size.
+    """
+    if workers is None:
+        workers = getattr(settings, 'ORDER_PDF_WORKERS', os.cpu_count() or 1)
+
+    if workers <= 1:
+        for order_id in order_ids:
+            yield render_order_pdf(order_id, kind)
+        return
+
+    # Forked workers must not share the parent's database connections, so all
+    # of them are started before order_ids opens a query
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as executor:
+        list(executor.map(_worker_ready, range(workers)))
+        order_ids = iter(order_ids)
+        while True:
+            chunk = list(islice(order_ids, chunk_size))
+            if not chunk:
+                break
+            yield from executor.map(render_order_pdf, chunk, [kind] * len(chunk))
@@ -2,10 +2,11 @@
 Django signals for order notifications.
 """
 
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from .models import Order
-from .email_service import OrderEmailService
+from .notifications import OrderNotificationService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,37 +27,40 @@ def capture_old_status(sender, instance, **kwargs):
 
 @receiver(post_save, sender=Order)
 def send_order_notifications(sender, instance, created, **kwargs):
-    """Send email notifications when order is created or status changes."""
+    """
+    Queue email notifications when order is created or status changes.
+    The outbox row is written in the transaction of the order change and
+    sent by orders.dispatch_order_notifications after commit.
+    """
     
     # Skip if email is not available
     if not instance.customer_email:
         logger.warning(f"No email available for order {instance.order_number}")
         return
     
-    try:
-        if created:
-            # New order created - send confirmation if status is confirmed
-            if instance.status == 'confirmed':
-                OrderEmailService.send_order_confirmation(instance)
-                logger.info(f"Order confirmation email triggered for new order {instance.order_number}")
-        else:
-            # Existing order updated - check for status change
-            old_status = getattr(instance, '_old_status', None)
-            new_status = instance.status
+    if created:
+        # New order created - send confirmation if status is confirmed
+        if instance.status == 'confirmed':
+            OrderNotificationService.enqueue(instance, 'confirmed')
+            logger.info(f"Order confirmation email queued for new order {instance.order_number}")
+    else:
+        # Existing order updated - check for status change
+        old_status = getattr(instance, '_old_status', None)
+        new_status = instance.status
+        
+        if old_status and old_status != new_status:
+            logger.info(f"Order status changed: {old_status} -> {new_status} for order {instance.order_number}")
             
-            if old_status and old_status != new_status:
-                logger.info(f"Order status changed: {old_status} -> {new_status} for order {instance.order_number}")
-                
-                # Send appropriate email based on new status
-                if new_status == 'confirmed':
-                    OrderEmailService.send_order_confirmation(instance)
-                elif new_status == 'cancelled':
-                    OrderEmailService.send_order_cancelled(instance)
-                else:
-                    OrderEmailService.send_order_status_change(instance, old_status, new_status)
-                    
-    except Exception as e:
-        logger.error(f"Error in order notification signal for order {instance.order_number}: {str(e)}")
+            # Queue appropriate email based on new status
+            if new_status == 'confirmed':
+                OrderNotificationService.enqueue(instance, 'confirmed')
+            elif new_status == 'cancelled':
+                OrderNotificationService.enqueue(instance, 'cancelled')
+            else:
+                OrderNotificationService.enqueue(
+                    instance, f'status_changed:{old_status}:{new_status}',
+                    {'old_status': old_status, 'new_status': new_status}
+                )
 
 
 @receiver(post_save, sender=Order)
@@ -67,7 +71,8 @@ def update_capacity_on_status_change(sender, instance, created, **kwargs):
             old_status = getattr(instance, '_old_status', None)
             new_status = instance.status
             
-            if old_status and old_status != new_status:
+            # Bulk callers apply the capacity of many orders in one batch
+            if old_status and old_status != new_status and not getattr(instance, '_defer_capacity_update', False):
                 logger.info(f"Updating capacity for order {instance.order_number}: {old_status} -> {new_status}")
                 
                 # Import here to avoid circular imports
@@ -81,6 +86,29 @@ def update_capacity_on_status_change(sender, instance, created, **kwargs):
         logger.error(f"Error updating capacity for order {instance.order_number}: {str(e)}")
 
 
+# Statuses whose receipt and invoice are rendered ahead of the first download
+PDF_PRERENDER_STATUSES = ('confirmed', 'paid')
+
+
+def _queue_pdf_prerender(order_id, order_number):
+    from .tasks import prerender_order_pdfs
+
+    try:
+        prerender_order_pdfs.apply_async((str(order_id),), retry=False)
+    except Exception as e:
+        # Downloads render inline on a miss, so a broker outage only costs latency
+        logger.warning(f"Could not queue PDF pre-rendering for order {order_number}: {str(e)}")
+
+
+@receiver(post_save, sender=Order)
+def prerender_pdfs_on_confirmation(sender, instance, created, **kwargs):
+    """Queue PDF pre-rendering when an order becomes confirmed or paid."""
+    old_status = None if created else getattr(instance, '_old_status', None)
+    if instance.status in PDF_PRERENDER_STATUSES and old_status != instance.status:
+        order_id, order_number = instance.pk, instance.order_number
+        transaction.on_commit(lambda: _queue_pdf_prerender(order_id, order_number))
+
+
 # WhatsApp notification helper (for future use)
 class WhatsAppService:
     """Service for WhatsApp notifications."""
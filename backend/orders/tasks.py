@@ -0,0 +1,46 @@
+"""
+Celery tasks for Orders app.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .models import Order
+from .notifications import OrderNotificationService
+from .pdf_cache import OrderPDFCache
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name='orders.prerender_order_pdfs', max_retries=3, default_retry_delay=60, ignore_result=True)
+def prerender_order_pdfs(self, order_id):
+    """
+    Render and store the receipt and invoice PDFs of an order, so downloads
+    are served from storage. Queued when an order is confirmed or paid.
+    """
+    order = Order.objects.filter(pk=order_id).first()
+    if order is None:
+        return {'status': 'skipped', 'order_id': order_id}
+
+    try:
+        OrderPDFCache.prerender(order)
+    except Exception as e:
+        logger.error(f"Error pre-rendering PDFs for order {order.order_number}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+
+    return {'status': 'success', 'order_number': order.order_number}
+
+
+@shared_task(bind=True, name='orders.dispatch_order_notifications', ignore_result=True)
+def dispatch_order_notifications(self):
+    """
+    Send due order notification emails in batches over one SMTP connection.
+    Queued after order changes commit and run periodically for retries.
+    """
+    result = OrderNotificationService.dispatch()
+    total = sum(result.values())
+    if total >= OrderNotificationService.BATCH_SIZE:
+        # More may be due; drain the outbox in follow-up tasks
+        dispatch_order_notifications.delay()
+    return result
@@ -0,0 +1,209 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Order, OrderNotification
+from .notifications import OrderNotificationService
+from .pdf_cache import OrderPDFCache
+from .pdf_export import OrderPDFExport
+from .pdf_service import PDFReceiptGenerator, render_order_pdfs, shape_text
+
+
+class OrderPDFCacheTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.pdf_root = tempfile.mkdtemp()
+        for root in (self.media_root, self.pdf_root):
+            self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            ORDER_PDF_STORAGE={
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                'OPTIONS': {'location': self.pdf_root},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(username='pdf-buyer', password='x')
+        self.order = Order.objects.create(
+            user=self.user, customer_name='Buyer', customer_email='buyer@example.com',
+            customer_phone='0912', status='confirmed', subtotal=Decimal('100.00')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pdf_is_rendered_once_per_order_state(self):
+        with mock.patch.object(OrderPDFCache, 'render', return_value=b'%PDF-1.4 receipt') as render:
+            first, _ = OrderPDFCache.get_or_render(self.order, 'receipt')
+            second, _ = OrderPDFCache.get_or_render(self.order, 'receipt')
+            self.assertEqual(first, second)
+            self.assertEqual(render.call_count, 1)
+
+            Order.objects.filter(pk=self.order.pk).update(customer_name='Other Buyer')
+            third, _ = OrderPDFCache.get_or_render(self.order, 'receipt')
+            self.assertNotEqual(third, first)
+            self.assertEqual(render.call_count, 2)
+
+    def test_pdfs_are_not_stored_in_media(self):
+        with mock.patch.object(OrderPDFCache, 'render', return_value=b'%PDF-1.4 receipt'):
+            name, _ = OrderPDFCache.get_or_render(self.order, 'receipt')
+        self.assertTrue(os.path.exists(os.path.join(self.pdf_root, name)))
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_download_supports_etag_and_ranges(self):
+        url = reverse('orders:order-receipt', args=[self.order.order_number])
+        with mock.patch.object(OrderPDFCache, 'render', return_value=b'%PDF-1.4 receipt'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 receipt')
+            etag = response['ETag']
+
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            partial = self.client.get(url, HTTP_RANGE='bytes=0-3')
+            self.assertEqual(partial.status_code, 206)
+            self.assertEqual(partial.content, b'%PDF')
+            self.assertEqual(partial['Content-Range'], 'bytes 0-3/16')
+
+
+class PDFServiceTests(TestCase):
+    def test_fonts_are_registered_once_per_process(self):
+        with mock.patch('orders.pdf_service.pdfmetrics.registerFont') as register_font:
+            generator = PDFReceiptGenerator()
+        register_font.assert_not_called()
+        self.assertTrue(generator.persian_font)
+
+    def test_shaping_is_memoized(self):
+        shape_text.cache_clear()
+        shape_text('تایید شده')
+        shape_text('تایید شده')
+        self.assertEqual(shape_text.cache_info().hits, 1)
+
+    def test_render_order_pdfs_in_process(self):
+        user = get_user_model().objects.create_user(username='batch-buyer', password='x')
+        order = Order.objects.create(
+            user=user, customer_name='Buyer', customer_email='buyer@example.com',
+            customer_phone='0912', subtotal=Decimal('100.00')
+        )
+        results = list(render_order_pdfs([order.pk, 'missing'], 'invoice', workers=1))
+        self.assertEqual(results[0][0], order.pk)
+        self.assertTrue(results[0][1].startswith(b'%PDF'))
+        self.assertIsNone(results[0][2])
+        self.assertIsNone(results[1][1])
+        self.assertTrue(results[1][2])
+
+
+class OrderPDFExportTests(TestCase):
+    def setUp(self):
+        export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_dir, ignore_errors=True)
+        self.output_path = f"{export_dir}/invoices.zip"
+
+        user = get_user_model().objects.create_user(username='export-buyer', password='x')
+        self.orders = [
+            Order.objects.create(
+                user=user, customer_name='Buyer', customer_email='buyer@example.com',
+                customer_phone='0912', subtotal=Decimal('100.00')
+            )
+            for _ in range(5)
+        ]
+        generate = mock.patch(
+            'orders.pdf_service.pdf_generator.generate',
+            side_effect=lambda order, kind: f'%PDF {order.order_number}'.encode()
+        )
+        generate.start()
+        self.addCleanup(generate.stop)
+
+    def test_interrupted_export_resumes_from_checkpoint(self):
+        export = OrderPDFExport(Order.objects.all(), self.output_path, workers=1, chunk_size=2)
+        real_write = zipfile.ZipFile.writestr
+        calls = []
+
+        def crash_on_fourth(archive, name, data):
+            calls.append(name)
+            if len(calls) == 4:
+                raise KeyboardInterrupt
+            return real_write(archive, name, data)
+
+        with mock.patch.object(zipfile.ZipFile, 'writestr', crash_on_fourth):
+            with self.assertRaises(KeyboardInterrupt):
+                export.run()
+
+        progress = export.run()
+        self.assertEqual(progress['exported'], 5)
+        with zipfile.ZipFile(self.output_path) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                sorted(f"invoice-{order.order_number}.pdf" for order in self.orders)
+            )
+
+
+class OrderNotificationOutboxTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='notified-buyer', password='x')
+        self.order = Order.objects.create(
+            user=user, customer_name='Buyer', customer_email='buyer@example.com',
+            customer_phone='0912', subtotal=Decimal('100.00')
+        )
+
+    def test_status_changes_are_queued_once_and_sent_in_a_batch(self):
+        self.order.status = 'confirmed'
+        self.order.save()
+        self.order.status = 'pending'
+        self.order.save()
+        self.order.status = 'confirmed'
+        self.order.save()
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            sorted(OrderNotification.objects.values_list('event', flat=True)),
+            ['confirmed', 'status_changed:confirmed:pending']
+        )
+
+        result = OrderNotificationService.dispatch()
+        self.assertEqual(result, {'sent': 2, 'retried': 0, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OrderNotification.objects.exclude(status='sent').exists())
+
+    def test_confirmation_queues_tasks_without_publish_retries(self):
+        with mock.patch('orders.tasks.dispatch_order_notifications.apply_async') as dispatch, \
+                mock.patch('orders.tasks.prerender_order_pdfs.apply_async') as prerender, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.order.status = 'confirmed'
+            self.order.save()
+        dispatch.assert_called_once_with(retry=False)
+        prerender.assert_called_once_with((str(self.order.pk),), retry=False)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        OrderNotificationService.enqueue(self.order, 'cancelled')
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            result = OrderNotificationService.dispatch()
+        self.assertEqual(result['retried'], 1)
+
+        notification = OrderNotification.objects.get(order=self.order)
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.last_error, 'SMTP down')
+        # Not due again until the backoff has passed
+        self.assertEqual(OrderNotificationService.dispatch(), {'sent': 0, 'retried': 0, 'failed': 0})
+
+    def test_connection_failure_counts_for_the_whole_batch(self):
+        OrderNotificationService.enqueue(self.order, 'cancelled')
+        OrderNotificationService.enqueue(self.order, 'confirmed')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('SMTP down')):
+            result = OrderNotificationService.dispatch()
+        self.assertEqual(result, {'sent': 0, 'retried': 2, 'failed': 0})
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            list(OrderNotification.objects.values_list('status', 'attempts', 'last_error')),
+            [('pending', 1, 'SMTP down')] * 2
+        )
@@ -23,6 +23,8 @@ urlpatterns = [
     path('<str:order_number>/cancel/', views.CancelOrderView.as_view(), name='cancel-order'),
     path('<str:order_number>/actions/cancel/', views.CancelOrderView.as_view(), name='cancel-order-action'),
     path('<str:order_number>/whatsapp/', views.OrderWhatsAppView.as_view(), name='order-whatsapp'),
+    path('<str:order_number>/receipt/', views.OrderReceiptView.as_view(), name='order-receipt'),
+    path('<str:order_number>/invoice/', views.OrderInvoiceView.as_view(), name='order-invoice'),
     path('<str:order_number>/<str:action>/', views.OrderActionView.as_view(), name='order-action'),
     path('<str:order_number>/', views.OrderDetailView.as_view(), name='order-detail'),
     path('', views.OrdersRootView.as_view(), name='order-list-create'),
@@ -10,6 +10,7 @@ from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
+from core.rate_limit import RateLimiter
 from .models import Order, OrderItem, OrderService
 from .serializers import OrderSerializer, CreateOrderSerializer
 from django.http import HttpResponse
@@ -321,16 +322,8 @@ class AddToOrderView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def check_rate_limit(self, request):
-        """Check rate limiting for order operations."""
-        client_id = f"order_{request.user.id}"
-        cache_key = f"order_rate_limit_{client_id}"
-        current_requests = cache.get(cache_key, 0)
-        
-        if current_requests >= 5:  # 5 requests per 10 seconds
-            return False
-        
-        cache.set(cache_key, current_requests + 1, 10)  # 10 seconds
-        return True
+        """Check rate limiting for order operations (5 requests per 10 seconds)."""
+        return RateLimiter.check_request(request, 'order').allowed
     
     def check_duplicate_pending(self, user, product_type, product_id, booking_date):
         """Check for duplicate pending orders."""
@@ -561,26 +554,9 @@ class OrderReceiptView(APIView):
                 user=request.user
             )
             
-            # Generate PDF receipt
-            from .pdf_service import pdf_generator
-            
-            # Add detailed error logging
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            try:
-                pdf_data = pdf_generator.generate_receipt(order)
-                logger.info(f"PDF generated successfully for order {order_number}")
-            except Exception as pdf_error:
-                logger.error(f"PDF generation failed for order {order_number}: {str(pdf_error)}")
-                raise pdf_error
-            
-            # Create HTTP response with PDF
-            response = HttpResponse(pdf_data, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="receipt-{order.order_number}.pdf"'
-            response['Content-Length'] = len(pdf_data)
-            
-            return response
+            from .pdf_cache import OrderPDFCache
+
+            return OrderPDFCache.response(request, order, 'receipt')
             
         except Exception as e:
             import logging
@@ -685,13 +661,9 @@ class OrderInvoiceView(APIView):
                 user=request.user
             )
 
-            from .pdf_service import pdf_generator
+            from .pdf_cache import OrderPDFCache
 
-            pdf_data = pdf_generator.generate_invoice(order)
-            response = HttpResponse(pdf_data, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="invoice-{order.order_number}.pdf"'
-            response['Content-Length'] = len(pdf_data)
-            return response
+            return OrderPDFCache.response(request, order, 'invoice')
         except Exception as e:
             return Response(
                 {'error': f'Failed to generate invoice: {str(e)}'},
@@ -0,0 +1,36 @@
+"""
+Cache configuration for Peykan settings.
+Builds settings.CACHES from named cache namespaces, each with its own default
+TTL and key prefix, on django-redis or (development and tests) locmem.
+"""
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+REDIS_BACKEND = 'django_redis.cache.RedisCache'
+
+
+def build_caches(namespaces, backend='locmem', redis_url=None, key_prefix='peykan', redis_options=None):
+    """
+    Return a CACHES dict with one alias per namespace.
+    namespaces maps alias -> (default timeout in seconds, key prefix).
+    """
+    caches = {}
+    for alias, (timeout, prefix) in namespaces.items():
+        if backend == 'redis':
+            caches[alias] = {
+                'BACKEND': REDIS_BACKEND,
+                'LOCATION': redis_url,
+                'OPTIONS': {
+                    'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                    **(redis_options or {}),
+                },
+                'KEY_PREFIX': f"{key_prefix}:{prefix}",
+                'TIMEOUT': timeout,
+            }
+        else:
+            caches[alias] = {
+                'BACKEND': LOCMEM_BACKEND,
+                'LOCATION': f"{key_prefix}-{alias}",
+                'KEY_PREFIX': prefix,
+                'TIMEOUT': timeout,
+            }
+    return caches
@@ -21,13 +21,21 @@ app.conf.beat_schedule = {
         'schedule': 300.0,  # Every 5 minutes
     },
     'cleanup-expired-carts': {
-        'task': 'cart.tasks.cleanup_expired_carts',
+        'task': 'cart.cleanup_expired_carts',
         'schedule': 600.0,  # Every 10 minutes
     },
     'update-capacity-cache': {
         'task': 'events.tasks.update_capacity_cache',
         'schedule': 1800.0,  # Every 30 minutes
     },
+    'clear-expired-sessions': {
+        'task': 'users.clear_expired_sessions',
+        'schedule': 3600.0,  # Every hour
+    },
+    'dispatch-order-notifications': {
+        'task': 'orders.dispatch_order_notifications',
+        'schedule': 60.0,  # Every minute, for retries and missed dispatches
+    },
 }
 
 # Celery Configuration
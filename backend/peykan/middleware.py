@@ -2,6 +2,8 @@
 Custom middleware for Peykan Tourism Platform.
 """
 
+import time
+
 from django.utils import translation
 from django.conf import settings
 
@@ -43,3 +45,39 @@ class LanguageMiddleware:
         response = self.get_response(request)
         
         return response
+
+
+class SessionRefreshMiddleware:
+    """
+    Renews session expiry lazily instead of saving the session on every request.
+    An unchanged session is saved again only once less than
+    SESSION_REFRESH_THRESHOLD seconds of its lifetime remain.
+    Must be placed after SessionMiddleware.
+    """
+    
+    # Session key holding the time the session was last saved
+    REFRESHED_AT_SESSION_KEY = '_refreshed_at'
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        session = getattr(request, 'session', None)
+        # Sessions the request did not touch are not loaded just to refresh them,
+        # and empty ones are not created
+        if session is None or not session.accessed or session.is_empty():
+            return response
+        
+        now = int(time.time())
+        refreshed_at = session.get(self.REFRESHED_AT_SESSION_KEY)
+        threshold = getattr(settings, 'SESSION_REFRESH_THRESHOLD', settings.SESSION_COOKIE_AGE // 2)
+        if (
+            session.modified
+            or refreshed_at is None
+            or refreshed_at + session.get_expiry_age() - now < threshold
+        ):
+            session[self.REFRESHED_AT_SESSION_KEY] = now
+        
+        return response
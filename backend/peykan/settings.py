@@ -9,6 +9,8 @@ import dj_database_url
 from dotenv import load_dotenv
 import logging.config
 
+from .cache_config import build_caches
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(dotenv_path=BASE_DIR / '.env')
@@ -74,6 +76,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'peykan.middleware.SessionRefreshMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'peykan.middleware.LanguageMiddleware',  # Custom language middleware
     'django.middleware.common.CommonMiddleware',
@@ -205,6 +208,15 @@ STATICFILES_DIRS = [
 MEDIA_URL = config('MEDIA_URL', default='/media/')
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Order receipts and invoices contain customer details, so they are kept in a
+# private storage outside MEDIA_ROOT (a STORAGES-style backend and options)
+ORDER_PDF_STORAGE = {
+    'BACKEND': config('ORDER_PDF_STORAGE_BACKEND', default='django.core.files.storage.FileSystemStorage'),
+    'OPTIONS': {
+        'location': config('ORDER_PDF_STORAGE_ROOT', default=str(BASE_DIR / 'private_media')),
+    },
+}
+
 # Image processing settings
 IMAGE_MAX_SIZE = (1920, 1080)  # Maximum image dimensions
 IMAGE_QUALITY = 85  # JPEG quality for optimization
@@ -357,14 +369,41 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
-# Redis Cache Settings
-# Use local memory cache in development to avoid DB cache table requirement
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'local-cache',
-    }
+# Cache Settings
+# Named caches: alias -> (default TTL in seconds, key prefix). CACHE_BACKEND 'redis' puts
+# them on django-redis at CACHE_REDIS_URL, shared with Celery workers; 'locmem' (the
+# development and test default) keeps them per process.
+CACHE_NAMESPACES = {
+    'default': (300, ''),
+    'hot': (600, 'hot'),
+    'rate_limit': (3600, 'rl'),
+    'pricing': (300, 'pricing'),
+    'sessions': (86400, 'session'),
 }
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default=config('REDIS_URL', default='redis://localhost:6379/1'))
+CACHE_KEY_PREFIX = config('CACHE_KEY_PREFIX', default='peykan')
+CACHES = build_caches(CACHE_NAMESPACES, CACHE_BACKEND, CACHE_REDIS_URL, CACHE_KEY_PREFIX)
+
+# Seconds a worker serves its SystemSettings snapshot before re-checking the shared version stamp
+SYSTEM_SETTINGS_CHECK_INTERVAL = config('SYSTEM_SETTINGS_CHECK_INTERVAL', default=5, cast=int)
+
+# User activity logging: buffered activities are bulk-written by a background thread
+# every USER_ACTIVITY_FLUSH_INTERVAL seconds or once USER_ACTIVITY_BUFFER_SIZE are queued.
+# Set USER_ACTIVITY_BUFFERING=False to write activities synchronously (peykan.settings_test does).
+USER_ACTIVITY_BUFFERING = config('USER_ACTIVITY_BUFFERING', default=True, cast=bool)
+USER_ACTIVITY_BUFFER_SIZE = config('USER_ACTIVITY_BUFFER_SIZE', default=200, cast=int)
+USER_ACTIVITY_FLUSH_INTERVAL = config('USER_ACTIVITY_FLUSH_INTERVAL', default=2, cast=int)
+
+# Rate limiter counters: 'cache' uses the default cache, 'redis' runs atomic Lua scripts on Redis
+RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='cache')
+RATE_LIMIT_REDIS_URL = config('RATE_LIMIT_REDIS_URL', default=config('REDIS_URL', default='redis://localhost:6379/3'))
+
+# Seat hold engine: 'local' keeps holds in process memory, 'redis' shares them across workers
+SEAT_HOLD_BACKEND = config('SEAT_HOLD_BACKEND', default='local')
+SEAT_HOLD_REDIS_URL = config('SEAT_HOLD_REDIS_URL', default=config('REDIS_URL', default='redis://localhost:6379/2'))
+SEAT_HOLD_TTL_SECONDS = config('SEAT_HOLD_TTL_SECONDS', default=600, cast=int)
+SEAT_HOLD_CONFIRM_TTL_SECONDS = config('SEAT_HOLD_CONFIRM_TTL_SECONDS', default=3600, cast=int)
 
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/1')
@@ -380,6 +419,16 @@ CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+# Fail fast when queuing tasks from requests while the broker is down
+CELERY_BROKER_CONNECTION_TIMEOUT = config('CELERY_BROKER_CONNECTION_TIMEOUT', default=1, cast=float)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'socket_connect_timeout': CELERY_BROKER_CONNECTION_TIMEOUT,
+    # One quick reconnect attempt before a publish gives up
+    'max_retries': 1,
+    'interval_start': 0,
+    'interval_step': 0.2,
+    'interval_max': 0.2,
+}
 
 # Celery Beat Schedule
 CELERY_BEAT_SCHEDULE = {
@@ -388,22 +437,43 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': 300.0,  # Every 5 minutes
     },
     'cleanup-expired-carts': {
-        'task': 'cart.tasks.cleanup_expired_carts',
+        'task': 'cart.cleanup_expired_carts',
         'schedule': 600.0,  # Every 10 minutes
     },
     'update-capacity-cache': {
         'task': 'events.tasks.update_capacity_cache',
         'schedule': 1800.0,  # Every 30 minutes
     },
+    'clear-expired-sessions': {
+        'task': 'users.clear_expired_sessions',
+        'schedule': 3600.0,  # Every hour
+    },
+    'dispatch-order-notifications': {
+        'task': 'orders.dispatch_order_notifications',
+        'schedule': 60.0,  # Every minute, for retries and missed dispatches
+    },
 }
 
 # Session Settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# SESSION_BACKEND: 'cached_db' (cache reads, database writes), 'redis' (cache only,
+# on SESSION_CACHE_ALIAS) or 'db'. Signed-cookie sessions are not offered: guest carts
+# are keyed by the session key, which signed cookies change on every write.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'redis': 'django.contrib.sessions.backends.cache',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='cached_db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = config('SESSION_CACHE_ALIAS', default='sessions')
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
-SESSION_SAVE_EVERY_REQUEST = True
+# Expiry is renewed by SessionRefreshMiddleware once less than
+# SESSION_REFRESH_THRESHOLD seconds remain, instead of saving on every request
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_THRESHOLD = config('SESSION_REFRESH_THRESHOLD', default=SESSION_COOKIE_AGE // 2, cast=int)
 
 # Email Settings
 if DEBUG:
@@ -8,6 +8,7 @@ from decouple import config
 import dj_database_url
 from datetime import timedelta
 from .settings import *
+from .cache_config import build_caches
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -54,32 +55,41 @@ DATABASES = {
 }
 
 # Redis Cache Settings for Production - SECURE
-CACHES = {
-    'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': config('REDIS_URL', default='redis://localhost:6379/1'),
-        'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-            'CONNECTION_POOL_KWARGS': {
-                'max_connections': 50,
-                'retry_on_timeout': True,
-            },
-            'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
-            'IGNORE_EXCEPTIONS': True,
+# Every named cache (see CACHE_NAMESPACES) is shared through django-redis
+CACHE_BACKEND = config('CACHE_BACKEND', default='redis')
+CACHE_KEY_PREFIX = config('CACHE_KEY_PREFIX', default='peykan_secure_')
+CACHE_NAMESPACES = {
+    **CACHE_NAMESPACES,
+    'default': (config('CACHE_TIMEOUT', default=300, cast=int), ''),
+}
+CACHES = build_caches(
+    CACHE_NAMESPACES, CACHE_BACKEND, CACHE_REDIS_URL, CACHE_KEY_PREFIX,
+    redis_options={
+        'CONNECTION_POOL_KWARGS': {
+            'max_connections': 50,
+            'retry_on_timeout': True,
         },
-        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='peykan_secure_'),
-        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
+        'IGNORE_EXCEPTIONS': True,
     }
-}
+)
+
+# Rate limiter counters run as one atomic Lua call per check
+RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='redis')
+
+# Seat holds are shared by every worker
+SEAT_HOLD_BACKEND = config('SEAT_HOLD_BACKEND', default='redis')
 
 # Session Settings for Production - SECURE
-SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+SESSION_BACKEND = config('SESSION_BACKEND', default='redis')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = config('SESSION_CACHE_ALIAS', default='sessions')
 SESSION_COOKIE_AGE = config('SESSION_COOKIE_AGE', default=86400, cast=int)  # 24 hours
 SESSION_COOKIE_SECURE = config('SESSION_COOKIE_SECURE', default=True, cast=bool)
 SESSION_COOKIE_HTTPONLY = config('SESSION_COOKIE_HTTPONLY', default=True, cast=bool)
 SESSION_COOKIE_SAMESITE = config('SESSION_COOKIE_SAMESITE', default='Strict')
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_THRESHOLD = config('SESSION_REFRESH_THRESHOLD', default=SESSION_COOKIE_AGE // 2, cast=int)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
 # Security Headers
@@ -238,12 +248,8 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ),
+    # Rates are declared in core.rate_limit (scope 'api': 100/hour anon, 1000/hour user)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.rate_limit.RateLimitThrottle',
     ],
-    'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',
-        'user': '1000/hour'
-    }
 } 
\ No newline at end of file
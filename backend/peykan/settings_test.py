@@ -0,0 +1,11 @@
+"""
+Test settings for Peykan Tourism Ecommerce Platform.
+
+Used by pytest (see pytest.ini); run Django's runner with
+`python manage.py test --settings=peykan.settings_test`.
+"""
+
+from .settings import *
+
+# Write user activities synchronously so no background thread touches the test database
+USER_ACTIVITY_BUFFERING = False
@@ -6,6 +6,7 @@ import requests
 from decimal import Decimal
 from django.conf import settings
 from django.core.cache import cache
+from core.cache import hot_cache
 from django.utils.translation import get_language
 from typing import Dict, Optional, Any
 import random
@@ -31,12 +32,12 @@ class CurrencyConverterService:
         Get exchange rates from cache or API.
         """
         cache_key = 'exchange_rates'
-        rates = cache.get(cache_key)
+        rates = hot_cache.get(cache_key)
         
         if rates is None:
             rates = cls._fetch_exchange_rates()
             if rates:
-                cache.set(cache_key, rates, cls.CACHE_TIMEOUT)
+                hot_cache.set(cache_key, rates, cls.CACHE_TIMEOUT)
         
         return rates or {}
     
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class ToursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tours'
-    verbose_name = 'Tours' 
\ No newline at end of file
+    verbose_name = 'Tours'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import tours.signals
@@ -47,13 +47,13 @@ class Command(BaseCommand):
                 cart_bookings = CartItem.objects.filter(
                     product_type='tour',
                     product_id=tour.id,
-                    booking_data__schedule_id=str(schedule.id)
+                    schedule_id=schedule.id
                 ).aggregate(total=Sum('quantity'))['total'] or 0
                 
                 order_bookings = OrderItem.objects.filter(
                     product_type='tour',
                     product_id=tour.id,
-                    booking_data__schedule_id=str(schedule.id),
+                    schedule_id=schedule.id,
                     order__status__in=['confirmed', 'paid', 'completed']
                 ).aggregate(total=Sum('quantity'))['total'] or 0
                 
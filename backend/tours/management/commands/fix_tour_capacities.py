@@ -3,6 +3,7 @@ Management command to fix tour capacity calculations.
 """
 
 from django.core.management.base import BaseCommand
+from django.db.models import F, Sum
 from tours.models import Tour, TourSchedule
 from orders.models import OrderItem
 
@@ -40,26 +41,18 @@ class Command(BaseCommand):
             for schedule in schedules:
                 self.stdout.write(f'  Processing schedule: {schedule.start_date}')
                 
-                # Get confirmed orders for this schedule
-                confirmed_items = OrderItem.objects.filter(
-                    product_type='tour',
-                    product_id=tour.id,
-                    booking_data__schedule_id=str(schedule.id),
-                    order__status__in=['confirmed', 'paid', 'completed']
-                )
-                
-                # Calculate participants per variant
-                variant_participants = {}
-                for item in confirmed_items:
-                    variant_id = str(item.variant_id)
-                    participants = item.booking_data.get('participants', {}) or {}
-                    adult_count = int(participants.get('adult', 0))
-                    child_count = int(participants.get('child', 0))
-                    total_participants = adult_count + child_count
-                    
-                    if variant_id not in variant_participants:
-                        variant_participants[variant_id] = 0
-                    variant_participants[variant_id] += total_participants
+                # Participants (adults + children) of confirmed orders per variant
+                variant_participants = {
+                    str(row['variant_id']): row['total'] or 0
+                    for row in OrderItem.objects.filter(
+                        product_type='tour',
+                        product_id=tour.id,
+                        schedule_id=schedule.id,
+                        order__status__in=['confirmed', 'paid', 'completed']
+                    ).values('variant_id').annotate(
+                        total=Sum(F('adult_count') + F('child_count'))
+                    ).order_by()
+                }
                 
                 # Update variant_capacities_raw
                 capacities = schedule.variant_capacities_raw or {}
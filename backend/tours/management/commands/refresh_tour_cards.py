@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tours.services import TourCardService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed tour cards used by tour listings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour',
+            action='append',
+            dest='tours',
+            help='Tour UUID to refresh (repeatable). Refreshes all when omitted.'
+        )
+
+    def handle(self, *args, **options):
+        refreshed = TourCardService.refresh_many(options.get('tours'))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} tour cards"))
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourCard',
+            fields=[
+                ('tour', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='tours.tour', verbose_name='Tour')),
+                ('starting_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Starting price')),
+                ('next_schedule_date', models.DateField(blank=True, null=True, verbose_name='Next schedule date')),
+                ('next_schedule_capacity_total', models.PositiveIntegerField(default=0, verbose_name='Next schedule total capacity')),
+                ('next_schedule_capacity_available', models.PositiveIntegerField(default=0, verbose_name='Next schedule available capacity')),
+                ('variants', models.JSONField(blank=True, default=list, verbose_name='Variants')),
+                ('schedules', models.JSONField(blank=True, default=list, verbose_name='Upcoming schedules')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='Refreshed at')),
+            ],
+            options={
+                'verbose_name': 'Tour Card',
+                'verbose_name_plural': 'Tour Cards',
+            },
+        ),
+    ]
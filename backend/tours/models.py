@@ -2224,3 +2224,53 @@ class ReviewResponse(BaseModel):
     def can_be_deleted_by(self, user):
         """Check if user can delete this response."""
         return user == self.responder or user.is_staff 
+
+
+class TourCard(models.Model):
+    """
+    Precomputed listing data for a tour, read by TourListSerializer.
+    Maintained by tours.services.TourCardService whenever schedules, variants,
+    capacities or confirmed orders of the tour change.
+    """
+
+    tour = models.OneToOneField(
+        Tour,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card',
+        verbose_name=_('Tour')
+    )
+    starting_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name=_('Starting price')
+    )
+    next_schedule_date = models.DateField(null=True, blank=True, verbose_name=_('Next schedule date'))
+    next_schedule_capacity_total = models.PositiveIntegerField(
+        default=0, verbose_name=_('Next schedule total capacity')
+    )
+    next_schedule_capacity_available = models.PositiveIntegerField(
+        default=0, verbose_name=_('Next schedule available capacity')
+    )
+    variants = models.JSONField(default=list, blank=True, verbose_name=_('Variants'))
+    schedules = models.JSONField(default=list, blank=True, verbose_name=_('Upcoming schedules'))
+    refreshed_at = models.DateTimeField(auto_now=True, verbose_name=_('Refreshed at'))
+
+    class Meta:
+        verbose_name = _('Tour Card')
+        verbose_name_plural = _('Tour Cards')
+
+    def __str__(self):
+        return f"Card for {self.tour_id}"
+
+    @property
+    def has_upcoming(self):
+        return self.next_schedule_date is not None
+
+    def is_stale(self, today=None):
+        """A card goes stale once its next schedule date has passed."""
+        from django.utils import timezone
+        today = today or timezone.now().date()
+        return self.next_schedule_date is not None and self.next_schedule_date < today
@@ -374,81 +374,28 @@ class TourListSerializer(serializers.ModelSerializer, ImageFieldSerializerMixin)
         """Get translated short description."""
         return obj.short_description if hasattr(obj, 'short_description') else ''
 
-    def get_starting_price(self, obj):
-        try:
-            active_variants = obj.variants.filter(is_active=True)
-            if active_variants.exists():
-                min_price = min([v.base_price for v in active_variants if v.base_price is not None])
-                return float(min_price)
-        except Exception:
-            pass
-        # Fallback to tour.price
-        try:
-            return float(obj.price)
-        except Exception:
-            return None
+    def _card(self, obj):
+        """Precomputed listing data; see TourCardService."""
+        from .services import TourCardService
+        return TourCardService.get_card(obj)
 
-    def _get_next_schedule(self, obj):
-        try:
-            from django.utils import timezone
-            from cart.models import CartItem
-            from orders.models import OrderItem
-            from django.db.models import Sum
-            
-            today = timezone.now().date()
-            qs = obj.schedules.filter(start_date__gte=today, is_available=True).order_by('start_date')
-            for sched in qs:
-                try:
-                    # Calculate real-time capacity
-                    total_capacity = sched.compute_total_capacity()
-                    
-                    # Count ONLY confirmed order bookings (exclude cart items and pending orders)
-                    # Cart items should NOT reduce available capacity until they become confirmed orders
-                    confirmed_items = OrderItem.objects.filter(
-                        product_type='tour',
-                        product_id=obj.id,
-                        booking_date=sched.start_date,
-                        order__status__in=['confirmed', 'paid', 'completed']
-                    )
-                    
-                    total_participants = 0
-                    for item in confirmed_items:
-                        booking_data = item.booking_data or {}
-                        participants = booking_data.get('participants', {}) or {}
-                        adult_count = int(participants.get('adult', 0))
-                        child_count = int(participants.get('child', 0))
-                        total_participants += adult_count + child_count
-                    
-                    available = max(0, total_capacity - total_participants)
-                    
-                    # Return the first upcoming schedule, even if available == 0 (UI will show Sold out correctly)
-                    return sched, total_capacity, available
-                except Exception:
-                    continue
-        except Exception:
-            pass
-        return None, 0, 0
+    def get_starting_price(self, obj):
+        price = self._card(obj).starting_price
+        return float(price) if price is not None else None
 
     def get_next_schedule_date(self, obj):
-        sched, _, _ = self._get_next_schedule(obj)
-        try:
-            return sched.start_date.isoformat() if sched else None
-        except Exception:
-            return None
+        next_date = self._card(obj).next_schedule_date
+        return next_date.isoformat() if next_date else None
 
     def get_next_schedule_capacity_total(self, obj):
-        sched, total, available = self._get_next_schedule(obj)
-        # Return total if there is any upcoming schedule (even if available==0), else 0
-        return int(total) if sched else 0
+        return self._card(obj).next_schedule_capacity_total
 
     def get_next_schedule_capacity_available(self, obj):
-        sched, total, available = self._get_next_schedule(obj)
-        return int(available) if sched else 0
+        return self._card(obj).next_schedule_capacity_available
 
     def get_has_upcoming(self, obj):
-        sched, _, available = self._get_next_schedule(obj)
-        # Has upcoming means there exists a schedule in future; 'available' guides Sold out label
-        return bool(sched is not None)
+        # Has upcoming means there exists a schedule in future; capacity guides Sold out label
+        return self._card(obj).has_upcoming
 
     def get_category_slug(self, obj):
         try:
@@ -468,46 +415,11 @@ class TourListSerializer(serializers.ModelSerializer, ImageFieldSerializerMixin)
     
     def get_variants(self, obj):
         """Get active variants."""
-        try:
-            active_variants = obj.variants.filter(is_active=True)
-            return [
-                {
-                    'id': str(variant.id),
-                    'name': variant.name,
-                    'description': variant.description,
-                    'base_price': float(variant.base_price),
-                    'capacity': variant.capacity,
-                    'is_active': variant.is_active
-                }
-                for variant in active_variants
-            ]
-        except Exception:
-            return []
-    
+        return self._card(obj).variants
+
     def get_schedules(self, obj):
         """Get upcoming schedules."""
-        try:
-            from datetime import date
-            today = date.today()
-            upcoming_schedules = obj.schedules.filter(
-                start_date__gte=today,
-                is_available=True
-            ).order_by('start_date')[:5]  # Limit to 5 upcoming schedules
-            
-            return [
-                {
-                    'id': str(schedule.id),
-                    'start_date': schedule.start_date.isoformat(),
-                    'end_date': schedule.end_date.isoformat() if schedule.end_date else None,
-                    'start_time': schedule.start_time.isoformat() if schedule.start_time else None,
-                    'end_time': schedule.end_time.isoformat() if schedule.end_time else None,
-                    'is_available': schedule.is_available,
-                    'day_of_week': schedule.day_of_week
-                }
-                for schedule in upcoming_schedules
-            ]
-        except Exception:
-            return []
+        return self._card(obj).schedules
 
 
 class TourDetailSerializer(serializers.ModelSerializer, ImageFieldSerializerMixin):
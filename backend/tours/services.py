@@ -2,11 +2,22 @@
 Tour capacity management service for atomic operations and business logic.
 """
 
+import logging
 from django.db import transaction
 from django.core.exceptions import ValidationError
-from typing import Optional, Tuple
+from django.utils import timezone
+from collections import namedtuple
+from typing import Dict, Optional, Tuple
 from decimal import Decimal
-from .models import TourSchedule, TourVariant, TourPricing, TourScheduleVariantCapacity
+from .models import Tour, TourCard, TourSchedule, TourVariant, TourPricing, TourScheduleVariantCapacity
+
+logger = logging.getLogger(__name__)
+
+# One capacity change of TourCapacityService.apply_capacity_transitions; key
+# identifies the change in the results (e.g. the order item id)
+CapacityTransition = namedtuple(
+    'CapacityTransition', ['key', 'schedule_id', 'variant_id', 'quantity', 'action']
+)
 
 
 class TourCapacityService:
@@ -471,6 +482,147 @@ class TourCapacityService:
         except Exception as e:
             return False, f"Capacity cancellation failed: {str(e)}"
 
+    @staticmethod
+    def apply_capacity_transitions(transitions) -> Dict[object, Tuple[bool, str]]:
+        """
+        Apply many capacity transitions in one transaction. Each transition is
+        a CapacityTransition whose action is 'confirm', 'reserve' or 'release',
+        with the same effect as confirm_capacity, reserve_capacity and
+        release_capacity. Schedules and then variant capacities are locked in
+        primary key order, deltas are applied in memory and written with one
+        bulk UPDATE per table. Returns {transition.key: (success, error)}.
+        """
+        results = {}
+        pending = []
+        for transition in transitions:
+            if transition.quantity <= 0:
+                results[transition.key] = (True, "")
+            else:
+                pending.append(transition)
+        if not pending:
+            return results
+
+        with transaction.atomic():
+            schedules = {
+                str(schedule.pk): schedule
+                for schedule in TourSchedule.objects.select_for_update().filter(
+                    pk__in={t.schedule_id for t in pending}
+                ).order_by('pk')
+            }
+            capacities = {
+                (str(capacity.schedule_id), str(capacity.variant_id)): capacity
+                for capacity in TourScheduleVariantCapacity.objects.select_for_update().filter(
+                    schedule_id__in=schedules.keys(),
+                    variant_id__in={t.variant_id for t in pending}
+                ).order_by('pk')
+            }
+            variants = {
+                str(variant_id): (tour_id, capacity)
+                for variant_id, tour_id, capacity in TourVariant.objects.filter(
+                    id__in={t.variant_id for t in pending}
+                ).values_list('id', 'tour_id', 'capacity')
+            }
+
+            changed_schedules = {}
+            changed_capacities = {}
+            new_capacities = {}
+            for transition in pending:
+                schedule = schedules.get(str(transition.schedule_id))
+                if schedule is None:
+                    results[transition.key] = (False, "Schedule not found")
+                    continue
+                apply = getattr(TourCapacityService, f'_apply_{transition.action}')
+                results[transition.key] = apply(
+                    schedule, str(transition.variant_id), transition.quantity,
+                    capacities, variants, new_capacities
+                )
+                if results[transition.key][0]:
+                    changed_schedules[schedule.pk] = schedule
+                    capacity = capacities.get((str(schedule.pk), str(transition.variant_id)))
+                    if capacity is not None and capacity.pk not in new_capacities:
+                        changed_capacities[capacity.pk] = capacity
+
+            if changed_schedules:
+                TourSchedule.objects.bulk_update(
+                    changed_schedules.values(),
+                    ['variant_capacities_raw', 'total_reserved_capacity', 'total_confirmed_capacity']
+                )
+            if changed_capacities:
+                TourScheduleVariantCapacity.objects.bulk_update(
+                    changed_capacities.values(), ['reserved_capacity', 'confirmed_capacity']
+                )
+            if new_capacities:
+                TourScheduleVariantCapacity.objects.bulk_create(new_capacities.values())
+
+            # bulk writes skip the signals that keep tour cards current
+            TourCardService.schedule_refresh({s.tour_id for s in changed_schedules.values()})
+
+        return results
+
+    @staticmethod
+    def _apply_confirm(schedule, variant_id, quantity, capacities, variants, new_capacities):
+        """Move reserved to confirmed capacity, as confirm_capacity_atomic does."""
+        capacity = capacities.get((str(schedule.pk), variant_id))
+        if capacity is None:
+            tour_id, total_capacity = variants.get(variant_id, (None, None))
+            if tour_id != schedule.tour_id:
+                return False, f"Failed to confirm capacity for variant {variant_id}"
+            capacity = TourScheduleVariantCapacity(
+                schedule=schedule, variant_id=variant_id, total_capacity=total_capacity,
+                reserved_capacity=0, confirmed_capacity=quantity, is_available=True
+            )
+            capacities[(str(schedule.pk), variant_id)] = capacity
+            new_capacities[capacity.pk] = capacity
+            schedule.total_confirmed_capacity = (schedule.total_confirmed_capacity or 0) + quantity
+            return True, ""
+
+        reserved = capacity.reserved_capacity or 0
+        if reserved >= quantity:
+            capacity.reserved_capacity = reserved - quantity
+        # Without enough reserved capacity it is confirmed directly
+        capacity.confirmed_capacity = (capacity.confirmed_capacity or 0) + quantity
+        schedule.total_reserved_capacity = max(0, (schedule.total_reserved_capacity or 0) - quantity)
+        schedule.total_confirmed_capacity = (schedule.total_confirmed_capacity or 0) + quantity
+        return True, ""
+
+    @staticmethod
+    def _apply_reserve(schedule, variant_id, quantity, capacities, variants, new_capacities):
+        """Book variant capacity on the schedule, as reserve_capacity_atomic does."""
+        raw = {str(k): v for k, v in (schedule.variant_capacities_raw or {}).items()}
+        if variant_id not in raw:
+            tour_id, total_capacity = variants.get(variant_id, (None, None))
+            if tour_id != schedule.tour_id:
+                return False, f"Insufficient capacity for variant {variant_id}"
+            raw[variant_id] = {'total': total_capacity, 'booked': 0, 'available': total_capacity}
+
+        if raw[variant_id].get('available', 0) < quantity:
+            return False, f"Insufficient capacity for variant {variant_id}"
+        entry = dict(raw[variant_id])
+        entry['booked'] = entry.get('booked', 0) + quantity
+        entry['available'] = entry['total'] - entry['booked']
+        raw[variant_id] = entry
+        schedule.variant_capacities_raw = raw
+        schedule.total_reserved_capacity += quantity
+        return True, ""
+
+    @staticmethod
+    def _apply_release(schedule, variant_id, quantity, capacities, variants, new_capacities):
+        """Release booked variant capacity, as release_capacity does."""
+        raw = {str(k): v for k, v in (schedule.variant_capacities_raw or {}).items()}
+        if variant_id not in raw:
+            return False, "Variant capacity not found"
+
+        booked = raw[variant_id].get('booked', 0)
+        if booked < quantity:
+            return False, f"Cannot release more than booked. Booked: {booked}, Requested: {quantity}"
+        entry = dict(raw[variant_id])
+        entry['booked'] = booked - quantity
+        entry['available'] = entry['total'] - entry['booked']
+        raw[variant_id] = entry
+        schedule.variant_capacities_raw = raw
+        schedule.total_reserved_capacity = max(0, schedule.total_reserved_capacity - quantity)
+        return True, ""
+
     @staticmethod
     def get_available_capacity(schedule_id: str, variant_id: str = None) -> int:
         """
@@ -505,6 +657,30 @@ class TourCapacityService:
         except Exception:
             return 0
 
+    @staticmethod
+    def confirmed_participants(tour_id, schedule_id=None, variant_id=None, booking_date=None) -> int:
+        """
+        Adults and children booked in confirmed orders of a tour, optionally
+        narrowed to a schedule, variant or booking date. One indexed SUM.
+        """
+        from django.db.models import F, Sum
+        from orders.models import OrderItem
+
+        items = OrderItem.objects.filter(
+            product_type='tour',
+            product_id=tour_id,
+            order__status__in=['confirmed', 'paid', 'completed']
+        )
+        if schedule_id is not None:
+            items = items.filter(schedule_id=schedule_id)
+        if variant_id is not None:
+            items = items.filter(variant_id=variant_id)
+        if booking_date is not None:
+            items = items.filter(booking_date=booking_date)
+
+        total = items.aggregate(total=Sum(F('adult_count') + F('child_count')))['total']
+        return int(total or 0)
+
     @staticmethod
     def _calculate_variant_available_capacity(schedule: 'TourSchedule', variant_key: str) -> int:
         """Calculate available capacity for a variant using unified method."""
@@ -515,28 +691,11 @@ class TourCapacityService:
             total_capacity = variant_data.get('total', 0)
             booked_capacity = variant_data.get('booked', 0)
             
-            # Calculate real-time availability from cart and orders
-            from cart.models import CartItem
-            from orders.models import OrderItem
-            from django.db.models import Sum
-            
             # Calculate participants from confirmed orders (adults + children only)
-            confirmed_items = OrderItem.objects.filter(
-                product_type='tour',
-                product_id=schedule.tour.id,
-                variant_id=variant_key,
-                booking_data__schedule_id=str(schedule.id),
-                order__status__in=['confirmed', 'paid', 'completed']
+            total_participants = TourCapacityService.confirmed_participants(
+                schedule.tour_id, schedule_id=schedule.id, variant_id=variant_key
             )
             
-            total_participants = 0
-            for item in confirmed_items:
-                booking_data = item.booking_data or {}
-                participants = booking_data.get('participants', {}) or {}
-                adult_count = int(participants.get('adult', 0))
-                child_count = int(participants.get('child', 0))
-                total_participants += adult_count + child_count
-            
             available = max(0, total_capacity - total_participants)
             
             return available
@@ -621,3 +780,115 @@ class TourPricingService:
             'breakdown': breakdown,
             'currency': tour.currency
         }
+
+
+class TourCardService:
+    """Service for maintaining the precomputed tour cards used by tour listings."""
+
+    # Number of upcoming schedules shown on a card
+    SCHEDULE_LIMIT = 5
+
+    @staticmethod
+    def build(tour: Tour) -> dict:
+        """Compute the card fields of a tour."""
+        today = timezone.now().date()
+
+        variants = list(tour.variants.filter(is_active=True))
+        prices = [v.base_price for v in variants if v.base_price is not None]
+        starting_price = min(prices) if prices else tour.price
+
+        upcoming = tour.schedules.filter(
+            start_date__gte=today, is_available=True
+        ).order_by('start_date')
+
+        # First upcoming schedule, even if sold out (the UI shows Sold out)
+        next_date, total, available = None, 0, 0
+        for schedule in upcoming:
+            try:
+                total = schedule.compute_total_capacity()
+                booked = TourCapacityService.confirmed_participants(
+                    tour.id, booking_date=schedule.start_date
+                )
+                next_date, available = schedule.start_date, max(0, total - booked)
+                break
+            except Exception:
+                continue
+
+        return {
+            'starting_price': starting_price,
+            'next_schedule_date': next_date,
+            'next_schedule_capacity_total': total if next_date else 0,
+            'next_schedule_capacity_available': available if next_date else 0,
+            'variants': [
+                {
+                    'id': str(variant.id),
+                    'name': variant.name,
+                    'description': variant.description,
+                    'base_price': float(variant.base_price),
+                    'capacity': variant.capacity,
+                    'is_active': variant.is_active
+                }
+                for variant in variants
+            ],
+            'schedules': [
+                {
+                    'id': str(schedule.id),
+                    'start_date': schedule.start_date.isoformat(),
+                    'end_date': schedule.end_date.isoformat() if schedule.end_date else None,
+                    'start_time': schedule.start_time.isoformat() if schedule.start_time else None,
+                    'end_time': schedule.end_time.isoformat() if schedule.end_time else None,
+                    'is_available': schedule.is_available,
+                    'day_of_week': schedule.day_of_week
+                }
+                for schedule in upcoming[:TourCardService.SCHEDULE_LIMIT]
+            ],
+        }
+
+    @staticmethod
+    def refresh(tour: Tour) -> TourCard:
+        """Recompute and store the card of a tour."""
+        card, _ = TourCard.objects.update_or_create(
+            tour=tour, defaults=TourCardService.build(tour)
+        )
+        tour.card = card
+        return card
+
+    @staticmethod
+    def refresh_many(tour_ids=None) -> int:
+        """Refresh the cards of the given tours (all tours if None). Returns the count."""
+        tours = Tour.objects.all()
+        if tour_ids is not None:
+            tours = tours.filter(id__in=list(tour_ids))
+
+        refreshed = 0
+        for tour in tours.iterator():
+            TourCardService.refresh(tour)
+            refreshed += 1
+        return refreshed
+
+    @staticmethod
+    def schedule_refresh(tour_ids) -> None:
+        """Refresh tour cards once the current transaction commits."""
+        tour_ids = {tour_id for tour_id in tour_ids if tour_id}
+        if not tour_ids:
+            return
+
+        def _refresh():
+            try:
+                TourCardService.refresh_many(tour_ids)
+            except Exception as e:
+                # A stale card is refreshed on the next listing read
+                logger.error(f"Failed to refresh tour cards {tour_ids}: {e}")
+
+        transaction.on_commit(_refresh)
+
+    @staticmethod
+    def get_card(tour: Tour) -> TourCard:
+        """Return a fresh card for a tour, building it when missing or stale."""
+        try:
+            card = tour.card
+        except TourCard.DoesNotExist:
+            card = None
+        if card is None or card.is_stale():
+            card = TourCardService.refresh(tour)
+        return card
@@ -0,0 +1,50 @@
+"""
+Django signals for keeping tour cards in sync with the data they summarize.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from orders.models import Order, OrderItem
+from .models import Tour, TourVariant, TourSchedule, TourScheduleVariantCapacity
+from .services import TourCardService
+
+
+@receiver(post_save, sender=Tour)
+def refresh_card_on_tour_save(sender, instance, **kwargs):
+    """Tour price feeds the card's starting price fallback."""
+    TourCardService.schedule_refresh([instance.id])
+
+
+@receiver(post_save, sender=TourVariant)
+@receiver(post_delete, sender=TourVariant)
+@receiver(post_save, sender=TourSchedule)
+@receiver(post_delete, sender=TourSchedule)
+def refresh_card_on_tour_child_change(sender, instance, **kwargs):
+    TourCardService.schedule_refresh([instance.tour_id])
+
+
+@receiver(post_save, sender=TourScheduleVariantCapacity)
+@receiver(post_delete, sender=TourScheduleVariantCapacity)
+def refresh_card_on_capacity_change(sender, instance, **kwargs):
+    tour_id = TourSchedule.objects.filter(
+        pk=instance.schedule_id
+    ).values_list('tour_id', flat=True).first()
+    TourCardService.schedule_refresh([tour_id])
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_card_on_order_item_change(sender, instance, **kwargs):
+    if instance.product_type == 'tour':
+        TourCardService.schedule_refresh([instance.product_id])
+
+
+@receiver(post_save, sender=Order)
+def refresh_card_on_order_status_change(sender, instance, created, **kwargs):
+    """Confirmed orders reduce the available capacity shown on cards."""
+    # _old_status is captured by orders.signals before save
+    if not created and getattr(instance, '_old_status', None) == instance.status:
+        return
+    TourCardService.schedule_refresh(
+        instance.items.filter(product_type='tour').values_list('product_id', flat=True)
+    )
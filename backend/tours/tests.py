@@ -0,0 +1,162 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, OrderService
+from .models import (
+    Tour, TourCategory, TourVariant, TourSchedule, TourScheduleVariantCapacity, TourCard
+)
+from .serializers import TourListSerializer
+from .services import CapacityTransition, TourCapacityService
+
+
+class TourCardTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_tour()
+
+    def _create_tour(self):
+        category = TourCategory.objects.create(slug='historical')
+        self.tour = Tour.objects.create(
+            slug='city-tour', title='City Tour', description='d', short_description='s',
+            category=category, price=Decimal('80.00'), city='Tehran', country='Iran',
+            duration_hours=4, pickup_time=time(8), start_time=time(9), end_time=time(13),
+            max_participants=20
+        )
+        self.variant = TourVariant.objects.create(
+            tour=self.tour, name='Normal', base_price=Decimal('50.00'), capacity=10
+        )
+        self.schedule = TourSchedule.objects.create(
+            tour=self.tour, start_date=timezone.now().date() + timedelta(days=3),
+            start_time=time(9)
+        )
+        TourScheduleVariantCapacity.objects.create(
+            schedule=self.schedule, variant=self.variant, total_capacity=10
+        )
+
+    def _serialize(self):
+        tour = Tour.objects.select_related('card').get(pk=self.tour.pk)
+        return TourListSerializer(tour).data
+
+    def test_card_maintained_by_signals(self):
+        card = TourCard.objects.get(tour=self.tour)
+        self.assertEqual(card.starting_price, Decimal('50.00'))
+        self.assertEqual(card.next_schedule_date, self.schedule.start_date)
+        self.assertEqual(card.next_schedule_capacity_available, 10)
+        self.assertEqual(len(card.schedules), 1)
+
+        user = get_user_model().objects.create_user(username='buyer', password='x')
+        order = Order.objects.create(
+            user=user, status='pending', subtotal=Decimal('150.00'),
+            customer_name='Buyer', customer_email='buyer@example.com'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            item = OrderItem.objects.create(
+                order=order, product_type='tour', product_id=self.tour.id,
+                product_title='City Tour', product_slug='city-tour',
+                booking_date=self.schedule.start_date, booking_time=time(9),
+                quantity=3, unit_price=Decimal('50.00'), total_price=Decimal('150.00'),
+                variant_id=self.variant.id,
+                booking_data={
+                    'schedule_id': str(self.schedule.id),
+                    'participants': {'adult': 2, 'child': 1, 'infant': 1}
+                }
+            )
+        self.assertEqual((item.schedule_id, item.capacity_count, item.infant_count), (self.schedule.id, 3, 1))
+        self.assertEqual(self._serialize()['next_schedule_capacity_available'], 10)
+
+        order.status = 'confirmed'
+        # Confirmation queues notification and PDF tasks; keep them off the broker
+        with mock.patch('orders.tasks.dispatch_order_notifications.apply_async'), \
+                mock.patch('orders.tasks.prerender_order_pdfs.apply_async'), \
+                self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        data = self._serialize()
+        self.assertEqual(data['next_schedule_capacity_available'], 7)
+        self.assertEqual(data['next_schedule_capacity_total'], 10)
+        self.assertTrue(data['has_upcoming'])
+        self.assertEqual(TourCapacityService.confirmed_participants(
+            self.tour.id, schedule_id=self.schedule.id, variant_id=self.variant.id
+        ), 3)
+
+    def test_missing_or_stale_card_rebuilt_on_read(self):
+        TourCard.objects.filter(tour=self.tour).update(
+            next_schedule_date=timezone.now().date() - timedelta(days=1), schedules=[]
+        )
+        data = self._serialize()
+        self.assertEqual(data['next_schedule_date'], self.schedule.start_date.isoformat())
+        self.assertEqual(len(data['schedules']), 1)
+
+        TourCard.objects.filter(tour=self.tour).delete()
+        self.assertEqual(self._serialize()['starting_price'], 50.0)
+
+
+class CapacityTransitionTests(TestCase):
+    def setUp(self):
+        category = TourCategory.objects.create(slug='desert')
+        self.tour = Tour.objects.create(
+            slug='desert-tour', title='Desert Tour', description='d', short_description='s',
+            category=category, price=Decimal('80.00'), city='Yazd', country='Iran',
+            duration_hours=4, pickup_time=time(8), start_time=time(9), end_time=time(13),
+            max_participants=20
+        )
+        self.variant = TourVariant.objects.create(
+            tour=self.tour, name='Normal', base_price=Decimal('50.00'), capacity=10
+        )
+        self.schedule = TourSchedule.objects.create(
+            tour=self.tour, start_date=timezone.now().date() + timedelta(days=3),
+            start_time=time(9)
+        )
+        self.capacity = TourScheduleVariantCapacity.objects.create(
+            schedule=self.schedule, variant=self.variant, total_capacity=10, reserved_capacity=2
+        )
+        self.user = get_user_model().objects.create_user(username='bulk-buyer', password='x')
+
+    def _order(self, participants):
+        order = Order.objects.create(
+            user=self.user, status='pending', subtotal=Decimal('50.00'),
+            customer_name='Buyer', customer_email='buyer@example.com'
+        )
+        OrderItem.objects.create(
+            order=order, product_type='tour', product_id=self.tour.id,
+            product_title='Desert Tour', product_slug='desert-tour',
+            booking_date=self.schedule.start_date, booking_time=time(9),
+            quantity=participants, unit_price=Decimal('50.00'), total_price=Decimal('50.00'),
+            variant_id=self.variant.id,
+            booking_data={'schedule_id': str(self.schedule.id), 'participants': {'adult': participants}}
+        )
+        return order
+
+    def test_orders_are_confirmed_in_one_batch(self):
+        orders = [self._order(2), self._order(3)]
+        with self.assertNumQueries(8):
+            # items, savepoint, locked schedules, locked capacities, variants,
+            # one UPDATE per table, release
+            results = OrderService.update_capacity_for_status_changes(
+                [(order, 'pending', 'confirmed') for order in orders]
+            )
+        self.assertEqual(list(results.values()), [(True, ''), (True, '')])
+
+        self.capacity.refresh_from_db()
+        self.schedule.refresh_from_db()
+        # 2 reserved seats confirmed for the first order, 3 confirmed directly
+        self.assertEqual((self.capacity.reserved_capacity, self.capacity.confirmed_capacity), (0, 5))
+        self.assertEqual(self.schedule.total_confirmed_capacity, 5)
+
+    def test_results_are_per_transition(self):
+        results = TourCapacityService.apply_capacity_transitions([
+            CapacityTransition('reserve', self.schedule.id, str(self.variant.id), 4, 'reserve'),
+            CapacityTransition('too-many', self.schedule.id, str(self.variant.id), 7, 'reserve'),
+            CapacityTransition('release', self.schedule.id, str(self.variant.id), 1, 'release'),
+        ])
+        self.assertEqual(results['reserve'], (True, ''))
+        self.assertFalse(results['too-many'][0])
+        self.assertEqual(results['release'], (True, ''))
+
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.variant_capacities_raw[str(self.variant.id)]['booked'], 3)
+        self.assertEqual(self.schedule.total_reserved_capacity, 3)
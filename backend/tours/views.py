@@ -24,6 +24,7 @@ from .serializers import (
 )
 from .mixins import ReviewManagementMixin
 from .protection import ReviewProtectionManager
+from .services import TourCapacityService
 
 
 @api_view(['GET'])
@@ -41,7 +42,7 @@ def test_tours_view(request):
 @permission_classes([permissions.AllowAny])
 def home_tours_view(request):
     """Get categorized tours for home page display."""
-    tours = Tour.objects.filter(is_active=True).select_related('category')
+    tours = Tour.objects.filter(is_active=True).select_related('category', 'card').prefetch_related('translations', 'category__translations')
 
     # Separate tours by category
     featured_tours = tours.filter(is_featured=True)[:6]
@@ -69,7 +70,9 @@ class TourListView(generics.ListAPIView):
     """List all tours (no search/filter)."""
     serializer_class = TourListSerializer
     permission_classes = [permissions.AllowAny]
-    queryset = Tour.objects.filter(is_active=True)  # Add back is_active filter
+    queryset = Tour.objects.filter(is_active=True).select_related(
+        'category', 'card'
+    ).prefetch_related('translations', 'category__translations')
     pagination_class = None
     filter_backends = []
     search_fields = []
@@ -142,7 +145,9 @@ class TourSearchView(APIView):
         serializer.is_valid(raise_exception=True)
         
         data = serializer.validated_data
-        queryset = Tour.objects.filter(is_active=True).select_related('category')
+        queryset = Tour.objects.filter(is_active=True).select_related(
+            'category', 'card'
+        ).prefetch_related('translations', 'category__translations')
         
         # Apply search filters
         if data.get('query'):
@@ -459,28 +464,10 @@ def tour_schedules_view(request, tour_id):
             variant_capacity = schedule.variant_capacities.get(str(variant.id), {}).get('total', variant.capacity)
             
             # Calculate booked capacity for this variant on this schedule
-            # ONLY include confirmed orders, not pending ones
-            from cart.models import CartItem
-            from orders.models import OrderItem
-            
-            # Count ONLY confirmed orders (exclude pending and cart items)
-            # Pending orders should NOT reduce available capacity until they become confirmed/paid
-            confirmed_items = OrderItem.objects.filter(
-                product_type='tour',
-                product_id=tour.id,
-                variant_id=str(variant.id),
-                booking_data__schedule_id=str(schedule.id),
-                order__status__in=['confirmed', 'paid', 'completed']
+            # ONLY include confirmed orders; pending orders and cart items do not reduce capacity
+            confirmed_participants = TourCapacityService.confirmed_participants(
+                tour.id, schedule_id=schedule.id, variant_id=variant.id
             )
-            
-            # Calculate total participants from confirmed orders (adults + children only)
-            confirmed_participants = 0
-            for item in confirmed_items:
-                booking_data = item.booking_data or {}
-                participants = booking_data.get('participants', {}) or {}
-                adult_count = int(participants.get('adult', 0))
-                child_count = int(participants.get('child', 0))
-                confirmed_participants += adult_count + child_count
 
             # Get booked capacity from variant_capacities_raw
             variant_booked = schedule.variant_capacities.get(str(variant.id), {}).get('booked', 0)
@@ -558,28 +545,10 @@ def check_tour_availability_view(request):
     variant_capacity = schedule.variant_capacities.get(str(variant.id), variant.capacity)
     
     # Calculate current bookings
-    # ONLY include confirmed orders, not pending ones
-    from cart.models import CartItem
-    from orders.models import OrderItem
-    
-    # Count ONLY confirmed orders (exclude pending and cart items)
-    # Pending orders should NOT reduce available capacity until they become confirmed/paid
-    confirmed_items = OrderItem.objects.filter(
-        product_type='tour',
-        product_id=tour.id,
-        variant_id=str(variant.id),
-        booking_data__schedule_id=str(schedule.id),
-        order__status__in=['confirmed', 'paid', 'completed']
+    # ONLY include confirmed orders; pending orders and cart items do not reduce capacity
+    confirmed_participants = TourCapacityService.confirmed_participants(
+        tour.id, schedule_id=schedule.id, variant_id=variant.id
     )
-    
-    # Calculate total participants from confirmed orders (adults + children only)
-    confirmed_participants = 0
-    for item in confirmed_items:
-        booking_data = item.booking_data or {}
-        participants = booking_data.get('participants', {}) or {}
-        adult_count = int(participants.get('adult', 0))
-        child_count = int(participants.get('child', 0))
-        confirmed_participants += adult_count + child_count
 
     # Get booked capacity from variant_capacities_raw
     variant_booked = schedule.variant_capacities.get(str(variant.id), {}).get('booked', 0)
@@ -0,0 +1,103 @@
+"""
+In-process buffer for high-volume user activity logging.
+Activities are queued by request threads and written with bulk_create by a
+background thread, so logging adds no database statement to the request.
+Queued activities are flushed every USER_ACTIVITY_FLUSH_INTERVAL seconds, when
+the buffer holds USER_ACTIVITY_BUFFER_SIZE items, and at process exit.
+Each activity keeps the time it was queued as its created_at.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """
+    Thread-safe buffer of unsaved UserActivity instances with a flush thread.
+    """
+
+    # Hard cap so a database outage cannot grow the buffer without bound
+    MAX_PENDING = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = deque()
+        self._wake = threading.Event()
+        self._worker_pid = None
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'USER_ACTIVITY_BUFFER_SIZE', 200)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'USER_ACTIVITY_FLUSH_INTERVAL', 2)
+
+    def _ensure_worker(self):
+        """Start the flush thread once per process (again after a fork)."""
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        self._worker_pid = pid
+        threading.Thread(target=self._run, name='user-activity-flush', daemon=True).start()
+
+    def add(self, activity):
+        if activity.created_at is None:
+            activity.created_at = timezone.now()
+        with self._lock:
+            self._ensure_worker()
+            if len(self._items) >= self.MAX_PENDING:
+                logger.warning("User activity buffer full; dropping oldest activity")
+                self._items.popleft()
+            self._items.append(activity)
+            full = len(self._items) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write all queued activities. Returns the number written."""
+        from .models import UserActivity
+
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+        if not items:
+            return 0
+
+        # auto_now_add overwrites created_at on insert; restore the event times afterwards
+        event_times = [item.created_at for item in items]
+        try:
+            UserActivity.objects.bulk_create(items, batch_size=self.batch_size)
+            for item, created_at in zip(items, event_times):
+                item.created_at = created_at
+            UserActivity.objects.bulk_update(items, ['created_at'], batch_size=self.batch_size)
+        except Exception as e:
+            logger.error(f"Failed to write {len(items)} user activities: {e}")
+            return 0
+        return len(items)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # The flush thread must not hold a connection between batches
+                connection.close()
+
+    def __len__(self):
+        return len(self._items)
+
+
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)
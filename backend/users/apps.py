@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
-    verbose_name = 'Users' 
\ No newline at end of file
+    verbose_name = 'Users'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import users.signals
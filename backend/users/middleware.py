@@ -5,7 +5,7 @@ Middleware for user activity logging and security features.
 import time
 from django.utils.deprecation import MiddlewareMixin
 from django.utils import timezone
-from django.contrib.auth import get_user_model
+from django.contrib.auth import get_user_model, logout
 from django.core.cache import cache
 from django.http import JsonResponse
 
@@ -43,10 +43,10 @@ class UserActivityMiddleware(MiddlewareMixin):
         if any(request.path.startswith(path) for path in skip_api_paths):
             return None
         
-        # Log activity for authenticated users
+        # Log activity for authenticated users (written in batches off the request path)
         if request.user.is_authenticated:
             try:
-                UserActivityService.log_activity(
+                UserActivityService.queue_activity(
                     user=request.user,
                     activity_type='api_request',
                     description=f'{request.method} {request.path}',
@@ -109,7 +109,9 @@ class SecurityMiddleware(MiddlewareMixin):
             if request.user.is_authenticated:
                 identifier = f"user_{request.user.id}"
             
-            is_allowed, error_message = SecurityService.check_login_rate_limit(identifier)
+            is_allowed, error_message = SecurityService.check_login_rate_limit(
+                identifier, request.user.is_authenticated
+            )
             if not is_allowed:
                 return JsonResponse(
                     {'error': error_message},
@@ -122,7 +124,9 @@ class SecurityMiddleware(MiddlewareMixin):
             if request.user.is_authenticated:
                 identifier = f"user_{request.user.id}"
             
-            is_allowed, error_message = SecurityService.check_password_reset_rate_limit(identifier)
+            is_allowed, error_message = SecurityService.check_password_reset_rate_limit(
+                identifier, request.user.is_authenticated
+            )
             if not is_allowed:
                 return JsonResponse(
                     {'error': error_message},
@@ -144,28 +148,28 @@ class SecurityMiddleware(MiddlewareMixin):
 class SessionSecurityMiddleware(MiddlewareMixin):
     """
     Middleware for session security features.
+    Sessions authenticated before the user's last password change are rejected.
     """
     
+    # Session key holding the time the session was authenticated (set on login)
+    AUTH_TIME_SESSION_KEY = '_auth_time'
+    
     def process_request(self, request):
         """Process request for session security."""
         if request.user.is_authenticated:
-            # Check if user's password was changed recently
-            # If so, invalidate all sessions
             try:
-                from .models import UserActivity
-                from django.utils import timezone
-                from datetime import timedelta
+                session = getattr(request, 'session', None)
+                if session is None:
+                    return None
                 
-                # Check if password was changed in the last 5 minutes
-                recent_password_change = UserActivity.objects.filter(
-                    user=request.user,
-                    activity_type='password_change',
-                    created_at__gte=timezone.now() - timedelta(minutes=5)
-                ).exists()
+                auth_time = session.get(self.AUTH_TIME_SESSION_KEY)
+                if auth_time is None:
+                    # Sessions opened before auth times were recorded start counting now
+                    session[self.AUTH_TIME_SESSION_KEY] = time.time()
+                    return None
                 
-                if recent_password_change:
-                    # Invalidate current session
-                    SecurityService.invalidate_user_sessions(request.user)
+                if auth_time < SecurityService.get_sessions_invalid_after(request.user):
+                    logout(request)
                     
                     # Return error response
                     return JsonResponse(
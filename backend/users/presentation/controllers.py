@@ -348,7 +348,7 @@ class LoginView(APIView):
                                     product_type=guest_item.product_type,
                                     product_id=guest_item.product_id,
                                     variant_id=guest_item.variant_id,
-                                    booking_data__schedule_id=guest_item.booking_data.get('schedule_id')
+                                    schedule_id=guest_item.schedule_id
                                 ).first()
                             else:
                                 existing_item = user_cart.items.filter(
@@ -60,6 +60,37 @@ class UserActivityService:
             print(f"Failed to log user activity: {e}")
             return None
     
+    @staticmethod
+    def queue_activity(
+        user: User,
+        activity_type: str,
+        description: str = '',
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Queue a high-volume activity for a batched background write.
+        Falls back to log_activity when buffering is disabled.
+        """
+        from django.conf import settings
+
+        if not getattr(settings, 'USER_ACTIVITY_BUFFERING', True):
+            UserActivityService.log_activity(
+                user, activity_type, description, ip_address, user_agent, metadata
+            )
+            return
+
+        from .activity_buffer import activity_buffer
+        activity_buffer.add(UserActivity(
+            user_id=user.pk,
+            activity_type=activity_type,
+            description=description,
+            ip_address=ip_address or None,
+            user_agent=user_agent or '',
+            metadata=metadata or {}
+        ))
+    
     @staticmethod
     def log_login_attempt(
         user: Optional[User],
@@ -138,6 +169,7 @@ class UserActivityService:
         Returns:
             UserActivity instance
         """
+        SecurityService.mark_sessions_invalid(user)
         return UserActivityService.log_activity(
             user=user,
             activity_type='password_change',
@@ -213,44 +245,46 @@ class SecurityService:
     def check_rate_limit(
         identifier: str,
         action: str,
-        limit: int,
-        window_seconds: int = 60
+        limit: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+        authenticated: bool = False
     ) -> tuple[bool, Optional[str]]:
         """
         Check if an action is within rate limits.
         
         Args:
             identifier: Unique identifier (user ID, IP address, etc.)
-            action: Action being performed
-            limit: Maximum number of actions allowed
-            window_seconds: Time window in seconds
+            action: Action being performed, also the RATE_LIMITS scope
+            limit: Maximum number of actions allowed (default: the scope's rule)
+            window_seconds: Time window in seconds (default: the scope's rule)
+            authenticated: Whether to apply the scope's user or anon rule
             
         Returns:
             Tuple of (is_allowed, error_message)
         """
-        cache_key = f"rate_limit_{action}_{identifier}"
-        current_count = cache.get(cache_key, 0)
-        
-        if current_count >= limit:
-            return False, f"Rate limit exceeded. Please wait {window_seconds} seconds before trying again."
-        
-        # Increment counter
-        cache.set(cache_key, current_count + 1, window_seconds)
+        from core.rate_limit import RateLimiter
+        if limit is None or window_seconds is None:
+            rule = RateLimiter.get_rule(action, authenticated)
+            if rule is None:
+                return True, None
+            limit = rule[0] if limit is None else limit
+            window_seconds = rule[1] if window_seconds is None else window_seconds
+        result = RateLimiter.hit(action, identifier, limit, window_seconds)
+        if not result.allowed:
+            return False, f"Rate limit exceeded. Please wait {result.retry_after} seconds before trying again."
         return True, None
     
     @staticmethod
     def check_login_rate_limit(
         identifier: str,
-        limit: int = 5,
-        window_seconds: int = 300  # 5 minutes
+        authenticated: bool = False
     ) -> tuple[bool, Optional[str]]:
         """
-        Check login rate limit.
+        Check login rate limit from the 'login' scope of RATE_LIMITS.
         
         Args:
             identifier: User ID or IP address
-            limit: Maximum login attempts
-            window_seconds: Time window in seconds
+            authenticated: Whether to apply the scope's user or anon rule
             
         Returns:
             Tuple of (is_allowed, error_message)
@@ -258,23 +292,20 @@ class SecurityService:
         return SecurityService.check_rate_limit(
             identifier=identifier,
             action='login',
-            limit=limit,
-            window_seconds=window_seconds
+            authenticated=authenticated
         )
     
     @staticmethod
     def check_password_reset_rate_limit(
         identifier: str,
-        limit: int = 3,
-        window_seconds: int = 3600  # 1 hour
+        authenticated: bool = False
     ) -> tuple[bool, Optional[str]]:
         """
-        Check password reset rate limit.
+        Check password reset rate limit from the 'password_reset' scope of RATE_LIMITS.
         
         Args:
             identifier: User ID or IP address
-            limit: Maximum password reset attempts
-            window_seconds: Time window in seconds
+            authenticated: Whether to apply the scope's user or anon rule
             
         Returns:
             Tuple of (is_allowed, error_message)
@@ -282,8 +313,7 @@ class SecurityService:
         return SecurityService.check_rate_limit(
             identifier=identifier,
             action='password_reset',
-            limit=limit,
-            window_seconds=window_seconds
+            authenticated=authenticated
         )
     
     @staticmethod
@@ -335,6 +365,55 @@ class SecurityService:
         cache_key = f"account_locked_{user.id}"
         return cache.get(cache_key, False)
     
+    @staticmethod
+    def _sessions_invalid_after_key(user_id) -> str:
+        return f"sessions_invalid_after_{user_id}"
+    
+    @staticmethod
+    def mark_sessions_invalid(user: User, when: Optional[datetime] = None) -> None:
+        """
+        Invalidate every session the user opened before when (default: now).
+        
+        Args:
+            user: User instance
+            when: Sessions authenticated before this moment are rejected
+        """
+        from django.conf import settings
+        when = when or timezone.now()
+        cache.set(
+            SecurityService._sessions_invalid_after_key(user.pk),
+            when.timestamp(),
+            settings.SESSION_COOKIE_AGE
+        )
+    
+    @staticmethod
+    def get_sessions_invalid_after(user: User) -> float:
+        """
+        Get the timestamp before which the user's sessions are invalid (0 if none).
+        Cached; the database is only consulted on a cache miss.
+        
+        Args:
+            user: User instance
+            
+        Returns:
+            POSIX timestamp
+        """
+        from django.conf import settings
+        cache_key = SecurityService._sessions_invalid_after_key(user.pk)
+        invalid_after = cache.get(cache_key)
+        if invalid_after is not None:
+            return invalid_after
+        
+        # Sessions older than SESSION_COOKIE_AGE have expired anyway
+        last_change = UserActivity.objects.filter(
+            user=user,
+            activity_type='password_change',
+            created_at__gte=timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE)
+        ).order_by('-created_at').values_list('created_at', flat=True).first()
+        invalid_after = last_change.timestamp() if last_change else 0
+        cache.set(cache_key, invalid_after, settings.SESSION_COOKIE_AGE)
+        return invalid_after
+    
     @staticmethod
     def invalidate_user_sessions(user: User) -> int:
         """
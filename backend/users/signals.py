@@ -0,0 +1,16 @@
+"""
+Django signals for user session security.
+"""
+
+import time
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+from .middleware import SessionSecurityMiddleware
+
+
+@receiver(user_logged_in)
+def record_session_auth_time(sender, request, user, **kwargs):
+    """Remember when the session was authenticated, for password-change invalidation."""
+    session = getattr(request, 'session', None)
+    if session is not None:
+        session[SessionSecurityMiddleware.AUTH_TIME_SESSION_KEY] = time.time()
@@ -0,0 +1,22 @@
+"""
+Celery tasks for Users app.
+"""
+
+import logging
+from importlib import import_module
+
+from celery import shared_task
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='users.clear_expired_sessions')
+def clear_expired_sessions():
+    """
+    Delete expired sessions of the configured session engine.
+    Cache-only sessions expire by themselves, so this is a no-op for them.
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    engine.SessionStore.clear_expired()
+    logger.info(f"Cleared expired sessions ({settings.SESSION_ENGINE})")
@@ -0,0 +1,113 @@
+import os
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from peykan.middleware import SessionRefreshMiddleware
+
+from .activity_buffer import ActivityBuffer
+from .middleware import SessionSecurityMiddleware
+from .models import UserActivity
+from .services import SecurityService
+from .tasks import clear_expired_sessions
+
+
+class ActivityBufferTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buffered', password='x')
+
+    def test_flush_writes_queued_activities(self):
+        buffer = ActivityBuffer()
+        # Pretend the flush thread is running so the test controls flushing
+        buffer._worker_pid = os.getpid()
+        for index in range(3):
+            buffer.add(UserActivity(
+                user_id=self.user.pk, activity_type='api_request', description=f'GET /{index}'
+            ))
+
+        self.assertEqual(UserActivity.objects.filter(user=self.user).count(), 0)
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(UserActivity.objects.filter(user=self.user).count(), 3)
+
+    def test_flush_keeps_event_time(self):
+        buffer = ActivityBuffer()
+        buffer._worker_pid = os.getpid()
+        queued_at = timezone.now() - timedelta(minutes=5)
+        buffer.add(UserActivity(user_id=self.user.pk, activity_type='api_request', created_at=queued_at))
+        buffer.flush()
+
+        self.assertEqual(UserActivity.objects.get(user=self.user).created_at, queued_at)
+
+
+class SessionInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='session', password='x')
+        self.client.force_login(self.user)
+        self.middleware = SessionSecurityMiddleware(lambda request: HttpResponse())
+
+    def tearDown(self):
+        cache.clear()
+
+    def _request(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        request.user = self.user
+        return request
+
+    def test_login_records_auth_time(self):
+        self.assertIn(SessionSecurityMiddleware.AUTH_TIME_SESSION_KEY, self.client.session)
+        self.assertIsNone(self.middleware.process_request(self._request()))
+
+    def test_session_rejected_after_password_change(self):
+        SecurityService.mark_sessions_invalid(self.user, timezone.now() + timedelta(seconds=1))
+
+        response = self.middleware.process_request(self._request())
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalid_after_falls_back_to_password_change_activity(self):
+        self.assertEqual(SecurityService.get_sessions_invalid_after(self.user), 0)
+
+        cache.clear()
+        UserActivity.objects.create(user=self.user, activity_type='password_change')
+        self.assertGreater(SecurityService.get_sessions_invalid_after(self.user), 0)
+
+
+class SessionRefreshTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='refresh', password='x')
+        self.client.force_login(self.user)
+        self.middleware = SessionRefreshMiddleware(lambda request: HttpResponse())
+
+    def _process(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        request.session.get('_auth_user_id')
+        self.middleware(request)
+        return request.session
+
+    def test_fresh_session_is_not_saved_again(self):
+        session = self._process()
+        self.assertTrue(session.modified)
+        session.save()
+
+        self.assertFalse(self._process().modified)
+
+    def test_session_near_expiry_is_refreshed(self):
+        session = self.client.session
+        session[SessionRefreshMiddleware.REFRESHED_AT_SESSION_KEY] = 0
+        session.save()
+
+        self.assertTrue(self._process().modified)
+
+    def test_clear_expired_sessions_task(self):
+        from django.contrib.sessions.models import Session
+
+        Session.objects.update(expire_date=timezone.now() - timedelta(seconds=1))
+        clear_expired_sessions()
+        self.assertFalse(Session.objects.exists())
@@ -605,7 +605,7 @@ class GoogleLoginView(APIView):
                                     items__product_type='tour',
                                     items__product_id=guest_item.product_id,
                                     items__variant_id=guest_item.variant_id,
-                                    items__booking_data__schedule_id=schedule_id,
+                                    items__schedule_id=guest_item.schedule_id,
                                     status='pending'
                                 ).exists()
                                 
@@ -648,7 +648,7 @@ class GoogleLoginView(APIView):
                                     product_type=guest_item.product_type,
                                     product_id=guest_item.product_id,
                                     variant_id=guest_item.variant_id,
-                                    booking_data__schedule_id=guest_item.booking_data.get('schedule_id')
+                                    schedule_id=guest_item.schedule_id
                                 ).first()
                             else:
                                 existing_item = user_cart.items.filter(